@@ -0,0 +1,168 @@
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class ApiFeedTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.other = User.objects.create_user(username='other')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='group-test-slug',
+            description='Тестовое описание',
+        )
+        cls.posts = [
+            Post.objects.create(
+                author=cls.user if number % 2 else cls.other,
+                group=None if number % 3 == 1 else cls.group,
+                text=f'Пост {number}',
+            )
+            for number in range(25)
+        ]
+
+    def setUp(self):
+        self.client = Client()
+
+    def get_json(self, url, **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        return response.json()
+
+    def test_post_list_fields_and_order(self):
+        """Лента отдаёт поля поста от новых к старым."""
+        data = self.get_json(reverse('api:post_list'), limit=3)
+        newest = ApiFeedTests.posts[-1]
+
+        self.assertEqual([row['id'] for row in data['results']],
+                         [post.id for post in ApiFeedTests.posts[:-4:-1]])
+        self.assertEqual(data['results'][0], {
+            'id': newest.id,
+            'text': newest.text,
+            'pub_date': data['results'][0]['pub_date'],
+            'author': newest.author.username,
+            'group': newest.group.slug,
+            'image': None,
+        })
+        self.assertIsNone(data['previous'])
+
+    def test_cursor_links_walk_whole_feed(self):
+        """По ссылкам next проходится вся лента без повторов."""
+        ids = []
+        url = reverse('api:post_list') + '?limit=10'
+        while url:
+            data = self.get_json(url)
+            ids.extend(row['id'] for row in data['results'])
+            url = data['next']
+
+        self.assertEqual(
+            ids, [post.id for post in reversed(ApiFeedTests.posts)])
+
+    def test_since_id_returns_only_new_posts(self):
+        """since_id отдаёт только посты новее указанного."""
+        since = ApiFeedTests.posts[-3].id
+
+        data = self.get_json(reverse('api:post_list'), since_id=since)
+        empty = self.get_json(
+            reverse('api:post_list'), since_id=ApiFeedTests.posts[-1].id)
+
+        self.assertEqual([row['id'] for row in data['results']],
+                         [post.id for post in ApiFeedTests.posts[:-3:-1]])
+        self.assertEqual(empty['results'], [])
+        self.assertIsNone(empty['next'])
+
+    def test_up_to_date_poll_seeks_primary_key(self):
+        """Опрос без новых постов — один поиск по первичному ключу,
+        без прохода по индексу ленты.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            data = self.get_json(
+                reverse('api:post_list'),
+                since_id=ApiFeedTests.posts[-1].id)
+
+        self.assertEqual(data['results'], [])
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('pub_date', queries[0]['sql'].split('ORDER BY')[1])
+
+    def test_group_and_author_feeds(self):
+        """Ленты группы и автора содержат только их посты."""
+        group_data = self.get_json(reverse(
+            'api:group_post_list',
+            kwargs={'slug': ApiFeedTests.group.slug}), limit=100)
+        author_data = self.get_json(reverse(
+            'api:author_post_list',
+            kwargs={'username': ApiFeedTests.user.username}), limit=100)
+
+        self.assertEqual(
+            len(group_data['results']),
+            Post.objects.filter(group=ApiFeedTests.group).count())
+        self.assertEqual(
+            {row['author'] for row in author_data['results']},
+            {ApiFeedTests.user.username})
+
+    def test_post_detail(self):
+        """Отдельный пост отдаётся по id."""
+        post = ApiFeedTests.posts[1]
+
+        data = self.get_json(
+            reverse('api:post_detail', kwargs={'post_id': post.id}))
+
+        self.assertEqual(data['id'], post.id)
+        self.assertIsNone(data['group'])
+
+    def test_errors(self):
+        """Несуществующие объекты, битые параметры и POST."""
+        cases = (
+            (reverse('api:post_detail', kwargs={'post_id': 10 ** 6}),
+             {}, HTTPStatus.NOT_FOUND),
+            (reverse('api:group_post_list', kwargs={'slug': 'missing'}),
+             {}, HTTPStatus.NOT_FOUND),
+            (reverse('api:author_post_list', kwargs={'username': 'missing'}),
+             {}, HTTPStatus.NOT_FOUND),
+            (reverse('api:post_list'), {'limit': 'x'},
+             HTTPStatus.BAD_REQUEST),
+            (reverse('api:post_list'), {'since_id': '-1'},
+             HTTPStatus.BAD_REQUEST),
+        )
+        for url, params, status in cases:
+            with self.subTest(url=url, params=params):
+                response = self.client.get(url, params)
+                self.assertEqual(response.status_code, status)
+                self.assertIn('detail', response.json())
+        self.assertEqual(
+            self.client.post(reverse('api:post_list')).status_code,
+            HTTPStatus.METHOD_NOT_ALLOWED)
+
+    def test_views_fit_query_budget(self):
+        """Каждый эндпоинт делает ровно столько запросов, сколько
+        ожидается, и укладывается в свой бюджет.
+        """
+        author_url = reverse(
+            'api:author_post_list',
+            kwargs={'username': ApiFeedTests.user.username})
+        cases = (
+            (reverse('api:post_list'), 1),
+            (reverse('api:post_list') + '?since_id=1&limit=5', 2),
+            (author_url + f'?since_id={ApiFeedTests.posts[-3].id}', 3),
+            (reverse('api:group_post_list',
+                     kwargs={'slug': ApiFeedTests.group.slug}), 2),
+            (author_url, 2),
+            (reverse('api:post_detail',
+                     kwargs={'post_id': ApiFeedTests.posts[0].id}), 1),
+        )
+        for url, queries in cases:
+            budget = resolve(url.split('?')[0]).func.query_budget
+            with self.subTest(url=url):
+                self.assertLessEqual(queries, budget)
+                with self.assertNumQueries(queries):
+                    self.client.get(url)
@@ -0,0 +1,135 @@
+from urllib.parse import urlencode
+
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+
+from core.routers import replica_reads
+from posts.models import Group, Post, User
+from posts.paginators import CursorPaginator
+from posts.utils import query_budget
+
+PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+# Сколько новых постов since_id ищет по диапазону первичного ключа.
+NEW_POSTS_PROBE = 500
+IMAGE_STORAGE = Post._meta.get_field('image').storage
+# Поля берутся через values(): строки без создания объектов моделей.
+POST_FIELDS = (
+    'id', 'text', 'pub_date', 'author__username', 'group__slug', 'image',
+)
+
+
+def error(detail, status):
+    return JsonResponse({'detail': detail}, status=status)
+
+
+def serialize_post(row):
+    return {
+        'id': row['id'],
+        'text': row['text'],
+        'pub_date': row['pub_date'],
+        'author': row['author__username'],
+        'group': row['group__slug'],
+        'image': IMAGE_STORAGE.url(row['image']) if row['image'] else None,
+    }
+
+
+def parse_positive_int(value, default=None):
+    """Целое больше нуля из GET-параметра; None для битого значения."""
+    if value in (None, ''):
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        return None
+    return number if number > 0 else None
+
+
+def page_link(request, **cursor):
+    params = {
+        key: request.GET[key] for key in ('limit', 'since_id')
+        if key in request.GET
+    }
+    params.update(cursor)
+    return f'{request.path}?{urlencode(params)}'
+
+
+def new_posts(posts, since_id):
+    """Посты новее since_id.
+
+    Условие pk > since_id рядом с сортировкой по (pub_date, id) SQLite
+    проверяет, проходя весь индекс ленты. Поэтому новые id сначала
+    ищутся диапазоном первичного ключа: если их немного, страница
+    собирается из них, если нет ни одного — запрос страницы не нужен.
+    """
+    ids = list(posts.filter(pk__gt=since_id).order_by('pk').values_list(
+        'pk', flat=True)[:NEW_POSTS_PROBE])
+    if len(ids) < NEW_POSTS_PROBE:
+        return Post.objects.filter(pk__in=ids)
+    # Новых постов много, и они в начале ленты: их быстро найдёт индекс.
+    return posts.filter(pk__gt=since_id)
+
+
+def feed_response(request, posts):
+    """Страница ленты по курсору; since_id оставляет только новые посты.
+
+    Поллер передаёт id самого свежего поста, который у него есть, и
+    получает пустой список одним поиском по первичному ключу, если
+    новых нет.
+    """
+    limit = parse_positive_int(request.GET.get('limit'), PAGE_SIZE)
+    since_id = parse_positive_int(request.GET.get('since_id'), 0)
+    if limit is None or since_id is None:
+        return error('limit и since_id должны быть положительными.', 400)
+    if since_id:
+        posts = new_posts(posts, since_id)
+    paginator = CursorPaginator(
+        posts.values(*POST_FIELDS), min(limit, MAX_PAGE_SIZE))
+    page = paginator.get_page(
+        after=request.GET.get('after'), before=request.GET.get('before'))
+    return JsonResponse({
+        'results': [serialize_post(row) for row in page],
+        'next': page.next_cursor and page_link(
+            request, after=page.next_cursor),
+        'previous': page.previous_cursor and page_link(
+            request, before=page.previous_cursor),
+    })
+
+
+@query_budget(2)
+@require_GET
+@replica_reads
+def post_list(request):
+    return feed_response(request, Post.objects.all())
+
+
+@query_budget(3)
+@require_GET
+@replica_reads
+def group_post_list(request, slug):
+    group_id = Group.objects.filter(
+        slug=slug).values_list('pk', flat=True).first()
+    if group_id is None:
+        return error('Группа не найдена.', 404)
+    return feed_response(request, Post.objects.filter(group_id=group_id))
+
+
+@query_budget(3)
+@require_GET
+@replica_reads
+def author_post_list(request, username):
+    author_id = User.objects.filter(
+        username=username).values_list('pk', flat=True).first()
+    if author_id is None:
+        return error('Автор не найден.', 404)
+    return feed_response(request, Post.objects.filter(author_id=author_id))
+
+
+@query_budget(1)
+@require_GET
+@replica_reads
+def post_detail(request, post_id):
+    row = Post.objects.filter(pk=post_id).values(*POST_FIELDS).first()
+    if row is None:
+        return error('Пост не найден.', 404)
+    return JsonResponse(serialize_post(row))
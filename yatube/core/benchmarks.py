@@ -0,0 +1,237 @@
+import json
+import math
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from io import BytesIO
+from threading import Barrier
+from time import perf_counter
+
+from django.core.cache import cache
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import connections
+
+PERCENTILES = (('p50', 0.50), ('p95', 0.95), ('p99', 0.99))
+
+
+def percentile(sorted_values, fraction):
+    """Перцентиль по методу ближайшего ранга."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(fraction * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def summarize(timings, queries):
+    timings = sorted(timings)
+    summary = {
+        name: round(percentile(timings, fraction) * 1000, 3)
+        for name, fraction in PERCENTILES
+    }
+    summary['queries'] = round(sum(queries) / max(len(queries), 1), 2)
+    summary['requests'] = len(timings)
+    return summary
+
+
+@contextmanager
+def count_queries():
+    """Считает SQL-запросы на всех соединениях: counter['queries']."""
+    counter = {'queries': 0}
+
+    def count_query(execute, sql, params, many, context):
+        counter['queries'] += 1
+        return execute(sql, params, many, context)
+
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(count_query))
+        yield counter
+
+
+def measure_calls(calls, warmup=5):
+    """Как measure, но для функций без аргументов вместо адресов."""
+    for call in calls[:warmup]:
+        call()
+    timings, queries = [], []
+    with count_queries() as counter:
+        for call in calls:
+            counter['queries'] = 0
+            started = perf_counter()
+            call()
+            timings.append(perf_counter() - started)
+            queries.append(counter['queries'])
+    return summarize(timings, queries)
+
+
+def measure(client, urls, warmup=5, cold=False):
+    """Прогоняет адреса через тестовый клиент Django.
+
+    Возвращает сводку по времени ответа (мс) и числу SQL-запросов.
+    cold=True очищает кэш перед каждым запросом.
+    """
+    for url in urls[:warmup]:
+        client.get(url)
+
+    timings, queries = [], []
+    with count_queries() as counter:
+        for url in urls:
+            if cold:
+                cache.clear()
+            counter['queries'] = 0
+            started = perf_counter()
+            response = client.get(url)
+            timings.append(perf_counter() - started)
+            queries.append(counter['queries'])
+            if response.status_code >= 400:
+                raise RuntimeError(f'{url} ответил {response.status_code}')
+    return summarize(timings, queries)
+
+
+def wsgi_get(handler, url):
+    """Один GET через WSGI-обработчик, как его вызывает сервер.
+
+    В отличие от тестового клиента, close() ответа шлёт request_finished
+    вместе с close_old_connections, так что CONN_MAX_AGE работает.
+    """
+    path, _, query = url.partition('?')
+    environ = {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'QUERY_STRING': query,
+        'SCRIPT_NAME': '',
+        'SERVER_NAME': 'testserver',
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': BytesIO(),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    status = []
+    response = handler(
+        environ, lambda line, headers: status.append(int(line[:3])))
+    try:
+        for _ in response:
+            pass
+    finally:
+        response.close()
+    if status[0] >= 400:
+        raise RuntimeError(f'{url} ответил {status[0]}')
+
+
+def measure_throughput(urls, threads=1, warmup=5):
+    """Пропускная способность: запросов в секунду на threads потоках.
+
+    Адреса делятся между потоками по кругу, у каждого потока свои
+    соединения с БД. Замер начинается, когда все потоки прогреты.
+    threads=1 работает в текущем потоке.
+    """
+    handler = WSGIHandler()
+    barrier = Barrier(threads)
+
+    def worker(chunk):
+        try:
+            for url in chunk[:warmup]:
+                wsgi_get(handler, url)
+            barrier.wait()
+            timings = []
+            started = perf_counter()
+            for url in chunk:
+                request_started = perf_counter()
+                wsgi_get(handler, url)
+                timings.append(perf_counter() - request_started)
+            return started, perf_counter(), timings
+        finally:
+            if threads > 1:
+                connections.close_all()
+
+    chunks = [urls[index::threads] for index in range(threads)]
+    if threads == 1:
+        results = [worker(chunks[0])]
+    else:
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            results = list(executor.map(worker, chunks))
+    elapsed = (max(finished for _, finished, _ in results)
+               - min(started for started, _, _ in results))
+    timings = sorted(
+        timing for _, _, chunk_timings in results for timing in chunk_timings)
+    summary = {
+        name: round(percentile(timings, fraction) * 1000, 3)
+        for name, fraction in PERCENTILES
+    }
+    summary['rps'] = round(len(timings) / max(elapsed, 1e-9), 1)
+    summary['requests'] = len(timings)
+    summary['threads'] = threads
+    return summary
+
+
+def load_baseline(path):
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as baseline:
+        return json.load(baseline)
+
+
+def save_baseline(path, results):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as baseline:
+        json.dump(results, baseline, ensure_ascii=False, indent=2,
+                  sort_keys=True)
+
+
+def format_report(results, baseline=None):
+    baseline = baseline or {}
+    lines = [
+        f'{"view":<24}{"p50 мс":>10}{"p95 мс":>10}{"p99 мс":>10}'
+        f'{"запросов":>10}'
+    ]
+    for name, summary in results.items():
+        line = f'{name:<24}'
+        for key, _ in PERCENTILES:
+            line += f'{summary[key]:>10.2f}'
+        line += f'{summary["queries"]:>10.2f}'
+        previous = baseline.get(name)
+        if previous and previous.get('p95'):
+            change = (summary['p95'] / previous['p95'] - 1) * 100
+            queries = summary['queries'] - previous.get('queries', 0)
+            line += (f'   p95 {change:+.1f}%, запросов {queries:+.2f} '
+                     f'к базовой')
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+def find_regressions(results, baseline, tolerance):
+    """View, у которых p95 вырос больше чем на tolerance процентов
+    или стало больше запросов, чем в базовой линии.
+    """
+    regressions = []
+    for name, summary in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        if summary['queries'] > previous.get('queries', math.inf):
+            regressions.append(name)
+        elif previous.get('p95') and (
+                summary['p95'] > previous['p95'] * (1 + tolerance / 100)):
+            regressions.append(name)
+    return regressions
+
+
+def format_throughput_report(results, baseline=None):
+    baseline = baseline or {}
+    lines = [f'{"view":<24}{"запр/с":>10}{"p50 мс":>10}{"p95 мс":>10}']
+    for name, summary in results.items():
+        line = (f'{name:<24}{summary["rps"]:>10.1f}'
+                f'{summary["p50"]:>10.2f}{summary["p95"]:>10.2f}')
+        previous = baseline.get(name)
+        if previous and previous.get('rps'):
+            change = (summary['rps'] / previous['rps'] - 1) * 100
+            line += f'   {change:+.1f}% запр/с к базовой'
+        lines.append(line)
+    return '\n'.join(lines)
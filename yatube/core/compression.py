@@ -0,0 +1,61 @@
+import zlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Кодировки в порядке предпочтения; br — только с модулем brotli.
+ENCODINGS = ('br', 'gzip') if brotli else ('gzip',)
+# wbits=31: поток с заголовком gzip, а не голый zlib.
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+
+def compressor(coding, level):
+    """Объект с методами compress, flush и finish для кодировки."""
+    if coding == 'br':
+        return _BrotliCompressor(level)
+    return _GzipCompressor(level)
+
+
+def compress(coding, data, level):
+    compressor_ = compressor(coding, level)
+    return compressor_.compress(data) + compressor_.finish()
+
+
+def compress_stream(coding, chunks, level):
+    """Сжимает поток частями: каждая часть уходит клиенту сразу."""
+    compressor_ = compressor(coding, level)
+    for chunk in chunks:
+        data = compressor_.compress(chunk) + compressor_.flush()
+        if data:
+            yield data
+    yield compressor_.finish()
+
+
+class _GzipCompressor:
+    def __init__(self, level):
+        self.compressor = zlib.compressobj(level, zlib.DEFLATED, GZIP_WBITS)
+
+    def compress(self, data):
+        return self.compressor.compress(data)
+
+    def flush(self):
+        return self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self.compressor.flush(zlib.Z_FINISH)
+
+
+class _BrotliCompressor:
+    def __init__(self, level):
+        self.compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data):
+        return self.compressor.process(data)
+
+    def flush(self):
+        return self.compressor.flush()
+
+    def finish(self):
+        return self.compressor.finish()
@@ -0,0 +1,14 @@
+from django.conf import settings
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """Выставляет SQLITE_PRAGMAS каждому новому соединению с SQLite.
+
+    PRAGMA действуют только на соединение, поэтому их нужно повторять
+    при каждом подключении; при CONN_MAX_AGE это происходит редко.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    for name, value in getattr(settings, 'SQLITE_PRAGMAS', {}).items():
+        # Сырое соединение: эти запросы не попадают в метрики view.
+        connection.connection.execute(f'PRAGMA {name} = {value}')
@@ -0,0 +1,74 @@
+def accepted_encodings(request):
+    """Кодировки из Accept-Encoding, кроме явно запрещённых q=0."""
+    accepted = set()
+    header = request.META.get('HTTP_ACCEPT_ENCODING', '')
+    for item in header.split(','):
+        coding, _, params = item.strip().lower().partition(';')
+        quality = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding and quality > 0:
+            accepted.add(coding.strip())
+    return accepted
+
+
+def parse_range(header, size):
+    """Диапазон из заголовка Range как (начало, длина).
+
+    None — заголовка нет, он непонятен или диапазонов несколько: отдаём
+    файл целиком, RFC 7233 это разрешает. ValueError — диапазон
+    за концом файла (ответ 416).
+    """
+    unit, _, spec = header.partition('=')
+    if unit.strip().lower() != 'bytes' or ',' in spec:
+        return None
+    first, dash, last = spec.strip().partition('-')
+    if not dash or not (first + last).isdigit():
+        return None
+    if not first:
+        # bytes=-500: последние 500 байт.
+        length = min(int(last), size)
+        if length == 0:
+            raise ValueError(header)
+        return size - length, length
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size:
+        raise ValueError(header)
+    if end < start:
+        return None
+    return start, end - start + 1
+
+
+class RangeFile:
+    """Файл, который читается только в пределах диапазона.
+
+    fileno() и tell() доступны, поэтому wsgi.file_wrapper сервера
+    (gunicorn) отдаёт диапазон через sendfile с учётом Content-Length.
+    """
+
+    def __init__(self, file, start, length):
+        self.file = file
+        self.remaining = length
+        file.seek(start)
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def tell(self):
+        return self.file.tell()
+
+    def close(self):
+        self.file.close()
@@ -0,0 +1,128 @@
+import threading
+from bisect import bisect_left
+
+# Границы корзин в миллисекундах и в штуках запросов к БД.
+TIME_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+UNRESOLVED_VIEW = '<unresolved>'
+
+METRICS = (
+    ('wall_ms', TIME_BUCKETS, 'Время обработки запроса, мс'),
+    ('db_queries', QUERY_BUCKETS, 'Число SQL-запросов на запрос'),
+    ('db_ms', TIME_BUCKETS, 'Время в SQL-запросах, мс'),
+    ('template_ms', TIME_BUCKETS, 'Время рендеринга шаблонов, мс'),
+)
+
+_local = threading.local()
+
+
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'count', 'sum')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        # Последняя корзина — всё, что больше верхней границы (+Inf).
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+
+class RequestStats:
+    __slots__ = ('queries', 'db_seconds', 'template_seconds')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.template_seconds = 0.0
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+        self._collectors = []
+
+    def add_collector(self, collector):
+        """Функция без аргументов, возвращающая строки для render_text."""
+        if collector not in self._collectors:
+            self._collectors.append(collector)
+
+    def record(self, view_name, wall_seconds, stats):
+        values = (
+            wall_seconds * 1000,
+            stats.queries,
+            stats.db_seconds * 1000,
+            stats.template_seconds * 1000,
+        )
+        with self._lock:
+            histograms = self._views.get(view_name)
+            if histograms is None:
+                histograms = self._views[view_name] = [
+                    Histogram(buckets) for _, buckets, _ in METRICS
+                ]
+            for histogram, value in zip(histograms, values):
+                histogram.observe(value)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                view: [
+                    (list(h.counts), h.count, h.sum) for h in histograms
+                ]
+                for view, histograms in self._views.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+    def render_text(self):
+        """Выгрузка в текстовом формате Prometheus."""
+        snapshot = self.snapshot()
+        lines = []
+        for index, (name, buckets, help_text) in enumerate(METRICS):
+            metric = f'yatube_view_{name}'
+            lines.append(f'# HELP {metric} {help_text}')
+            lines.append(f'# TYPE {metric} histogram')
+            for view in sorted(snapshot):
+                counts, count, total = snapshot[view][index]
+                label = f'view="{view}"'
+                cumulative = 0
+                for bound, bucket_count in zip(
+                        buckets + ('+Inf',), counts):
+                    cumulative += bucket_count
+                    lines.append(
+                        f'{metric}_bucket{{{label},le="{bound}"}} '
+                        f'{cumulative}')
+                lines.append(f'{metric}_sum{{{label}}} {total:.3f}')
+                lines.append(f'{metric}_count{{{label}}} {count}')
+        for collector in self._collectors:
+            lines.extend(collector())
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+
+def start_request():
+    _local.stats = RequestStats()
+    return _local.stats
+
+
+def finish_request():
+    _local.stats = None
+
+
+def current_stats():
+    return getattr(_local, 'stats', None)
+
+
+def add_template_time(seconds):
+    stats = current_stats()
+    if stats is not None:
+        stats.template_seconds += seconds
@@ -0,0 +1,140 @@
+import time
+from contextlib import ExitStack
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connections
+from django.http import FileResponse
+from django.utils.cache import patch_vary_headers
+
+from . import compression, metrics, routers
+from .http import accepted_encodings
+
+# Сжимаем только текст: картинки, архивы и видео уже сжаты.
+COMPRESSIBLE_TYPES = (
+    'text/', 'application/json', 'application/javascript',
+    'application/xml', 'image/svg+xml',
+)
+
+
+class ViewMetricsMiddleware:
+    """Пишет в гистограммы время, SQL-запросы и рендеринг каждого view.
+
+    Должен стоять первым в MIDDLEWARE, чтобы учитывать запросы
+    остальных middleware (сессии, пользователь).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = metrics.start_request()
+
+        def count_query(execute, sql, params, many, context):
+            started = perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                stats.queries += 1
+                stats.db_seconds += perf_counter() - started
+
+        started = perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(count_query))
+                response = self.get_response(request)
+        finally:
+            metrics.finish_request()
+        match = request.resolver_match
+        metrics.registry.record(
+            match.view_name if match else metrics.UNRESOLVED_VIEW,
+            perf_counter() - started,
+            stats,
+        )
+        return response
+
+
+class ReadYourWritesMiddleware:
+    """После POST, PUT, PATCH или DELETE вошедшего пользователя
+    закрепляет его сессию за primary на DATABASE_READ_YOUR_WRITES_SECONDS,
+    пока реплики догоняют.
+
+    Служебные записи (кэш миниатюр, сессии) не в счёт: иначе анонимам
+    заводились бы сессии и их чтения уходили бы на primary. Должен
+    стоять после SessionMiddleware и AuthenticationMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        routers.start_request()
+        response = self.get_response(request)
+        if (settings.DATABASE_REPLICAS
+                and request.method in routers.WRITE_METHODS
+                and request.user.is_authenticated):
+            request.session[routers.PIN_SESSION_KEY] = (
+                time.time() + settings.DATABASE_READ_YOUR_WRITES_SECONDS)
+        return response
+
+
+class CompressionMiddleware:
+    """Сжимает текстовые ответы в br или gzip по Accept-Encoding.
+
+    Обычные ответы короче COMPRESSION_MIN_LENGTH идут как есть: выигрыш
+    меньше заголовков. Потоковые ответы сжимаются по частям. Ставится
+    раньше middleware, которые читают или меняют тело ответа.
+
+    Файлы (FileResponse, X-Sendfile) не трогаем: их отдаёт
+    wsgi.file_wrapper или веб-сервер, а Content-Range диапазона описывает
+    байты исходного файла, а не сжатого потока.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        content_type = response.get('Content-Type', '').lower()
+        if (response.has_header('Content-Encoding')
+                or not content_type.startswith(COMPRESSIBLE_TYPES)):
+            return response
+        if (isinstance(response, FileResponse) or response.status_code == 206
+                or response.has_header('Content-Range')
+                or (settings.MEDIA_SENDFILE_HEADER
+                    and response.has_header(settings.MEDIA_SENDFILE_HEADER))):
+            return response
+        if not response.streaming and (
+                len(response.content) < settings.COMPRESSION_MIN_LENGTH):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        accepted = accepted_encodings(request)
+        coding = next(
+            (coding for coding in compression.ENCODINGS
+             if coding in accepted), None)
+        if coding is None:
+            return response
+        level = settings.COMPRESSION_LEVELS[coding]
+
+        if response.streaming:
+            response.streaming_content = compression.compress_stream(
+                coding, response.streaming_content, level)
+            del response['Content-Length']
+        else:
+            compressed = compression.compress(
+                coding, response.content, level)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+
+        # Сжатое тело не совпадает побайтно с исходным: сильный ETag
+        # становится слабым (RFC 7232, 2.1).
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = coding
+        return response
@@ -0,0 +1,71 @@
+import random
+import threading
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+# Отметка в сессии: до этого времени сессия читает только с primary.
+PIN_SESSION_KEY = '_db_primary_until'
+# Запросы, которыми пользователь меняет данные.
+WRITE_METHODS = ('POST', 'PUT', 'PATCH', 'DELETE')
+
+_state = threading.local()
+
+
+class PrimaryReplicaRouter:
+    """Чтение внутри view с replica_reads — с реплик, всё остальное
+    и любая запись — с default.
+    """
+
+    def db_for_read(self, model, **hints):
+        if getattr(_state, 'use_replica', False):
+            return _request_replica()
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики — копии primary, объекты с них связываются свободно.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.DATABASE_REPLICAS
+
+
+def _request_replica():
+    # Реплики отстают по-разному: все чтения запроса идут с одной,
+    # иначе на странице смешались бы данные разных моментов.
+    replica = getattr(_state, 'replica', None)
+    if replica not in settings.DATABASE_REPLICAS:
+        replica = _state.replica = random.choice(settings.DATABASE_REPLICAS)
+    return replica
+
+
+def is_pinned(request):
+    session = getattr(request, 'session', None)
+    return bool(session) and session.get(PIN_SESSION_KEY, 0) > time.time()
+
+
+def replica_reads(view):
+    """Отправляет чтения view на реплику, если сессия не писала недавно.
+
+    Сессия читается до включения реплики: отметка о записи в ней
+    должна браться с primary.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not settings.DATABASE_REPLICAS or is_pinned(request):
+            return view(request, *args, **kwargs)
+        _state.use_replica = True
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            _state.use_replica = False
+    return wrapper
+
+
+def start_request():
+    _state.replica = None
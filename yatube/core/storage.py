@@ -0,0 +1,88 @@
+import hashlib
+import os
+import posixpath
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+from .compression import ENCODINGS, compress
+
+# Бинарные форматы (png, ico, шрифты woff2) уже сжаты.
+COMPRESSIBLE_EXTENSIONS = (
+    '.css', '.js', '.svg', '.txt', '.html', '.json', '.xml', '.map',
+)
+# Сжатая копия нужна, только если заметно меньше оригинала.
+MIN_RATIO = 0.95
+
+
+# Статика сжимается один раз при сборке, поэтому уровни максимальные.
+# Заголовок gzip от zlib без mtime: сборка воспроизводима.
+VARIANTS = {'gzip': ('.gz', 9), 'br': ('.br', 11)}
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Статика с хешем в имени плюс заранее сжатые .gz и .br рядом.
+
+    Имена с хешем не меняются без смены содержимого, поэтому их можно
+    отдавать с Cache-Control: immutable (см. core.views.serve_static).
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+        for hashed_name in sorted(set(self.hashed_files.values())):
+            if not hashed_name.endswith(COMPRESSIBLE_EXTENSIONS):
+                continue
+            with self.open(hashed_name) as source:
+                data = source.read()
+            for coding in ENCODINGS:
+                extension, level = VARIANTS[coding]
+                compressed = compress(coding, data, level)
+                if len(compressed) > len(data) * MIN_RATIO:
+                    continue
+                path = self.path(hashed_name + extension)
+                with open(path, 'wb') as target:
+                    target.write(compressed)
+                yield hashed_name, hashed_name + extension, True
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """Файлы под именем из sha256 содержимого, разложенные по подкаталогам.
+
+    posts/photo.jpg сохраняется как posts/ab/cd/abcd….jpg: в одном
+    каталоге не копятся сотни тысяч файлов, а одинаковые загрузки
+    ложатся в один файл. Удалять такой файл можно, только когда на него
+    не ссылается ни одна запись (см. posts.images.release_images).
+    """
+    # Два уровня по два символа хеша — 65536 каталогов.
+    shard_depth = 2
+    shard_width = 2
+
+    def content_name(self, name, content):
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        digest = digest.hexdigest()
+        shards = [
+            digest[i * self.shard_width:(i + 1) * self.shard_width]
+            for i in range(self.shard_depth)
+        ]
+        extension = os.path.splitext(name)[1].lower()
+        return posixpath.join(
+            posixpath.dirname(name), *shards, digest + extension)
+
+    def _save(self, name, content):
+        name = self.content_name(name, content)
+        if self.exists(name):
+            return name
+        # Если тот же файл одновременно пишет другой запрос, родитель
+        # сохранит копию с суффиксом — лишний файл, но не ошибка.
+        return super()._save(name, content)
+
+    def restore(self, name, content):
+        """Записывает content под готовым именем, если файла там нет."""
+        if not self.exists(name):
+            super()._save(name, content)
@@ -0,0 +1,34 @@
+from time import perf_counter
+
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates, Template, reraise
+
+from .metrics import add_template_time
+
+
+class InstrumentedTemplate(Template):
+    def render(self, context=None, request=None):
+        started = perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            add_template_time(perf_counter() - started)
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """Шаблонизатор Django, замеряющий время рендеринга для метрик.
+
+    Замер идёт только на верхнем уровне: include и extends
+    рендерятся внутри него и второй раз не считаются.
+    """
+
+    def from_string(self, template_code):
+        return InstrumentedTemplate(
+            self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return InstrumentedTemplate(
+                self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
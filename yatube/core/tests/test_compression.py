@@ -0,0 +1,77 @@
+import gzip
+from unittest import skipUnless
+
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from core import compression
+from core.middleware import CompressionMiddleware
+
+HTML = b'<article><p>Lorem ipsum dolor sit amet.</p></article>\n' * 100
+
+
+@override_settings(
+    COMPRESSION_MIN_LENGTH=512, COMPRESSION_LEVELS={'gzip': 6, 'br': 5})
+class CompressionMiddlewareTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def process(self, response, accept='gzip'):
+        request = self.factory.get('/', HTTP_ACCEPT_ENCODING=accept)
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def test_gzip_html(self):
+        """HTML сжимается, сильный ETag становится слабым."""
+        response = HttpResponse(HTML)
+        response['ETag'] = '"abc"'
+
+        response = self.process(response)
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(response['ETag'], 'W/"abc"')
+        self.assertEqual(
+            response['Content-Length'], str(len(response.content)))
+        self.assertEqual(gzip.decompress(response.content), HTML)
+
+    @skipUnless(compression.brotli, 'brotli не установлен')
+    def test_brotli_preferred(self):
+        response = self.process(HttpResponse(HTML), accept='gzip, br')
+
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(compression.brotli.decompress(response.content), HTML)
+
+    def test_skipped_responses(self):
+        """Короткие, бинарные и уже сжатые ответы идут как есть."""
+        precompressed = HttpResponse(b'\x1f\x8b' + HTML)
+        precompressed['Content-Encoding'] = 'gzip'
+        for response in (
+                HttpResponse(b'<p>ok</p>'),
+                HttpResponse(HTML, content_type='image/jpeg'),
+                precompressed):
+            with self.subTest(response['Content-Type']):
+                content = response.content
+                encoding = response.get('Content-Encoding')
+                response = self.process(response)
+                self.assertEqual(response.content, content)
+                self.assertEqual(
+                    response.get('Content-Encoding'), encoding)
+
+    def test_client_without_gzip(self):
+        for accept in ('', 'identity', 'gzip;q=0'):
+            with self.subTest(accept=accept):
+                response = self.process(HttpResponse(HTML), accept=accept)
+                self.assertFalse(response.has_header('Content-Encoding'))
+                self.assertEqual(response['Vary'], 'Accept-Encoding')
+
+    def test_streaming_response(self):
+        """Потоковый ответ сжимается по частям без Content-Length."""
+        chunks = [HTML[:1000], HTML[1000:3000], HTML[3000:]]
+
+        response = self.process(StreamingHttpResponse(iter(chunks)))
+        parts = list(response.streaming_content)
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertFalse(response.has_header('Content-Length'))
+        self.assertGreater(len(parts), 1)
+        self.assertEqual(gzip.decompress(b''.join(parts)), HTML)
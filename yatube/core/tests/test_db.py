@@ -0,0 +1,51 @@
+import os
+from importlib import import_module, reload
+from unittest import mock
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from core.db import configure_sqlite
+
+
+class SqlitePragmasTests(TestCase):
+    @override_settings(SQLITE_PRAGMAS={'busy_timeout': 4321})
+    def test_pragmas_applied_to_connection(self):
+        """PRAGMA из настроек выставляются соединению."""
+        configure_sqlite(sender=None, connection=connection)
+
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], 4321)
+
+    def test_production_profile(self):
+        """Боевой профиль не меняет базовые настройки и включает кэш."""
+        base = import_module('yatube.settings')
+        production = import_module('yatube.settings_production')
+
+        self.assertFalse(production.DEBUG)
+        self.assertGreater(production.DATABASES['default']['CONN_MAX_AGE'], 0)
+        self.assertEqual(production.SQLITE_PRAGMAS['journal_mode'], 'WAL')
+        self.assertEqual(
+            production.TEMPLATES[0]['OPTIONS']['loaders'][0][0],
+            'django.template.loaders.cached.Loader')
+        self.assertEqual(base.DATABASES['default'].get('CONN_MAX_AGE', 0), 0)
+        self.assertTrue(base.TEMPLATES[0]['APP_DIRS'])
+        self.assertNotIn(
+            'LocMemCache', production.CACHES['default']['BACKEND'])
+        self.assertIn('LocMemCache', base.CACHES['default']['BACKEND'])
+
+    def test_production_profile_rejects_local_cache(self):
+        """Боевой профиль не запускается с кэшем в памяти процесса."""
+        production = import_module('yatube.settings_production')
+        environ = {
+            'YATUBE_CACHE_BACKEND':
+                'django.core.cache.backends.locmem.LocMemCache',
+        }
+        try:
+            with mock.patch.dict(os.environ, environ):
+                with self.assertRaises(ImproperlyConfigured):
+                    reload(production)
+        finally:
+            reload(production)
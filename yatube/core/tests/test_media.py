@@ -0,0 +1,120 @@
+import os
+import shutil
+import tempfile
+
+from django.test import TestCase, override_settings
+
+MEDIA_ROOT = tempfile.mkdtemp()
+CONTENT = bytes(range(256)) * 4
+SVG = b'<svg xmlns="http://www.w3.org/2000/svg">' + b'<g/>' * 1200 + b'</svg>'
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, MEDIA_SENDFILE_HEADER=None)
+class ServeMediaTests(TestCase):
+    url = '/media/posts/small.gif'
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        os.makedirs(os.path.join(MEDIA_ROOT, 'posts'))
+        with open(os.path.join(MEDIA_ROOT, 'posts', 'small.gif'), 'wb') as f:
+            f.write(CONTENT)
+        with open(os.path.join(MEDIA_ROOT, 'posts', 'big.svg'), 'wb') as f:
+            f.write(SVG)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def get(self, url=None, **headers):
+        response = self.client.get(url or self.url, **headers)
+        self.addCleanup(response.close)
+        return response
+
+    def test_full_file(self):
+        response = self.get()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), CONTENT)
+        self.assertEqual(response['Content-Type'], 'image/gif')
+        self.assertEqual(response['Content-Length'], str(len(CONTENT)))
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn('ETag', response)
+
+    def test_ranges(self):
+        """Отдаётся только запрошенный диапазон байт."""
+        cases = {
+            'bytes=0-9': (CONTENT[:10], 'bytes 0-9/1024'),
+            'bytes=1000-': (CONTENT[1000:], 'bytes 1000-1023/1024'),
+            'bytes=-4': (CONTENT[-4:], 'bytes 1020-1023/1024'),
+            'bytes=1020-5000': (CONTENT[1020:], 'bytes 1020-1023/1024'),
+        }
+        for header, (body, content_range) in cases.items():
+            with self.subTest(header=header):
+                response = self.get(HTTP_RANGE=header)
+                self.assertEqual(response.status_code, 206)
+                self.assertEqual(b''.join(response.streaming_content), body)
+                self.assertEqual(response['Content-Range'], content_range)
+                self.assertEqual(response['Content-Length'], str(len(body)))
+
+    def test_text_files_not_compressed(self):
+        """Диапазон SVG приходит байтами файла, а не куском gzip;
+        целый файл тоже отдаётся без сжатия на лету.
+        """
+        url = '/media/posts/big.svg'
+        ranged = self.get(
+            url, HTTP_RANGE='bytes=0-2999', HTTP_ACCEPT_ENCODING='gzip, br')
+        full = self.get(url, HTTP_ACCEPT_ENCODING='gzip, br')
+
+        self.assertEqual(ranged.status_code, 206)
+        self.assertNotIn('Content-Encoding', ranged)
+        self.assertEqual(
+            ranged['Content-Range'], f'bytes 0-2999/{len(SVG)}')
+        self.assertEqual(b''.join(ranged.streaming_content), SVG[:3000])
+        self.assertNotIn('Content-Encoding', full)
+        self.assertEqual(b''.join(full.streaming_content), SVG)
+
+    def test_range_fallbacks(self):
+        """Непонятный или устаревший по If-Range диапазон — весь файл."""
+        for headers in ({'HTTP_RANGE': 'bytes=0-1,5-6'},
+                        {'HTTP_RANGE': 'items=0-1'},
+                        {'HTTP_RANGE': 'bytes=0-9', 'HTTP_IF_RANGE': '"x"'}):
+            with self.subTest(headers=headers):
+                self.assertEqual(self.get(**headers).status_code, 200)
+
+    def test_unsatisfiable_range(self):
+        response = self.get(HTTP_RANGE='bytes=2000-')
+
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */1024')
+
+    def test_conditional_requests(self):
+        """Повторный запрос с валидаторами получает 304."""
+        response = self.get()
+
+        for headers in (
+                {'HTTP_IF_NONE_MATCH': response['ETag']},
+                {'HTTP_IF_MODIFIED_SINCE': response['Last-Modified']}):
+            with self.subTest(headers=headers):
+                self.assertEqual(self.get(**headers).status_code, 304)
+
+    def test_missing_and_outside_paths(self):
+        for url in ('/media/posts/missing.gif', '/media/../manage.py'):
+            with self.subTest(url=url):
+                self.assertEqual(self.get(url).status_code, 404)
+
+    def test_sendfile_headers(self):
+        """Со сконфигурированным заголовком тело отдаёт веб-сервер."""
+        path = os.path.join(MEDIA_ROOT, 'posts', 'small.gif')
+        cases = {
+            'X-Sendfile': path,
+            'X-Accel-Redirect': '/protected-media/posts/small.gif',
+        }
+        for header, value in cases.items():
+            with self.subTest(header=header), override_settings(
+                    MEDIA_SENDFILE_HEADER=header):
+                response = self.get()
+                self.assertEqual(response[header], value)
+                self.assertEqual(response.content, b'')
+                self.assertEqual(response['Content-Type'], 'image/gif')
@@ -0,0 +1,63 @@
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from core.metrics import METRICS, registry
+
+User = get_user_model()
+
+
+class ViewMetricsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.staff = User.objects.create_user(username='staff', is_staff=True)
+        cls.user = User.objects.create_user(username='auth')
+
+    def setUp(self):
+        cache.clear()
+        registry.reset()
+        self.guest_client = Client()
+        self.staff_client = Client()
+        self.staff_client.force_login(ViewMetricsTests.staff)
+
+    def get_histograms(self, view_name):
+        return dict(zip(
+            (name for name, _, _ in METRICS),
+            registry.snapshot()[view_name],
+        ))
+
+    def test_middleware_records_view_metrics(self):
+        """Для view записываются время, SQL-запросы и рендеринг."""
+        self.guest_client.get(reverse('posts:index'))
+        self.guest_client.get(reverse('posts:index'))
+
+        histograms = self.get_histograms('posts:index')
+
+        for name, (counts, count, total) in histograms.items():
+            with self.subTest(metric=name):
+                self.assertEqual(count, 2)
+                self.assertEqual(sum(counts), 2)
+        self.assertGreater(histograms['db_queries'][2], 0)
+        self.assertGreater(histograms['template_ms'][2], 0)
+
+    def test_metrics_endpoint_is_staff_only(self):
+        """Метрики видит только сотрудник, остальных отправляем на вход."""
+        self.guest_client.get(reverse('posts:index'))
+        user_client = Client()
+        user_client.force_login(ViewMetricsTests.user)
+
+        for client in (self.guest_client, user_client):
+            with self.subTest(client=client):
+                response = client.get(reverse('metrics'))
+                self.assertEqual(response.status_code, HTTPStatus.FOUND)
+
+        response = self.staff_client.get(reverse('metrics'))
+        self.assertContains(
+            response,
+            'yatube_view_db_queries_count{view="posts:index"} 1')
+        self.assertEqual(
+            response['Content-Type'], 'text/plain; version=0.0.4')
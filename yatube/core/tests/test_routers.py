@@ -0,0 +1,178 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.cache import cache
+from django.db import connections, router
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from core.middleware import ReadYourWritesMiddleware
+from core.routers import PIN_SESSION_KEY, replica_reads, start_request
+from posts.models import Post
+
+User = get_user_model()
+
+
+@replica_reads
+def read_alias_view(request):
+    return router.db_for_read(Post)
+
+
+@replica_reads
+def read_aliases_view(request):
+    return {router.db_for_read(Post) for _ in range(20)}
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class PrimaryReplicaRouterTests(TestCase):
+    def setUp(self):
+        self.request = RequestFactory().get('/')
+        self.request.session = SessionStore()
+
+    def test_replica_reads_only_inside_marked_views(self):
+        """Реплика используется только внутри replica_reads."""
+        self.assertEqual(read_alias_view(self.request), 'replica')
+        self.assertEqual(router.db_for_read(Post), 'default')
+        self.assertEqual(router.db_for_write(Post), 'default')
+
+    def test_pinned_session_reads_primary(self):
+        """Недавно писавшая сессия читает с primary."""
+        self.request.session[PIN_SESSION_KEY] = time.time() + 60
+
+        self.assertEqual(read_alias_view(self.request), 'default')
+
+        self.request.session[PIN_SESSION_KEY] = time.time() - 1
+        self.assertEqual(read_alias_view(self.request), 'replica')
+
+    @override_settings(DATABASE_REPLICAS=['replica', 'replica2'])
+    def test_one_replica_per_request(self):
+        """Все чтения запроса идут с одной реплики, новый запрос
+        выбирает её заново.
+        """
+        choices = iter(['replica', 'replica2'])
+        with mock.patch('core.routers.random.choice',
+                        side_effect=lambda replicas: next(choices)):
+            start_request()
+            first = read_aliases_view(self.request)
+            start_request()
+            second = read_aliases_view(self.request)
+
+        self.assertEqual(first, {'replica'})
+        self.assertEqual(second, {'replica2'})
+
+    def test_migrations_skip_replicas(self):
+        """Миграции на реплики не накатываются."""
+        self.assertFalse(router.allow_migrate('replica', 'posts'))
+        self.assertTrue(router.allow_migrate('default', 'posts'))
+
+    def test_write_pins_session_to_primary(self):
+        """После создания поста сессия закреплена за primary."""
+        client = Client()
+        client.force_login(User.objects.create_user(username='auth'))
+
+        client.post(reverse('posts:post_create'), {'text': 'Новый пост'})
+
+        self.assertGreater(client.session[PIN_SESSION_KEY], time.time())
+        # Свой пост виден сразу: чтение идёт с primary.
+        self.assertContains(client.get(reverse('posts:index')), 'Новый пост')
+
+    def test_only_user_writes_pin(self):
+        """Закрепляет только POST вошедшего пользователя, а не любая
+        запись в БД во время запроса.
+        """
+        def writing_view(request):
+            Post.objects.filter(pk=0).update(text='')
+            return HttpResponse()
+
+        middleware = ReadYourWritesMiddleware(writing_view)
+        user = User.objects.create_user(username='auth')
+        cases = (
+            ('get', user, False),
+            ('get', AnonymousUser(), False),
+            ('post', AnonymousUser(), False),
+            ('post', user, True),
+        )
+        for method, request_user, pinned in cases:
+            with self.subTest(method=method, user=request_user):
+                request = getattr(RequestFactory(), method)('/')
+                request.session = SessionStore()
+                request.user = request_user
+
+                middleware(request)
+
+                self.assertIs(PIN_SESSION_KEY in request.session, pinned)
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_no_pin_without_replicas(self):
+        """Без реплик сессия не меняется."""
+        client = Client()
+        client.force_login(User.objects.create_user(username='auth'))
+
+        client.post(reverse('posts:post_create'), {'text': 'Новый пост'})
+
+        self.assertNotIn(PIN_SESSION_KEY, client.session)
+
+
+REPLICA_DIR = tempfile.mkdtemp()
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaDatabaseTests(TestCase):
+    """Чтения через настоящую вторую базу: копию primary, которая
+    не получает новых записей, как отставшая реплика.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        # Копия снимается до транзакции класса: в ней только схема.
+        path = os.path.join(REPLICA_DIR, 'replica.sqlite3')
+        primary = connections['default']
+        primary.ensure_connection()
+        replica = sqlite3.connect(path)
+        primary.connection.backup(replica)
+        replica.close()
+        super().setUpClass()
+        # Алиас добавляется после TestCase.setUpClass: запросы к нему
+        # не считаются запросами к чужой базе.
+        connections.databases['replica'] = {
+            'ENGINE': 'django.db.backends.sqlite3', 'NAME': path}
+        cls.author = User.objects.create_user(username='auth')
+
+    @classmethod
+    def tearDownClass(cls):
+        connections['replica'].close()
+        del connections['replica']
+        del connections.databases['replica']
+        shutil.rmtree(REPLICA_DIR, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(ReplicaDatabaseTests.author)
+
+    def test_author_reads_own_post_while_replica_lags(self):
+        """Автор после записи видит пост с primary, гость — ленту
+        с реплики без сессии.
+        """
+        guest = Client()
+        self.assertNotContains(
+            guest.get(reverse('posts:index')), 'Новый пост')
+
+        self.client.post(reverse('posts:post_create'), {'text': 'Новый пост'})
+
+        self.assertContains(
+            self.client.get(reverse('posts:index')), 'Новый пост')
+        # Иначе гость получил бы страницу, закэшированную автором.
+        cache.clear()
+        self.assertNotContains(
+            guest.get(reverse('posts:index')), 'Новый пост')
+        self.assertNotIn('sessionid', guest.cookies)
@@ -0,0 +1,115 @@
+import gzip
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest import skipUnless
+
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.http import Http404
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from core import compression
+from core.views import serve_static
+
+STATIC_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(
+    STATIC_ROOT=STATIC_ROOT,
+    STATICFILES_STORAGE='core.storage.CompressedManifestStaticFilesStorage',
+)
+class CompressedManifestStorageTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        call_command('collectstatic', interactive=False, verbosity=0)
+        cls.css = staticfiles_storage.stored_name('css/bootstrap.min.css')
+        cls.factory = RequestFactory()
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(STATIC_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def path(self, name):
+        return os.path.join(STATIC_ROOT, name)
+
+    def get(self, name, **headers):
+        response = serve_static(
+            self.factory.get(f'/static/{name}', **headers), name)
+        # response.close() шлёт request_finished, а он трогает соединения
+        # с БД: закрываем только сам файл.
+        if response.streaming:
+            self.addCleanup(response.file_to_stream.close)
+        return response
+
+    def test_hashed_names_in_manifest(self):
+        """Имена с хешем записаны в манифест."""
+        with open(self.path('staticfiles.json')) as manifest:
+            paths = json.load(manifest)['paths']
+
+        self.assertEqual(paths['css/bootstrap.min.css'], self.css)
+        self.assertRegex(self.css, r'^css/bootstrap\.min\.[0-9a-f]{12}\.css$')
+
+    def test_gzip_copy(self):
+        """Рядом с текстовым файлом лежит .gz с тем же содержимым."""
+        with open(self.path(self.css), 'rb') as original:
+            data = original.read()
+        with open(self.path(self.css + '.gz'), 'rb') as compressed:
+            self.assertEqual(gzip.decompress(compressed.read()), data)
+        self.assertFalse(
+            os.path.exists(self.path('img/fav/favicon-16x16.png.gz')))
+
+    @skipUnless(compression.brotli, 'brotli не установлен')
+    def test_brotli_copy(self):
+        with open(self.path(self.css + '.br'), 'rb') as compressed:
+            data = compression.brotli.decompress(compressed.read())
+        with open(self.path(self.css), 'rb') as original:
+            self.assertEqual(data, original.read())
+
+    def test_serves_precompressed_immutable(self):
+        """Отдаётся сжатая копия с вечным кэшем."""
+        response = self.get(self.css, HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertIn('immutable', response['Cache-Control'])
+
+    def test_encoding_negotiation(self):
+        """Без Accept-Encoding или с q=0 отдаётся исходный файл."""
+        for header in ('', 'gzip;q=0', 'identity'):
+            with self.subTest(header=header):
+                response = self.get(self.css, HTTP_ACCEPT_ENCODING=header)
+                self.assertFalse(response.has_header('Content-Encoding'))
+        if compression.brotli:
+            response = self.get(self.css, HTTP_ACCEPT_ENCODING='gzip, br')
+            self.assertEqual(response['Content-Encoding'], 'br')
+
+    def test_unhashed_name_revalidates(self):
+        """Имя без хеша кэшируется ненадолго и отвечает 304."""
+        response = self.get('css/bootstrap.min.css')
+        self.assertNotIn('immutable', response['Cache-Control'])
+
+        response = self.get(
+            'css/bootstrap.min.css',
+            HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_missing_and_outside_paths(self):
+        for name in ('css/missing.css', '../settings.py'):
+            with self.subTest(name=name):
+                with self.assertRaises(Http404):
+                    self.get(name)
+
+
+class BenchStaticCommandTests(SimpleTestCase):
+    def test_report(self):
+        out = StringIO()
+        call_command('bench_static', stdout=out)
+
+        self.assertIn('pipeline   repeat             0          0',
+                      out.getvalue())
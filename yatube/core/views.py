@@ -1,4 +1,34 @@
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import (FileResponse, Http404, HttpResponse,
+                         HttpResponseNotModified)
 from django.shortcuts import render
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+from django.views.static import was_modified_since
+
+from .http import RangeFile, accepted_encodings, parse_range
+from .metrics import registry
+
+# Имя с хешем от ManifestStaticFilesStorage: bootstrap.min.0123456789ab.css.
+HASHED_NAME_RE = re.compile(r'\.[0-9a-f]{12}\.[^/]+$')
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+# Файлы без хеша могут измениться при выкладке: кэшируем ненадолго
+# и перепроверяем по Last-Modified.
+MUTABLE_CACHE_CONTROL = 'public, max-age=3600'
+# Порядок предпочтения заранее сжатых копий.
+PRECOMPRESSED = (('br', '.br'), ('gzip', '.gz'))
+# Загруженные файлы не перезаписываются: новая картинка получает новое
+# имя. Сутки — запас на случай ручной замены файла на диске.
+MEDIA_CACHE_CONTROL = 'public, max-age=86400'
 
 
 def page_not_found(request, exception):
@@ -7,3 +37,126 @@ def page_not_found(request, exception):
 
 def csrf_failure(request, reason=''):
     return render(request, 'core/403csrf.html')
+
+
+@staff_member_required
+def view_metrics(request):
+    return HttpResponse(
+        registry.render_text(), content_type='text/plain; version=0.0.4'
+    )
+
+
+@require_safe
+def serve_static(request, path):
+    """Отдаёт собранную collectstatic статику без веб-сервера впереди.
+
+    Если клиент принимает br или gzip и рядом лежит сжатая копия,
+    отдаётся она. Имена с хешем кэшируются навсегда.
+    """
+    fullpath = _file_path(settings.STATIC_ROOT, path)
+    content_type, _ = mimetypes.guess_type(fullpath)
+    stat = os.stat(fullpath)
+    immutable = HASHED_NAME_RE.search(path) is not None
+    if not immutable and not was_modified_since(
+            request.META.get('HTTP_IF_MODIFIED_SINCE'),
+            stat.st_mtime, stat.st_size):
+        return HttpResponseNotModified()
+
+    encoding = None
+    accepted = accepted_encodings(request)
+    for coding, extension in PRECOMPRESSED:
+        if coding in accepted and os.path.isfile(fullpath + extension):
+            encoding = coding
+            fullpath += extension
+            break
+
+    response = FileResponse(
+        open(fullpath, 'rb'),
+        content_type=content_type or 'application/octet-stream')
+    if encoding:
+        response['Content-Encoding'] = encoding
+    response['Vary'] = 'Accept-Encoding'
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    response['Cache-Control'] = (
+        IMMUTABLE_CACHE_CONTROL if immutable else MUTABLE_CACHE_CONTROL)
+    return response
+
+
+@require_safe
+def serve_media(request, path):
+    """Отдаёт загруженные файлы из MEDIA_ROOT.
+
+    С MEDIA_SENDFILE_HEADER файл отдаёт веб-сервер (X-Sendfile у Apache
+    и lighttpd, X-Accel-Redirect у nginx), Python только проверяет путь.
+    Иначе — FileResponse с поддержкой Range, ETag и If-Modified-Since.
+    """
+    fullpath = _file_path(settings.MEDIA_ROOT, path)
+    stat = os.stat(fullpath)
+    etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    content_type, _ = mimetypes.guess_type(fullpath)
+    content_type = content_type or 'application/octet-stream'
+    # 304 и 412 по If-None-Match, If-Modified-Since и их парам.
+    response = get_conditional_response(
+        request, etag=etag, last_modified=int(stat.st_mtime))
+    if response is None and settings.MEDIA_SENDFILE_HEADER:
+        response = _sendfile_response(fullpath, path, content_type)
+    elif response is None:
+        response = _file_response(
+            request, fullpath, stat, etag, content_type)
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    response['Cache-Control'] = MEDIA_CACHE_CONTROL
+    return response
+
+
+def _file_path(root, path):
+    try:
+        fullpath = safe_join(root, path)
+    except SuspiciousFileOperation:
+        raise Http404
+    if not os.path.isfile(fullpath):
+        raise Http404
+    return fullpath
+
+
+def _sendfile_response(fullpath, path, content_type):
+    """Пустой ответ, тело которого подставит веб-сервер."""
+    header = settings.MEDIA_SENDFILE_HEADER
+    response = HttpResponse(content_type=content_type)
+    if header.lower() == 'x-accel-redirect':
+        # nginx ищет файл в internal-location по URI, а не по пути.
+        response[header] = settings.MEDIA_ACCEL_REDIRECT_PREFIX + quote(path)
+    else:
+        response[header] = fullpath
+    return response
+
+
+def _file_response(request, fullpath, stat, etag, content_type):
+    """Файл целиком или диапазон из Range; 416 для диапазона вне файла."""
+    size = stat.st_size
+    requested = request.META.get('HTTP_RANGE')
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if requested and if_range and if_range != etag and (
+            parse_http_date_safe(if_range) != int(stat.st_mtime)):
+        # Файл изменился с тех пор, как клиент скачал начало.
+        requested = None
+    try:
+        byte_range = requested and parse_range(requested, size)
+    except ValueError:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    file = open(fullpath, 'rb')
+    if not byte_range:
+        response = FileResponse(file, content_type=content_type)
+    else:
+        start, length = byte_range
+        response = FileResponse(
+            RangeFile(file, start, length), content_type=content_type,
+            status=206)
+        response['Content-Length'] = str(length)
+        response['Content-Range'] = (
+            f'bytes {start}-{start + length - 1}/{size}')
+    response['Accept-Ranges'] = 'bytes'
+    return response
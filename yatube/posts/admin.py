@@ -1,6 +1,114 @@
-from django.contrib import admin
+import hashlib
+from datetime import date, datetime, time, timedelta
 
+from django.contrib import admin, messages
+from django.contrib.admin import helpers
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.db.models import Max, Min, QuerySet
+from django.forms import BaseModelFormSet
+from django.template.response import TemplateResponse
+from django.utils import timezone
+
+from .bulk import delete_posts, ungroup_posts
+from .cache import INDEX_FEED, get_feed_version
 from .models import Group, Post
+from .paginators import CachedCountPaginator
+from .search import search_posts
+
+
+def _next_period(day, kind):
+    if kind == 'year':
+        return date(day.year + 1, 1, 1)
+    if kind == 'month':
+        return date(day.year + day.month // 12, day.month % 12 + 1, 1)
+    return day + timedelta(days=1)
+
+
+def _period_start(day, kind):
+    if kind == 'year':
+        return day.replace(month=1, day=1)
+    if kind == 'month':
+        return day.replace(day=1)
+    return day
+
+
+class IndexedDatesQuerySet(QuerySet):
+    """Запросы date_hierarchy, которым хватает поисков по индексу.
+
+    Тег date_hierarchy берёт границы через MIN и MAX одним запросом,
+    а годы, месяцы и дни — через DISTINCT от усечённой даты: оба
+    варианта читают весь индекс pub_date. Здесь границы — два поиска,
+    а периоды — прыжки к первой записи следующего периода: запросов
+    столько, сколько периодов на экране.
+    """
+
+    def _edge(self, field_name, ordering):
+        return self.order_by(ordering).values_list(
+            field_name, flat=True).first()
+
+    def aggregate(self, *args, **kwargs):
+        first, last = kwargs.get('first'), kwargs.get('last')
+        if args or len(kwargs) != 2 or not (
+                isinstance(first, Min) and isinstance(last, Max)):
+            return super().aggregate(*args, **kwargs)
+        field_name = first.source_expressions[0].name
+        return {
+            'first': self._edge(field_name, field_name),
+            'last': self._edge(field_name, f'-{field_name}'),
+        }
+
+    def dates(self, field_name, kind, order='ASC'):
+        if kind not in ('year', 'month', 'day'):
+            return super().dates(field_name, kind, order)
+        values = self.order_by(field_name).values_list(field_name, flat=True)
+        periods = []
+        value = values.first()
+        while value is not None:
+            if timezone.is_aware(value):
+                value = timezone.localtime(value)
+            start = _period_start(value.date(), kind)
+            periods.append(start)
+            boundary = datetime.combine(_next_period(start, kind), time.min)
+            if timezone.is_aware(value):
+                boundary = timezone.make_aware(boundary)
+            value = values.filter(**{f'{field_name}__gte': boundary}).first()
+        return periods if order == 'ASC' else periods[::-1]
+
+
+class RowAutocompleteSelect(AutocompleteSelect):
+    """Автокомплит, который берёт подпись выбранного значения из уже
+    загруженного объекта, если он задан в selected_object.
+
+    Обычный AutocompleteSelect делает на каждую строку list_editable
+    отдельный запрос за подписью.
+    """
+    selected_object = None
+
+    def optgroups(self, name, value, attr=None):
+        selected = self.selected_object
+        if selected is None or [str(selected.pk)] != [str(v) for v in value]:
+            return super().optgroups(name, value, attr)
+        options = []
+        if not self.is_required:
+            options.append(self.create_option(name, '', '', False, 0))
+        options.append(self.create_option(
+            name, selected.pk, self.choices.field.label_from_instance(
+                selected), True, len(options)))
+        return [(None, options, 0)]
+
+
+class SelectedObjectsFormSet(BaseModelFormSet):
+    """Формы list_editable получают связанные объекты строки, которые
+    changelist уже загрузил через list_select_related.
+    """
+
+    def _construct_form(self, i, **kwargs):
+        form = super()._construct_form(i, **kwargs)
+        for name, field in form.fields.items():
+            widget = getattr(field.widget, 'widget', field.widget)
+            if isinstance(widget, RowAutocompleteSelect) and form.instance.pk:
+                widget.selected_object = getattr(form.instance, name)
+        return form
 
 
 @admin.register(Post)
@@ -13,14 +121,92 @@ class PostAdmin(admin.ModelAdmin):
         'group',
     )
     list_editable = ('group',)
+    list_select_related = ('author', 'group')
+    autocomplete_fields = ('author', 'group')
     search_fields = ('text',)
     list_filter = ('pub_date',)
+    date_hierarchy = 'pub_date'
+    # Без второго COUNT(*) по всей таблице под результатами фильтра.
+    show_full_result_count = False
+    actions = ('delete_selected_posts', 'remove_from_group')
     empty_value_display = '-пусто-'
 
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        return IndexedDatesQuerySet(
+            self.model, query=queryset.query, using=queryset.db)
+
+    def get_actions(self, request):
+        # Стандартное удаление грузит каждый пост и шлёт по нему сигналы.
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
+    def get_search_results(self, request, queryset, search_term):
+        # Вместо LIKE по всей таблице ищем через полнотекстовый индекс.
+        if not search_term:
+            return queryset, False
+        return search_posts(search_term, queryset), False
+
+    def get_paginator(self, request, queryset, per_page, orphans=0,
+                      allow_empty_first_page=True):
+        # COUNT(*) по фильтру кэшируется до изменения любой ленты.
+        query = request.GET.copy()
+        query.pop('p', None)
+        return CachedCountPaginator(
+            queryset, per_page, orphans=orphans,
+            allow_empty_first_page=allow_empty_first_page,
+            count_key=':'.join((
+                'admin', get_feed_version(INDEX_FEED),
+                hashlib.md5(query.urlencode().encode()).hexdigest(),
+            )),
+        )
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name in self.autocomplete_fields:
+            kwargs['widget'] = RowAutocompleteSelect(
+                db_field.remote_field, self.admin_site,
+                using=kwargs.get('using'))
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+    def get_changelist_formset(self, request, **kwargs):
+        kwargs.setdefault('formset', SelectedObjectsFormSet)
+        return super().get_changelist_formset(request, **kwargs)
+
+    def delete_selected_posts(self, request, queryset):
+        if request.POST.get('post'):
+            deleted = delete_posts(queryset)
+            self.message_user(
+                request, f'Удалено постов: {deleted}.', messages.SUCCESS)
+            return None
+        return TemplateResponse(
+            request, 'admin/posts/post/delete_posts_confirmation.html', {
+                **self.admin_site.each_context(request),
+                'title': 'Удалить посты?',
+                'opts': self.model._meta,
+                'count': queryset.count(),
+                'selected': request.POST.getlist(
+                    helpers.ACTION_CHECKBOX_NAME),
+                'select_across': request.POST.get('select_across', '0'),
+                'action_checkbox_name': helpers.ACTION_CHECKBOX_NAME,
+                'media': self.media,
+            })
+    delete_selected_posts.allowed_permissions = ('delete',)
+    delete_selected_posts.short_description = 'Удалить выбранные посты'
+
+    def remove_from_group(self, request, queryset):
+        updated = ungroup_posts(queryset)
+        self.message_user(
+            request, f'Убрано из групп постов: {updated}.', messages.SUCCESS)
+    remove_from_group.allowed_permissions = ('change',)
+    remove_from_group.short_description = 'Убрать выбранные посты из групп'
+
 
 @admin.register(Group)
 class GroupAdmin(admin.ModelAdmin):
-    list_display = ('pk', 'title', 'slug', 'description',)
+    list_display = ('pk', 'title', 'slug', 'description', 'posts_count')
     list_editable = ('description',)
-    search_fields = ('title',)
-    eempty_value_display = '-пусто-'
+    # По ним же ищет автокомплит группы в PostAdmin.
+    search_fields = ('title', 'slug')
+    show_full_result_count = False
+    empty_value_display = '-пусто-'
@@ -3,3 +3,11 @@ from django.apps import AppConfig
 
 class PostsConfig(AppConfig):
     name = 'posts'
+
+    def ready(self):
+        from core.metrics import registry
+
+        from . import signals  # noqa: F401
+        from .lookups import render_metrics
+
+        registry.add_collector(render_metrics)
@@ -0,0 +1,86 @@
+from contextlib import contextmanager
+
+from django.db import transaction
+
+from .cache import (ALL_FEEDS, INDEX_FEED, author_feed, bump_feed_version,
+                    group_feed)
+from .counters import rebuild_counters, recount_posts
+from .images import rebuild_image_refs, release_images
+from .models import Post, TimelineEntry
+from .timeline import rebuild_timelines
+
+
+@contextmanager
+def explicit_pub_date(updated=False):
+    # bulk_create вызывает pre_save, и auto_now_add затёр бы даты.
+    # С updated=True auto_now не трогает и заданную дату изменения.
+    pub_date_field = Post._meta.get_field('pub_date')
+    updated_field = Post._meta.get_field('updated')
+    pub_date_field.auto_now_add = False
+    updated_field.auto_now = not updated
+    try:
+        yield
+    finally:
+        pub_date_field.auto_now_add = True
+        updated_field.auto_now = True
+
+
+def finish_bulk_load():
+    """bulk_create не шлёт сигналов: выравниваем счётчики, ссылки
+    на картинки, ленты подписок и кэш лент.
+    """
+    rebuild_counters()
+    rebuild_image_refs()
+    rebuild_timelines()
+    bump_feed_version(ALL_FEEDS)
+
+
+def _affected(queryset):
+    """Авторы и группы выбранных постов одним запросом."""
+    pairs = queryset.order_by().values_list(
+        'author_id', 'group_id').distinct()
+    author_ids, group_ids = set(), set()
+    for author_id, group_id in pairs:
+        author_ids.add(author_id)
+        if group_id:
+            group_ids.add(group_id)
+    return author_ids, group_ids
+
+
+def _finish_bulk_change(author_ids, group_ids):
+    recount_posts(author_ids, group_ids)
+    transaction.on_commit(lambda: bump_feed_version(
+        INDEX_FEED,
+        *(author_feed(pk) for pk in author_ids),
+        *(group_feed(pk) for pk in group_ids),
+    ))
+
+
+@transaction.atomic
+def delete_posts(queryset):
+    """Удаляет посты одним DELETE вместо загрузки и сигнала на каждый.
+
+    Сигналы post_delete не шлются: счётчики затронутых авторов и групп
+    пересчитываются, их ленты сбрасываются, ссылки на картинки
+    снимаются. Возвращает число постов.
+    """
+    author_ids, group_ids = _affected(queryset)
+    selected = Post.objects.filter(pk__in=queryset.order_by().values('pk'))
+    images = list(selected.exclude(image='').values_list('image', flat=True))
+    # Строки лент подписок ссылаются на посты — удаляем их первыми.
+    TimelineEntry.objects.filter(post__in=selected.values('pk')).delete()
+    deleted = selected._raw_delete(selected.db)
+    release_images(images)
+    _finish_bulk_change(author_ids, group_ids)
+    return deleted
+
+
+@transaction.atomic
+def ungroup_posts(queryset):
+    """Убирает посты из групп одним UPDATE. Возвращает число постов."""
+    author_ids, group_ids = _affected(queryset)
+    updated = Post.objects.filter(
+        pk__in=queryset.order_by().values('pk'), group__isnull=False,
+    ).update(group=None)
+    _finish_bulk_change(author_ids, group_ids)
+    return updated
@@ -0,0 +1,79 @@
+import hashlib
+import time
+from datetime import datetime, timezone
+
+from django.core.cache import cache
+
+FEED_VERSION_KEY = 'posts:feed_version:{}'
+FEED_MODIFIED_KEY = 'posts:feed_modified:{}'
+# Общая версия всех лент: меняется при правке групп, чьи слаги есть
+# в каждой ленте.
+ALL_FEEDS = 'all'
+INDEX_FEED = 'index'
+PAGE_PARAMS = ('page', 'after', 'before')
+
+
+def group_feed(group_id):
+    return f'group:{group_id}'
+
+
+def author_feed(author_id):
+    return f'author:{author_id}'
+
+
+def get_feed_version(*feeds):
+    keys = [FEED_VERSION_KEY.format(feed) for feed in (ALL_FEEDS,) + feeds]
+    versions = cache.get_many(keys)
+    return '.'.join(str(versions.get(key, 0)) for key in keys)
+
+
+def bump_feed_version(*feeds):
+    now = time.time()
+    cache.set_many(
+        {FEED_MODIFIED_KEY.format(feed): now for feed in feeds},
+        timeout=None,
+    )
+    for feed in feeds:
+        key = FEED_VERSION_KEY.format(feed)
+        # add() не перезапишет существующий счётчик, incr() сдвинет его.
+        cache.add(key, 0, timeout=None)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=None)
+
+
+def feed_cache_key(request, *feeds):
+    """Ключ фрагмента ленты: версии лент плюс страница или курсор."""
+    page = '&'.join(
+        f'{param}={request.GET[param]}'
+        for param in PAGE_PARAMS if request.GET.get(param)
+    )
+    return f'{get_feed_version(*feeds)}:{page}'
+
+
+def get_feed_last_modified(*feeds):
+    """Время последнего изменения лент без обращения к БД.
+
+    Если отметки нет в кэше (кэш очищен), считаем ленту изменённой
+    сейчас: клиент один раз получит полный ответ.
+    """
+    keys = [FEED_MODIFIED_KEY.format(feed) for feed in (ALL_FEEDS,) + feeds]
+    stamps = cache.get_many(keys)
+    now = time.time()
+    for key in keys:
+        if key not in stamps:
+            cache.add(key, now, timeout=None)
+            stamps[key] = cache.get(key, now)
+    return datetime.fromtimestamp(max(stamps.values()), timezone.utc)
+
+
+def feed_etag(request, *feeds):
+    """ETag страницы ленты: версии лент, страница и пользователь.
+
+    Отметка времени не даёт совпасть ETag после сброса кэша, когда
+    счётчики версий начинаются заново.
+    """
+    modified = get_feed_last_modified(*feeds).timestamp()
+    raw = f'{feed_cache_key(request, *feeds)}:{request.user.pk}:{modified}'
+    return hashlib.md5(raw.encode()).hexdigest()
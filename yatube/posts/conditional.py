@@ -0,0 +1,87 @@
+import hashlib
+
+from .cache import (INDEX_FEED, author_feed, feed_etag,
+                    get_feed_last_modified, group_feed)
+from .lookups import get_author, get_group
+from .models import Post
+
+
+# Валидаторы условных GET считаются без рендеринга шаблона: для лент —
+# по отметкам в кэше, которые двигают сигналы, для поста — по updated
+# и отметке ленты автора: страница поста выводит счётчик постов автора
+# и название группы, а они меняются без правки самого поста.
+
+
+def _memoize(request, key, func):
+    # etag_func и last_modified_func вызываются для одного запроса
+    # по очереди, поэтому результат поиска в БД храним на request.
+    cache = request.__dict__.setdefault('_conditional_cache', {})
+    if key not in cache:
+        cache[key] = func()
+    return cache[key]
+
+
+def _group_feeds(request, slug):
+    group = _memoize(request, ('group', slug), lambda: get_group(slug))
+    return None if group is None else (group_feed(group.pk),)
+
+
+def _author_feeds(request, username):
+    author = _memoize(
+        request, ('author', username), lambda: get_author(username))
+    return None if author is None else (author_feed(author.pk),)
+
+
+def _post_state(request, post_id):
+    def load():
+        state = Post.objects.filter(pk=post_id).values_list(
+            'updated', 'author_id', 'author__counter__posts_count').first()
+        if state is None:
+            return None
+        updated, author_id, count = state
+        # Правка групп двигает общую отметку ALL_FEEDS, она входит сюда.
+        feeds_modified = get_feed_last_modified(author_feed(author_id))
+        return max(updated, feeds_modified), count
+    return _memoize(request, ('post', post_id), load)
+
+
+def index_etag(request):
+    return feed_etag(request, INDEX_FEED)
+
+
+def index_last_modified(request):
+    return get_feed_last_modified(INDEX_FEED)
+
+
+def group_etag(request, slug):
+    feeds = _group_feeds(request, slug)
+    return feeds and feed_etag(request, *feeds)
+
+
+def group_last_modified(request, slug):
+    feeds = _group_feeds(request, slug)
+    return feeds and get_feed_last_modified(*feeds)
+
+
+def profile_etag(request, username):
+    feeds = _author_feeds(request, username)
+    return feeds and feed_etag(request, *feeds)
+
+
+def profile_last_modified(request, username):
+    feeds = _author_feeds(request, username)
+    return feeds and get_feed_last_modified(*feeds)
+
+
+def post_etag(request, post_id):
+    state = _post_state(request, post_id)
+    if state is None:
+        return None
+    modified, count = state
+    raw = f'{post_id}:{modified.timestamp()}:{count}:{request.user.pk}'
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def post_last_modified(request, post_id):
+    state = _post_state(request, post_id)
+    return state and state[0]
@@ -0,0 +1,106 @@
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .lookups import author_cache, group_cache
+from .models import AuthorCounter, Follow, Group, Post, User
+
+
+def change_author_count(author_id, delta):
+    if delta > 0:
+        # При удалении автора строку не создаём: она уйдёт каскадом.
+        AuthorCounter.objects.get_or_create(author_id=author_id)
+    AuthorCounter.objects.filter(author_id=author_id).update(
+        posts_count=F('posts_count') + delta
+    )
+    # Закэшированный автор несёт счётчик — сбрасываем после коммита.
+    transaction.on_commit(lambda: author_cache.discard_pk(author_id))
+
+
+def change_followers_count(author_id, delta):
+    if delta > 0:
+        AuthorCounter.objects.get_or_create(author_id=author_id)
+    AuthorCounter.objects.filter(author_id=author_id).update(
+        followers_count=F('followers_count') + delta
+    )
+    transaction.on_commit(lambda: author_cache.discard_pk(author_id))
+
+
+def change_group_count(group_id, delta):
+    Group.objects.filter(pk=group_id).update(
+        posts_count=F('posts_count') + delta
+    )
+    transaction.on_commit(lambda: group_cache.discard_pk(group_id))
+
+
+def get_author_posts_count(author):
+    try:
+        return author.counter.posts_count
+    except AuthorCounter.DoesNotExist:
+        return 0
+
+
+def _count_subquery(model, field, outer='pk'):
+    return Coalesce(Subquery(
+        model.objects.filter(**{field: OuterRef(outer)})
+        .order_by().values(field)
+        .annotate(total=Count('pk')).values('total'),
+        output_field=IntegerField(),
+    ), 0)
+
+
+def find_counter_mismatches():
+    """Возвращает список (объект, счётчик, его значение, реальное)."""
+    checks = (
+        ('постов', User.objects.annotate(
+            real_count=_count_subquery(Post, 'author'),
+            stored_count=Coalesce('counter__posts_count', 0),
+        )),
+        ('подписчиков', User.objects.annotate(
+            real_count=_count_subquery(Follow, 'author'),
+            stored_count=Coalesce('counter__followers_count', 0),
+        )),
+        ('постов', Group.objects.annotate(
+            real_count=_count_subquery(Post, 'group'),
+            stored_count=F('posts_count'),
+        )),
+    )
+    mismatches = []
+    for label, queryset in checks:
+        for obj in queryset.exclude(real_count=F('stored_count')):
+            mismatches.append(
+                (obj, label, obj.stored_count, obj.real_count))
+    return mismatches
+
+
+def recount_posts(author_ids=(), group_ids=()):
+    """Пересчитывает счётчики постов только у перечисленных авторов и
+    групп — по одному UPDATE на таблицу.
+    """
+    author_ids, group_ids = set(author_ids), set(group_ids)
+    AuthorCounter.objects.filter(author_id__in=author_ids).update(
+        posts_count=_count_subquery(Post, 'author', outer='author'))
+    Group.objects.filter(pk__in=group_ids).update(
+        posts_count=_count_subquery(Post, 'group'))
+
+    def discard():
+        for author_id in author_ids:
+            author_cache.discard_pk(author_id)
+        for group_id in group_ids:
+            group_cache.discard_pk(group_id)
+    transaction.on_commit(discard)
+
+
+@transaction.atomic
+def rebuild_counters():
+    missing = User.objects.filter(counter__isnull=True).values_list(
+        'pk', flat=True)
+    AuthorCounter.objects.bulk_create(
+        AuthorCounter(author_id=pk) for pk in missing)
+    AuthorCounter.objects.update(
+        posts_count=_count_subquery(Post, 'author', outer='author'),
+        followers_count=_count_subquery(Follow, 'author', outer='author'),
+    )
+    Group.objects.update(posts_count=_count_subquery(Post, 'group'))
+    transaction.on_commit(author_cache.clear)
+    transaction.on_commit(group_cache.clear)
@@ -1,17 +1,27 @@
+from django.core.files.uploadedfile import UploadedFile
 from django.forms import ModelForm
 from django.forms import Textarea
 
+from .images import process_image
 from .models import Post
 
 
 class PostForm(ModelForm):
     class Meta:
         model = Post
-        fields = ['text', 'group']
+        fields = ['text', 'group', 'image']
         labels = {
             'text': 'Текст поста',
-            'group': 'Группы'
+            'group': 'Группы',
+            'image': 'Картинка',
         }
         widgets = {
             'text': Textarea(attrs={'style': 'height: 193px;'}),
         }
+
+    def clean_image(self):
+        image = self.cleaned_data.get('image')
+        # Перекодируем только новую загрузку, а не уже сохранённый файл.
+        if isinstance(image, UploadedFile):
+            return process_image(image)
+        return image
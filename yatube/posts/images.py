@@ -0,0 +1,144 @@
+import logging
+import os
+from collections import Counter
+from io import BytesIO
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models import Count, F, Value
+from django.db.models.functions import Greatest
+from PIL import Image, ImageOps
+from sorl.thumbnail import delete as delete_thumbnails
+
+from .models import Post, StoredImage
+from .thumbnails import image_source
+
+logger = logging.getLogger(__name__)
+
+OUTPUT_FORMAT = 'JPEG'
+OUTPUT_EXTENSION = '.jpg'
+QUALITY_STEPS = (85, 75, 65, 50)
+
+
+def _open_capped(upload, max_size):
+    upload.seek(0)
+    try:
+        # open() читает только заголовок: размеры известны до декодирования.
+        image = Image.open(upload)
+        if image.width * image.height > Image.MAX_IMAGE_PIXELS:
+            raise ValidationError('Слишком большое изображение.')
+        # Для JPEG декодер сразу уменьшает картинку кратно 1/2..1/8.
+        image.draft('RGB', max_size)
+        image.load()
+    except (OSError, Image.DecompressionBombError):
+        raise ValidationError('Загрузите корректное изображение.')
+    return image
+
+
+def _flatten(image):
+    # EXIF-поворот применяем до удаления метаданных.
+    image = ImageOps.exif_transpose(image)
+    if image.mode in ('RGBA', 'LA') or 'transparency' in image.info:
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def process_image(upload):
+    """Уменьшает, очищает от метаданных и перекодирует загрузку.
+
+    Возвращает ContentFile в JPEG не больше POSTS_IMAGE_MAX_BYTES.
+    """
+    max_size = settings.POSTS_IMAGE_MAX_SIZE
+    image = _open_capped(upload, max_size)
+    image = _flatten(image)
+    image.thumbnail(max_size, Image.LANCZOS)
+
+    for quality in QUALITY_STEPS:
+        buffer = BytesIO()
+        # Новый файл пишется без exif/icc: метаданные не переносятся.
+        image.save(buffer, OUTPUT_FORMAT, quality=quality,
+                   optimize=True, progressive=True)
+        if buffer.tell() <= settings.POSTS_IMAGE_MAX_BYTES:
+            break
+    else:
+        raise ValidationError('Изображение слишком велико после сжатия.')
+
+    name = os.path.splitext(os.path.basename(upload.name))[0]
+    return ContentFile(buffer.getvalue(), name=name + OUTPUT_EXTENSION)
+
+
+def _count_names(names):
+    return Counter(name for name in names if name)
+
+
+def acquire_images(names):
+    """Добавляет по ссылке на каждое имя картинки из names."""
+    for name, count in _count_names(names).items():
+        StoredImage.objects.get_or_create(name=name)
+        StoredImage.objects.filter(name=name).update(
+            refcount=F('refcount') + count)
+
+
+def keep_image_file(name, content):
+    """Проверяет после коммита, что файл картинки на месте.
+
+    Хранилище не пишет файл, который уже есть. Если его последнюю
+    ссылку только что сняли, delete_image_files другого запроса может
+    не увидеть нашу ещё не закоммиченную ссылку и удалить файл —
+    тогда записываем его заново из загрузки.
+    """
+    storage = Post._meta.get_field('image').storage
+
+    def restore():
+        try:
+            storage.restore(name, content)
+        except OSError:
+            logger.exception('Не удалось восстановить картинку %s', name)
+    transaction.on_commit(restore)
+
+
+def release_images(names):
+    """Снимает по ссылке с каждого имени; файлы без ссылок удаляются
+    после коммита транзакции.
+    """
+    counts = _count_names(names)
+    for name, count in counts.items():
+        # Greatest не даёт уйти в минус, если счётчик разошёлся с постами.
+        StoredImage.objects.filter(name=name).update(
+            refcount=Greatest(F('refcount') - count, Value(0)))
+    orphans = StoredImage.objects.filter(name__in=counts, refcount=0)
+    names = list(orphans.values_list('name', flat=True))
+    if names:
+        orphans.delete()
+        transaction.on_commit(lambda: delete_image_files(names))
+
+
+def delete_image_files(names):
+    """Удаляет файлы картинок и их миниатюры, если на них снова никто
+    не сослался: та же картинка могла быть загружена заново.
+    """
+    storage = Post._meta.get_field('image').storage
+    used = set(StoredImage.objects.filter(
+        name__in=names).values_list('name', flat=True))
+    for name in names:
+        if name not in used:
+            delete_thumbnails(image_source(name), delete_file=False)
+            storage.delete(name)
+
+
+@transaction.atomic
+def rebuild_image_refs():
+    StoredImage.objects.all().delete()
+    references = (
+        Post.objects.exclude(image='').order_by().values('image')
+        .annotate(total=Count('pk')).values_list('image', 'total')
+    )
+    StoredImage.objects.bulk_create(
+        StoredImage(name=name, refcount=total)
+        for name, total in references.iterator()
+    )
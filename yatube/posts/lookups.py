@@ -0,0 +1,111 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import connection
+from django.http import Http404
+
+from .models import Group, User
+
+
+class LRUCache:
+    """Ограниченный LRU-кэш с TTL, свой в каждом процессе.
+
+    Отдаёт одни и те же объекты всем запросам, поэтому закэшированные
+    экземпляры моделей нельзя менять. None не кэшируется.
+    """
+
+    def __init__(self, maxsize, ttl, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._data = OrderedDict()
+
+    def get_or_load(self, key, loader):
+        now = self.clock()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] > now:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        value = loader()
+        # Внутри незавершённой транзакции строка ещё может откатиться.
+        if value is None or self.ttl <= 0 or connection.in_atomic_block:
+            return value
+        with self._lock:
+            self._data[key] = (now + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return value
+
+    def discard_pk(self, pk):
+        # Ключ (слаг, имя) мог смениться, поэтому ищем по pk.
+        with self._lock:
+            for key in [key for key, (_, value) in self._data.items()
+                        if value.pk == pk]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses,
+                    'size': len(self._data)}
+
+
+group_cache = LRUCache(settings.POSTS_LOOKUP_CACHE_SIZE,
+                       settings.POSTS_LOOKUP_CACHE_TTL)
+author_cache = LRUCache(settings.POSTS_LOOKUP_CACHE_SIZE,
+                        settings.POSTS_LOOKUP_CACHE_TTL)
+CACHES = (('group', group_cache), ('author', author_cache))
+
+
+def get_group(slug):
+    return group_cache.get_or_load(
+        slug, lambda: Group.objects.filter(slug=slug).first())
+
+
+def get_author(username):
+    # Счётчик постов выводится в профиле, поэтому берём его сразу.
+    return author_cache.get_or_load(
+        username, lambda: User.objects.select_related('counter')
+        .filter(username=username).first())
+
+
+def get_group_or_404(slug):
+    group = get_group(slug)
+    if group is None:
+        raise Http404('Группа не найдена.')
+    return group
+
+
+def get_author_or_404(username):
+    author = get_author(username)
+    if author is None:
+        raise Http404('Автор не найден.')
+    return author
+
+
+def render_metrics():
+    """Строки Prometheus со счётчиками попаданий и промахов."""
+    lines = []
+    for name, help_text in (
+            ('hits', 'Попадания в кэш групп и авторов'),
+            ('misses', 'Промахи кэша групп и авторов')):
+        metric = f'yatube_lookup_cache_{name}_total'
+        lines.append(f'# HELP {metric} {help_text}')
+        lines.append(f'# TYPE {metric} counter')
+        for cache_name, lookup_cache in CACHES:
+            lines.append(
+                f'{metric}{{cache="{cache_name}"}} '
+                f'{lookup_cache.stats()[name]}')
+    return lines
@@ -0,0 +1,52 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from posts.models import Post
+from posts.thumbnails import generate_thumbnails
+
+
+class Command(BaseCommand):
+    help = 'Создаёт миниатюры для уже загруженных картинок постов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Число процессов (по умолчанию — по числу ядер).',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=32,
+            help='Сколько картинок отдавать процессу за раз.',
+        )
+
+    def handle(self, *args, **options):
+        names = list(
+            Post.objects.exclude(image='').order_by()
+            .values_list('image', flat=True).distinct()
+        )
+        started = time.monotonic()
+        workers = max(options['workers'], 1)
+        if workers == 1:
+            results = [generate_thumbnails(name) for name in names]
+        else:
+            # Дочерние процессы не должны делить открытые соединения.
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(
+                    generate_thumbnails, names,
+                    chunksize=options['chunk_size'],
+                ))
+
+        failed = results.count(False)
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            f'Картинок: {len(names)}, ошибок: {failed}, '
+            f'процессов: {workers}, {elapsed:.1f} с.'
+        )
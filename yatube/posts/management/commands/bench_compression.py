@@ -0,0 +1,48 @@
+import random
+
+from django.core.management.base import BaseCommand
+from django.test import Client
+
+from core import compression
+from core.benchmarks import measure_calls
+
+from .bench_views import Command as BenchViewsCommand
+
+LEVELS = {'gzip': (1, 6, 9), 'br': (1, 4, 5, 8, 11)}
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает уровни gzip и brotli на страницах index, group_list, '
+        'profile и post_detail: время сжатия одного ответа (p50, мс) '
+        'против сэкономленных байт.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeats', type=int, default=50)
+        parser.add_argument('--seed', type=int, default=None)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        client = Client()
+        pages = {
+            name: client.get(urls[0]).content
+            for name, urls in BenchViewsCommand().get_urls(
+                rng, 1, 1).items()
+        }
+        self.stdout.write(
+            f'{"view":<12} {"codec":<6} {"байт":>8} {"сжато":>8} '
+            f'{"экономия":>9} {"p50, мс":>8} {"КБ/мс":>7}')
+        for name, body in pages.items():
+            for coding in compression.ENCODINGS:
+                for level in LEVELS[coding]:
+                    compressed = compression.compress(coding, body, level)
+                    timing = measure_calls(
+                        [lambda: compression.compress(coding, body, level)]
+                        * options['repeats'])['p50']
+                    saved = len(body) - len(compressed)
+                    self.stdout.write(
+                        f'{name:<12} {coding + str(level):<6} '
+                        f'{len(body):>8} {len(compressed):>8} '
+                        f'{saved / len(body):>9.1%} {timing:>8.3f} '
+                        f'{saved / 1024 / max(timing, 1e-6):>7.0f}')
@@ -0,0 +1,58 @@
+import random
+
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from core.benchmarks import format_report, measure
+from posts.models import User
+
+from .bench_throughput import FEED_VIEWS
+from .bench_views import Command as BenchViewsCommand
+
+# Как было до кэша: сессия в БД, пользователь из БД на каждый запрос.
+DB_MODE = {
+    'SESSION_ENGINE': 'django.contrib.sessions.backends.db',
+    'AUTHENTICATION_BACKENDS': ['django.contrib.auth.backends.ModelBackend'],
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает ленты для вошедшего пользователя с сессией и '
+        'пользователем из БД и из кэша: p50/p95/p99 и SQL-запросы.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--warmup', type=int, default=10)
+        parser.add_argument('--seed', type=int, default=None)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        urls = BenchViewsCommand().get_urls(rng, options['requests'], 1)
+        urls = {name: urls[name] for name in FEED_VIEWS}
+        urls['follow_index'] = (
+            [reverse('posts:follow_index')] * options['requests'])
+        user = User.objects.order_by('pk').first()
+
+        with override_settings(**DB_MODE):
+            db = self.measure(user, urls, options['warmup'])
+        cached = self.measure(user, urls, options['warmup'])
+
+        results = {}
+        for name in urls:
+            results[f'{name} (db)'] = db[name]
+            results[f'{name} (cached)'] = cached[name]
+        self.stdout.write(format_report(results))
+        for name in urls:
+            saved = db[name]['queries'] - cached[name]['queries']
+            self.stdout.write(f'{name}: минус {saved:.2f} запроса на запрос')
+
+    def measure(self, user, urls, warmup):
+        client = Client()
+        client.force_login(user)
+        return {
+            name: measure(client, view_urls, warmup=warmup)
+            for name, view_urls in urls.items()
+        }
@@ -0,0 +1,91 @@
+import re
+import tempfile
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.template.loader import render_to_string
+from django.test import RequestFactory, override_settings
+
+from core.views import serve_static
+
+PLAIN_STORAGE = 'django.contrib.staticfiles.storage.StaticFilesStorage'
+PIPELINE_STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
+# Страница на base.html без обращений к БД: набор статики тот же.
+PAGE_TEMPLATE = 'about/author.html'
+ACCEPT_ENCODING = 'gzip, deflate, br'
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает байты статики на первую и повторную загрузку страницы: '
+        'обычный collectstatic против имён с хешем, сжатых копий и '
+        'Cache-Control: immutable.'
+    )
+
+    def handle(self, *args, **options):
+        plain = self.measure(PLAIN_STORAGE, pipeline=False)
+        pipeline = self.measure(PIPELINE_STORAGE, pipeline=True)
+        self.stdout.write(
+            f'{"вариант":<10} {"загрузка":<10} {"запросов":>9} '
+            f'{"байт":>10}')
+        for name, result in (('plain', plain), ('pipeline', pipeline)):
+            for load in ('first', 'repeat'):
+                requests, size = result[load]
+                self.stdout.write(
+                    f'{name:<10} {load:<10} {requests:>9} {size:>10}')
+        first = pipeline['first'][1] / max(plain['first'][1], 1)
+        self.stdout.write(
+            f'Первая загрузка: {first:.0%} от обычной; повторная: '
+            f'{pipeline["repeat"][0]} запросов вместо '
+            f'{plain["repeat"][0]}.')
+
+    def measure(self, storage, pipeline):
+        """Запросов и байт тела ответа на первую и повторную загрузку."""
+        with tempfile.TemporaryDirectory() as root, override_settings(
+                DEBUG=False, STATIC_ROOT=root, STATICFILES_STORAGE=storage):
+            call_command('collectstatic', interactive=False, verbosity=0)
+            urls = self.page_assets(render_to_string(PAGE_TEMPLATE))
+            factory = RequestFactory()
+            headers = {'HTTP_ACCEPT_ENCODING': ACCEPT_ENCODING}
+            cached = {}
+            first = [0, 0]
+            for url in urls:
+                response = self.fetch(factory, url, pipeline and headers)
+                first[0] += 1
+                first[1] += self.body_size(response)
+                cached[url] = response
+            repeat = [0, 0]
+            for url, response in cached.items():
+                # Браузер не перепроверяет ответ с immutable до истечения
+                # max-age, остальное переспрашивает по If-Modified-Since.
+                if 'immutable' in response.get('Cache-Control', ''):
+                    continue
+                revalidate = {
+                    'HTTP_IF_MODIFIED_SINCE': response['Last-Modified']}
+                if pipeline:
+                    revalidate.update(headers)
+                response = self.fetch(factory, url, revalidate)
+                repeat[0] += 1
+                repeat[1] += self.body_size(response)
+        return {'first': tuple(first), 'repeat': tuple(repeat)}
+
+    @staticmethod
+    def page_assets(html):
+        pattern = r'(?:href|src)="({}[^"?]+)'.format(
+            re.escape(settings.STATIC_URL))
+        return list(dict.fromkeys(re.findall(pattern, html)))
+
+    @staticmethod
+    def fetch(factory, url, headers):
+        path = url[len(settings.STATIC_URL):]
+        return serve_static(factory.get(url, **(headers or {})), path)
+
+    @staticmethod
+    def body_size(response):
+        if not response.streaming:
+            return len(response.content)
+        size = sum(len(chunk) for chunk in response.streaming_content)
+        # Без response.close(): запроса нет, request_finished не нужен.
+        response.file_to_stream.close()
+        return size
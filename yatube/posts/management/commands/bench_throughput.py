@@ -0,0 +1,54 @@
+import os
+import random
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.benchmarks import (format_throughput_report, load_baseline,
+                             measure_throughput, save_baseline)
+
+from .bench_views import Command as BenchViewsCommand
+
+DEFAULT_BASELINE = os.path.join(
+    settings.BASE_DIR, 'benchmarks', 'throughput_baseline.json')
+FEED_VIEWS = ('index', 'group_list', 'profile')
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет пропускную способность лент (запросов в секунду) '
+        'через WSGI-обработчик с текущими настройками. Сравнение '
+        'профилей: сохранить базовую линию с yatube.settings и '
+        'запустить с DJANGO_SETTINGS_MODULE=yatube.settings_production.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--threads', type=int, default=4)
+        parser.add_argument('--warmup', type=int, default=10)
+        parser.add_argument(
+            '--max-page', type=int, default=1,
+            help='Страницы лент выбираются случайно из 1..max-page.')
+        parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+        parser.add_argument(
+            '--save-baseline', action='store_true',
+            help='Сохранить результат как новую базовую линию.')
+        parser.add_argument('--seed', type=int, default=None)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        urls = BenchViewsCommand().get_urls(
+            rng, options['requests'], options['max_page'])
+        results = {
+            name: measure_throughput(
+                urls[name], threads=options['threads'],
+                warmup=options['warmup'])
+            for name in FEED_VIEWS
+        }
+
+        baseline = load_baseline(options['baseline'])
+        self.stdout.write(f'Настройки: {settings.SETTINGS_MODULE}')
+        self.stdout.write(format_throughput_report(results, baseline))
+        if options['save_baseline']:
+            save_baseline(options['baseline'], results)
+            self.stdout.write(f'Базовая линия: {options["baseline"]}')
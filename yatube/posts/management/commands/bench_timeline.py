@@ -0,0 +1,106 @@
+import random
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test.utils import override_settings
+
+from core.benchmarks import format_report, measure_calls
+from posts.counters import rebuild_counters
+from posts.models import AuthorCounter, Follow, Post, User
+from posts.timeline import TimelinePaginator, naive_timeline, rebuild_timelines
+
+PER_PAGE = 10
+# «Раскладывать всем» — порог, который не пересечёт ни один автор.
+PUSH_ALL_LIMIT = 2 ** 31
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает ленту подписок по author__in (чтение без раскладки), '
+        'раскладку всем при записи и гибридную раскладку. Подписки '
+        'создаются по степенному закону, всё откатывается в конце.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=200)
+        parser.add_argument(
+            '--follows', type=int, default=20,
+            help='Сколько авторов читает каждый читатель.')
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--warmup', type=int, default=10)
+        parser.add_argument(
+            '--fanout-limit', type=int,
+            default=settings.POSTS_TIMELINE_FANOUT_LIMIT,
+            help='Порог гибридной раскладки по числу подписчиков.')
+        parser.add_argument('--seed', type=int, default=None)
+        parser.add_argument(
+            '--keep', action='store_true',
+            help='Сохранить созданные подписки и ленты.')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        with transaction.atomic():
+            self.run(rng, options)
+            if not options['keep']:
+                transaction.set_rollback(True)
+
+    def create_follows(self, rng, readers, follows):
+        # Популярные по числу постов авторы получают больше подписчиков.
+        authors = list(AuthorCounter.objects.order_by(
+            '-posts_count').values_list('author_id', flat=True))
+        users = list(User.objects.values_list('pk', flat=True))
+        if len(authors) < 2:
+            raise CommandError('Нет данных: сначала запустите seed_posts.')
+        weights = [1 / rank for rank in range(1, len(authors) + 1)]
+        reader_ids = rng.sample(users, min(readers, len(users)))
+        Follow.objects.bulk_create(
+            (Follow(user_id=reader, author_id=author)
+             for reader in reader_ids
+             for author in set(rng.choices(authors, weights, k=follows))
+             if author != reader),
+            ignore_conflicts=True,
+        )
+        rebuild_counters()
+        return reader_ids, authors, weights
+
+    def run(self, rng, options):
+        reader_ids, authors, weights = self.create_follows(
+            rng, options['readers'], options['follows'])
+        readers = list(User.objects.filter(pk__in=reader_ids))
+        requests = options['requests']
+        picked = [rng.choice(readers) for _ in range(requests)]
+        writers = rng.choices(authors, weights, k=requests)
+        limit = options['fanout_limit']
+        popular = AuthorCounter.objects.filter(
+            followers_count__gt=limit).count()
+        self.stdout.write(
+            f'Подписок: {Follow.objects.count()}, авторов выше порога '
+            f'{limit}: {popular}')
+
+        results = {}
+        for name, strategy_limit in (('push', PUSH_ALL_LIMIT),
+                                     ('hybrid', limit)):
+            with override_settings(
+                    POSTS_TIMELINE_FANOUT_LIMIT=strategy_limit):
+                started = time.monotonic()
+                rows = rebuild_timelines()
+                self.stdout.write(
+                    f'{name}: строк в лентах {rows}, пересборка '
+                    f'{time.monotonic() - started:.1f} с')
+                results[f'{name} write'] = measure_calls(
+                    [lambda author_id=author_id: Post.objects.create(
+                        author_id=author_id, text='Пост для замера')
+                     for author_id in writers],
+                    warmup=options['warmup'])
+                results[f'{name} read'] = measure_calls(
+                    [lambda user=user: list(
+                        TimelinePaginator(user, PER_PAGE).get_page())
+                     for user in picked],
+                    warmup=options['warmup'])
+        results['pull read'] = measure_calls(
+            [lambda user=user: list(naive_timeline(user)[:PER_PAGE])
+             for user in picked],
+            warmup=options['warmup'])
+        self.stdout.write(format_report(results))
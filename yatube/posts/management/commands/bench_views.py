@@ -0,0 +1,96 @@
+import os
+import random
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max, Min
+from django.test import Client
+from django.urls import reverse
+
+from core.benchmarks import (find_regressions, format_report, load_baseline,
+                             measure, save_baseline)
+from posts.models import AuthorCounter, Group, Post
+
+DEFAULT_BASELINE = os.path.join(
+    settings.BASE_DIR, 'benchmarks', 'views_baseline.json')
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет index, group_list, profile и post_detail тестовым '
+        'клиентом: p50/p95/p99 и число SQL-запросов на запрос.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--warmup', type=int, default=10)
+        parser.add_argument(
+            '--max-page', type=int, default=1,
+            help='Страницы лент выбираются случайно из 1..max-page.')
+        parser.add_argument(
+            '--cold', action='store_true',
+            help='Очищать кэш перед каждым запросом.')
+        parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+        parser.add_argument(
+            '--save-baseline', action='store_true',
+            help='Сохранить результат как новую базовую линию.')
+        parser.add_argument(
+            '--max-regression', type=float, default=None,
+            help='Завершиться с ошибкой, если p95 вырос больше чем на '
+                 'столько процентов или стало больше запросов, чем '
+                 'в базовой линии.')
+        parser.add_argument('--seed', type=int, default=None)
+
+    def get_urls(self, rng, requests, max_page):
+        group = Group.objects.order_by('-posts_count').first()
+        top_author = AuthorCounter.objects.select_related(
+            'author').order_by('-posts_count').first()
+        bounds = Post.objects.aggregate(low=Min('pk'), high=Max('pk'))
+        if not (group and top_author and bounds['high']):
+            raise CommandError('Нет данных: сначала запустите seed_posts.')
+
+        def pages(url):
+            return [f'{url}?page={rng.randint(1, max_page)}'
+                    for _ in range(requests)]
+
+        post_ids = Post.objects.filter(
+            pk__in=[rng.randint(bounds['low'], bounds['high'])
+                    for _ in range(requests * 2)]
+        ).values_list('pk', flat=True)[:requests]
+        return {
+            'index': pages(reverse('posts:index')),
+            'group_list': pages(reverse(
+                'posts:group_list', kwargs={'slug': group.slug})),
+            'profile': pages(reverse(
+                'posts:profile',
+                kwargs={'username': top_author.author.username})),
+            'post_detail': [
+                reverse('posts:post_detail', kwargs={'post_id': pk})
+                for pk in post_ids
+            ],
+        }
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        client = Client()
+        urls = self.get_urls(rng, options['requests'], options['max_page'])
+        results = {
+            name: measure(client, view_urls, warmup=options['warmup'],
+                          cold=options['cold'])
+            for name, view_urls in urls.items()
+        }
+
+        baseline = load_baseline(options['baseline'])
+        self.stdout.write(format_report(results, baseline))
+        if not baseline:
+            self.stdout.write(
+                'Базовой линии нет: сохраните её через --save-baseline.')
+        if options['save_baseline']:
+            save_baseline(options['baseline'], results)
+            self.stdout.write(f'Базовая линия: {options["baseline"]}')
+        if options['max_regression'] is not None:
+            regressions = find_regressions(
+                results, baseline, options['max_regression'])
+            if regressions:
+                raise CommandError(
+                    'Хуже базовой линии: ' + ', '.join(regressions))
@@ -0,0 +1,53 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts.images import rebuild_image_refs
+from posts.models import Post, StoredImage
+
+IMAGES_DIR = 'posts'
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет файлы картинок постов, на которые не ссылается ни один '
+        'пост: остатки прерванных загрузок и удалений.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--min-age', type=int, default=3600,
+            help='Не трогать файлы моложе стольких секунд: их может '
+                 'сохранять ещё не завершённый запрос.')
+        parser.add_argument(
+            '--rebuild', action='store_true',
+            help='Сначала пересчитать ссылки на картинки по постам.')
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только показать файлы, ничего не удаляя.')
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            rebuild_image_refs()
+        storage = Post._meta.get_field('image').storage
+        used = set(StoredImage.objects.values_list('name', flat=True))
+        used.update(Post.objects.exclude(image='').values_list(
+            'image', flat=True).distinct())
+        deadline = time.time() - options['min_age']
+        root = storage.path(IMAGES_DIR)
+        removed = 0
+        for directory, _, files in os.walk(root):
+            for filename in files:
+                path = os.path.join(directory, filename)
+                name = os.path.relpath(path, storage.location).replace(
+                    os.sep, '/')
+                if name in used or os.path.getmtime(path) > deadline:
+                    continue
+                removed += 1
+                if options['dry_run']:
+                    self.stdout.write(name)
+                else:
+                    os.remove(path)
+        verb = 'Найдено' if options['dry_run'] else 'Удалено'
+        self.stdout.write(f'{verb} файлов без ссылок: {removed}.')
@@ -0,0 +1,172 @@
+import json
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils.dateparse import parse_datetime
+
+from posts.bulk import explicit_pub_date, finish_bulk_load
+from posts.models import Group, Post, User
+
+GROUP_FIELDS = ('title', 'slug', 'description')
+POST_FIELDS = ('text', 'author', 'pub_date')
+
+
+def _check_strings(record, fields):
+    for field in fields:
+        if not isinstance(record.get(field), str):
+            raise ValueError(f'поле {field} должно быть строкой')
+
+
+def _parse_date(record, field):
+    try:
+        value = parse_datetime(record[field])
+    except ValueError:
+        value = None
+    if value is None:
+        raise ValueError(f'неверная дата в поле {field}')
+    return value
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает группы и посты из JSONL, созданного export_posts. '
+        'Недостающие авторы создаются без пароля.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'input', nargs='?', default='-',
+            help='Файл с выгрузкой, «-» — стандартный ввод.')
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
+        self.groups = dict(Group.objects.values_list('slug', 'pk'))
+        self.authors = dict(User.objects.values_list('username', 'pk'))
+        self.pending_groups = []
+        self.pending_posts = []
+        self.created = {'group': 0, 'post': 0}
+        started = time.monotonic()
+
+        # Одна транзакция на всю загрузку: ошибка в любой строке
+        # откатывает и уже записанные пакеты, счётчики не расходятся.
+        with explicit_pub_date(updated=True), transaction.atomic():
+            if options['input'] == '-':
+                self.load(sys.stdin)
+            else:
+                with open(options['input'], encoding='utf-8') as source:
+                    self.load(source)
+            self.flush_groups()
+            self.flush_posts()
+        finish_bulk_load()
+
+        elapsed = time.monotonic() - started
+        rows = sum(self.created.values())
+        self.stdout.write(
+            f'Загружено групп: {self.created["group"]}, '
+            f'постов: {self.created["post"]} за {elapsed:.1f} с '
+            f'({rows / max(elapsed, 1e-9):.0f} строк в с).'
+        )
+
+    def load(self, source):
+        for line_number, line in enumerate(source, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                model = record['model']
+            except (ValueError, KeyError, TypeError):
+                raise CommandError(f'Строка {line_number}: неверная запись.')
+            add = {'group': self.add_group, 'post': self.add_post}.get(
+                model if isinstance(model, str) else None)
+            if add is None:
+                raise CommandError(
+                    f'Строка {line_number}: неизвестная модель {model}.')
+            try:
+                add(record)
+            except ValueError as error:
+                raise CommandError(f'Строка {line_number}: {error}.')
+
+    def add_group(self, record):
+        _check_strings(record, GROUP_FIELDS)
+        if record['slug'] not in self.groups:
+            self.pending_groups.append(Group(
+                title=record['title'], slug=record['slug'],
+                description=record['description']))
+            # Резервируем слаг, чтобы не создать группу дважды.
+            self.groups[record['slug']] = None
+        if len(self.pending_groups) >= self.batch_size:
+            self.flush_groups()
+
+    def add_post(self, record):
+        self.pending_posts.append(self.parse_post(record))
+        if len(self.pending_posts) >= self.batch_size:
+            self.flush_groups()
+            self.flush_posts()
+
+    def parse_post(self, record):
+        """Проверяет запись поста и разбирает даты.
+
+        Группа должна быть в базе или выше в файле: export_posts пишет
+        группы перед постами. updated нет в старых выгрузках — тогда
+        пост считается не правленным после публикации.
+        """
+        _check_strings(record, POST_FIELDS)
+        group = record.get('group')
+        if group is not None and group not in self.groups:
+            raise ValueError(f'неизвестная группа {group!r}')
+        image = record.get('image') or ''
+        if not isinstance(image, str):
+            raise ValueError('поле image должно быть строкой')
+        pub_date = _parse_date(record, 'pub_date')
+        return {
+            'text': record['text'],
+            'author': record['author'],
+            'group': group,
+            'image': image,
+            'pub_date': pub_date,
+            'updated': (_parse_date(record, 'updated')
+                        if record.get('updated') else pub_date),
+        }
+
+    def flush_groups(self):
+        if not self.pending_groups:
+            return
+        slugs = [group.slug for group in self.pending_groups]
+        Group.objects.bulk_create(self.pending_groups)
+        self.groups.update(
+            Group.objects.filter(slug__in=slugs).values_list('slug', 'pk'))
+        self.created['group'] += len(slugs)
+        self.pending_groups = []
+
+    def resolve_authors(self, usernames):
+        missing = {name for name in usernames if name not in self.authors}
+        if not missing:
+            return
+        User.objects.bulk_create(
+            User(username=name, password='!') for name in missing)
+        self.authors.update(
+            User.objects.filter(username__in=missing)
+            .values_list('username', 'pk'))
+
+    def flush_posts(self):
+        if not self.pending_posts:
+            return
+        self.resolve_authors(
+            record['author'] for record in self.pending_posts)
+        posts = [
+            Post(
+                text=record['text'],
+                pub_date=record['pub_date'],
+                updated=record['updated'],
+                author_id=self.authors[record['author']],
+                group_id=self.groups.get(record['group']),
+                image=record['image'],
+            )
+            for record in self.pending_posts
+        ]
+        Post.objects.bulk_create(posts)
+        self.created['post'] += len(posts)
+        self.pending_posts = []
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.counters import find_counter_mismatches, rebuild_counters
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает и проверяет счётчики постов и подписчиков '
+        'авторов и постов групп.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только проверить счётчики, ничего не меняя.',
+        )
+
+    def handle(self, *args, **options):
+        if not options['check']:
+            rebuild_counters()
+            self.stdout.write('Счётчики пересчитаны.')
+
+        mismatches = find_counter_mismatches()
+        for obj, label, stored, real in mismatches:
+            self.stderr.write(
+                f'{obj!r}: счётчик {label} {stored}, на деле {real}')
+        if mismatches:
+            raise CommandError(
+                f'Расхождений в счётчиках: {len(mismatches)}.')
+        self.stdout.write(self.style.SUCCESS('Счётчики сходятся.'))
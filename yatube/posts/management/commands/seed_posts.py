@@ -0,0 +1,102 @@
+import random
+import time
+from datetime import timedelta
+from itertools import accumulate
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from faker import Faker
+
+from posts.bulk import explicit_pub_date, finish_bulk_load
+from posts.models import Group, Post, User
+
+TEXT_POOL_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = (
+        'Наполняет базу данными для нагрузочных тестов: число постов '
+        'у авторов распределено по степенному закону.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=100)
+        parser.add_argument('--posts', type=int, default=100000)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--alpha', type=float, default=1.2,
+            help='Показатель степени: чем больше, тем «тяжелее» топ-авторы.')
+        parser.add_argument(
+            '--days', type=int, default=3650,
+            help='За сколько дней назад разбрасывать даты публикации.')
+        parser.add_argument('--seed', type=int, default=None)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        fake = Faker('ru_RU')
+        if options['seed'] is not None:
+            fake.seed_instance(options['seed'])
+        batch_size = options['batch_size']
+        started = time.monotonic()
+
+        # Пачки авторов и групп Django 2.2 сам подгоняет под лимит
+        # параметров SQLite; явный batch_size этот лимит отменяет.
+        prefix = f'seed{int(time.time())}'
+        User.objects.bulk_create(
+            (User(username=f'{prefix}_{number}', password='!',
+                  first_name=fake.first_name(), last_name=fake.last_name())
+             for number in range(options['users'])),
+        )
+        author_ids = list(User.objects.filter(
+            username__startswith=f'{prefix}_').values_list('pk', flat=True))
+        Group.objects.bulk_create(
+            (Group(title=fake.sentence(nb_words=3)[:200],
+                   slug=f'{prefix}-{number}',
+                   description=fake.paragraph())
+             for number in range(options['groups'])),
+        )
+        group_ids = list(Group.objects.filter(
+            slug__startswith=f'{prefix}-').values_list('pk', flat=True))
+        group_ids.append(None)
+
+        rng.shuffle(author_ids)
+        author_weights = list(accumulate(
+            1 / rank ** options['alpha']
+            for rank in range(1, len(author_ids) + 1)
+        ))
+        texts = [fake.paragraph(nb_sentences=5)
+                 for _ in range(TEXT_POOL_SIZE)]
+        now = timezone.now()
+        max_offset = options['days'] * 24 * 3600
+
+        created = 0
+        with explicit_pub_date():
+            while created < options['posts']:
+                size = min(batch_size, options['posts'] - created)
+                authors = rng.choices(
+                    author_ids, cum_weights=author_weights, k=size)
+                posts = [
+                    Post(
+                        author_id=author_id,
+                        group_id=rng.choice(group_ids),
+                        text=rng.choice(texts),
+                        pub_date=now - timedelta(
+                            seconds=rng.randrange(max_offset)),
+                    )
+                    for author_id in authors
+                ]
+                with transaction.atomic():
+                    Post.objects.bulk_create(posts)
+                created += size
+                self.stdout.write(f'Постов: {created}', ending='\r')
+        self.stdout.write('')
+
+        finish_bulk_load()
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            f'Создано авторов: {len(author_ids)}, '
+            f'групп: {len(group_ids) - 1}, постов: {created} '
+            f'за {elapsed:.1f} с ({created / max(elapsed, 1e-9):.0f} в с).'
+        )
@@ -0,0 +1,46 @@
+# Generated by Django 2.2.16 on 2026-10-18 20:12
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_counters(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    Group = apps.get_model('posts', 'Group')
+    AuthorCounter = apps.get_model('posts', 'AuthorCounter')
+    by_author = Post.objects.order_by().values_list('author').annotate(
+        total=models.Count('pk'))
+    AuthorCounter.objects.bulk_create(
+        AuthorCounter(author_id=author_id, posts_count=total)
+        for author_id, total in by_author
+    )
+    by_group = Post.objects.filter(group__isnull=False).order_by(
+    ).values_list('group').annotate(total=models.Count('pk'))
+    for group_id, total in by_group:
+        Group.objects.filter(pk=group_id).update(posts_count=total)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0006_post_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='group',
+            name='posts_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество постов'),
+        ),
+        migrations.CreateModel(
+            name='AuthorCounter',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('posts_count', models.PositiveIntegerField(default=0, verbose_name='Количество постов')),
+                ('author', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='counter', to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+            ],
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,85 @@
+from django.db import migrations
+
+CREATE_TABLE_SQL = (
+    """
+    CREATE VIRTUAL TABLE posts_post_fts USING fts5(
+        text, group_title, tokenize = 'unicode61'
+    )
+    """,
+    """
+    INSERT INTO posts_post_fts (rowid, text, group_title)
+    SELECT posts_post.id, posts_post.text, COALESCE(posts_group.title, '')
+    FROM posts_post
+    LEFT OUTER JOIN posts_group ON posts_group.id = posts_post.group_id
+    """,
+)
+
+# SQLite при пересоздании таблицы (AddField, AlterField) проверяет
+# триггеры, поэтому такие миграции posts_post и posts_group должны
+# снимать триггеры до операции и ставить их обратно после.
+TRIGGERS_SQL = (
+    """
+    CREATE TRIGGER posts_post_fts_insert AFTER INSERT ON posts_post
+    BEGIN
+        INSERT INTO posts_post_fts (rowid, text, group_title)
+        VALUES (new.id, new.text, COALESCE(
+            (SELECT title FROM posts_group WHERE id = new.group_id), ''
+        ));
+    END
+    """,
+    """
+    CREATE TRIGGER posts_post_fts_update
+    AFTER UPDATE OF text, group_id ON posts_post
+    BEGIN
+        DELETE FROM posts_post_fts WHERE rowid = old.id;
+        INSERT INTO posts_post_fts (rowid, text, group_title)
+        VALUES (new.id, new.text, COALESCE(
+            (SELECT title FROM posts_group WHERE id = new.group_id), ''
+        ));
+    END
+    """,
+    """
+    CREATE TRIGGER posts_post_fts_delete AFTER DELETE ON posts_post
+    BEGIN
+        DELETE FROM posts_post_fts WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER posts_group_fts_update AFTER UPDATE OF title ON posts_group
+    BEGIN
+        UPDATE posts_post_fts SET group_title = new.title
+        WHERE rowid IN (SELECT id FROM posts_post WHERE group_id = new.id);
+    END
+    """,
+)
+
+DROP_TRIGGERS_SQL = (
+    'DROP TRIGGER IF EXISTS posts_group_fts_update',
+    'DROP TRIGGER IF EXISTS posts_post_fts_delete',
+    'DROP TRIGGER IF EXISTS posts_post_fts_update',
+    'DROP TRIGGER IF EXISTS posts_post_fts_insert',
+)
+
+CREATE_SQL = CREATE_TABLE_SQL + TRIGGERS_SQL
+DROP_SQL = DROP_TRIGGERS_SQL + ('DROP TABLE IF EXISTS posts_post_fts',)
+
+
+def run_sqlite(statements):
+    def operation(apps, schema_editor):
+        # FTS5 есть только в SQLite, на других базах поиск идёт через LIKE.
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0007_post_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(run_sqlite(CREATE_SQL), run_sqlite(DROP_SQL)),
+    ]
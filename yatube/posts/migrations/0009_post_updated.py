@@ -0,0 +1,32 @@
+from importlib import import_module
+
+from django.db import migrations, models
+import django.utils.timezone
+
+search_index = import_module('posts.migrations.0008_post_search_index')
+drop_triggers = search_index.run_sqlite(search_index.DROP_TRIGGERS_SQL)
+create_triggers = search_index.run_sqlite(search_index.TRIGGERS_SQL)
+
+
+def copy_pub_date(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    Post.objects.update(updated=models.F('pub_date'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0008_post_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_triggers, create_triggers),
+        migrations.AddField(
+            model_name='post',
+            name='updated',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now, verbose_name='Дата изменения'),
+            preserve_default=False,
+        ),
+        migrations.RunPython(copy_pub_date, migrations.RunPython.noop),
+        migrations.RunPython(create_triggers, drop_triggers),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 2.2.16 on 2026-10-18 21:00
+
+from importlib import import_module
+
+import core.storage
+from django.db import migrations, models
+
+search_index = import_module('posts.migrations.0008_post_search_index')
+drop_triggers = search_index.run_sqlite(search_index.DROP_TRIGGERS_SQL)
+create_triggers = search_index.run_sqlite(search_index.TRIGGERS_SQL)
+
+
+def count_references(apps, schema_editor):
+    # Уже загруженные картинки лежат под прежними именами, но удаляться
+    # должны по тем же правилам, что и новые.
+    Post = apps.get_model('posts', 'Post')
+    StoredImage = apps.get_model('posts', 'StoredImage')
+    references = (
+        Post.objects.exclude(image='').order_by().values('image')
+        .annotate(total=models.Count('pk')).values_list('image', 'total')
+    )
+    StoredImage.objects.bulk_create(
+        StoredImage(name=name, refcount=total)
+        for name, total in references.iterator()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0010_follow_timeline'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredImage',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True, verbose_name='Файл')),
+                ('refcount', models.PositiveIntegerField(default=0, verbose_name='Число ссылок')),
+            ],
+        ),
+        migrations.RunPython(drop_triggers, create_triggers),
+        migrations.AlterField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(blank=True, storage=core.storage.ContentAddressedStorage(), upload_to='posts/', verbose_name='Картинка'),
+        ),
+        migrations.RunPython(create_triggers, drop_triggers),
+        migrations.RunPython(count_references, migrations.RunPython.noop),
+    ]
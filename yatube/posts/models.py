@@ -1,6 +1,8 @@
 from django.contrib.auth import get_user_model
-from django.db import models
-from django.db.models import CharField
+from django.db import models, router, transaction
+from django.db.models import CharField, F, Q
+
+from core.storage import ContentAddressedStorage
 
 User = get_user_model()
 
@@ -9,6 +11,9 @@ class Group(models.Model):
     title = models.CharField(max_length=200)
     slug = models.SlugField(unique=True)
     description = models.TextField()
+    posts_count = models.PositiveIntegerField(
+        'Количество постов', default=0, editable=False
+    )
 
     def __str__(self) -> CharField:
         return self.title
@@ -21,6 +26,9 @@ class Post(models.Model):
     pub_date = models.DateTimeField(
         auto_now_add=True, verbose_name='Дата публикации'
     )
+    updated = models.DateTimeField(
+        auto_now=True, verbose_name='Дата изменения'
+    )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -39,11 +47,132 @@ class Post(models.Model):
     image = models.ImageField(
         'Картинка',
         upload_to='posts/',
+        storage=ContentAddressedStorage(),
         blank=True
     )
 
     class Meta:
-        ordering = ('-pub_date',)
+        ordering = ('-pub_date', '-id')
+        indexes = [
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                name='post_author_feed_idx',
+            ),
+            models.Index(
+                fields=['group', '-pub_date', '-id'],
+                name='post_group_feed_idx',
+            ),
+            models.Index(
+                fields=['-pub_date', '-id'],
+                name='post_feed_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.text[:15]
+
+    def save(self, *args, **kwargs):
+        # Получатели post_save меняют счётчики и ленты подписок: пусть
+        # это будет одна транзакция с записью строки.
+        using = kwargs.get('using') or router.db_for_write(
+            type(self), instance=self)
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+
+
+class AuthorCounter(models.Model):
+    author = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        related_name='counter',
+        verbose_name='Автор'
+    )
+    posts_count = models.PositiveIntegerField(
+        'Количество постов', default=0
+    )
+    followers_count = models.PositiveIntegerField(
+        'Количество подписчиков', default=0
+    )
+
+    def __str__(self):
+        return f'{self.author}: {self.posts_count}'
+
+
+class Follow(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='follower',
+        verbose_name='Подписчик'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='following',
+        verbose_name='Автор'
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'author'], name='unique_follow'),
+            models.CheckConstraint(
+                check=~Q(user=F('author')), name='no_self_follow'),
+        ]
+
+    def __str__(self):
+        return f'{self.user} → {self.author}'
+
+    def save(self, *args, **kwargs):
+        # Получатели post_save меняют счётчики и ленты подписок: пусть
+        # это будет одна транзакция с записью строки.
+        using = kwargs.get('using') or router.db_for_write(
+            type(self), instance=self)
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+
+
+class TimelineEntry(models.Model):
+    """Пост в ленте подписок пользователя, разложенный при публикации.
+
+    pub_date скопирована из поста, чтобы лента читалась по индексу
+    (user, pub_date, post) без JOIN и сортировки.
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+        verbose_name='Читатель'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Пост'
+    )
+    pub_date = models.DateTimeField('Дата публикации')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'post'], name='unique_timeline_entry'),
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', '-pub_date', '-post'],
+                name='timeline_user_feed_idx',
+            ),
+        ]
+
+
+class StoredImage(models.Model):
+    """Число постов, ссылающихся на файл картинки.
+
+    Одинаковые загрузки хранятся одним файлом, поэтому файл удаляется,
+    только когда счётчик доходит до нуля.
+    """
+    name = models.CharField('Файл', max_length=100, unique=True)
+    refcount = models.PositiveIntegerField('Число ссылок', default=0)
+
+    def __str__(self):
+        return f'{self.name}: {self.refcount}'
@@ -0,0 +1,221 @@
+import base64
+import binascii
+from collections.abc import Sequence
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+CURSOR_SEPARATOR = '|'
+COUNT_CACHE_KEY = 'posts:count:{}'
+
+
+def elided_page_range(number, num_pages, on_each_side=2, on_ends=1):
+    """Номера страниц вокруг текущей и по краям, None на месте пропуска.
+
+    Аналог Paginator.get_elided_page_range из Django 3.2: размер
+    навигации не зависит от числа страниц.
+    """
+    window = range(max(number - on_each_side, 1),
+                   min(number + on_each_side, num_pages) + 1)
+    pages = sorted(
+        set(window)
+        | set(range(1, min(on_ends, num_pages) + 1))
+        | set(range(max(num_pages - on_ends + 1, 1), num_pages + 1))
+    )
+    previous = 0
+    for page in pages:
+        if page - previous == 2:
+            # Пропуск в одну страницу короче многоточия.
+            yield previous + 1
+        elif page - previous > 2:
+            yield None
+        yield page
+        previous = page
+
+
+class CachedCountPaginator(Paginator):
+    """Номерная пагинация без COUNT(*) на каждый запрос.
+
+    Число строк берётся из переданного count (поддерживаемый счётчик)
+    или из кэша по count_key, где живёт не дольше
+    POSTS_COUNT_CACHE_TIMEOUT секунд; в count_key стоит включать версию
+    ленты. Если страница оказалась за концом ленты по этому числу,
+    оно пересчитывается точно.
+    """
+
+    def __init__(self, object_list, per_page, count=None, count_key=None,
+                 **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.estimated_count = count
+        self.count_key = count_key and COUNT_CACHE_KEY.format(count_key)
+        self.is_estimated = count is not None or count_key is not None
+
+    @cached_property
+    def count(self):
+        if self.estimated_count is not None:
+            return self.estimated_count
+        if self.count_key is None:
+            return super().count
+        count = cache.get(self.count_key)
+        if count is None:
+            count = super().count
+            cache.set(self.count_key, count,
+                      settings.POSTS_COUNT_CACHE_TIMEOUT)
+        return count
+
+    def refresh_count(self):
+        """Заменяет оценку точным COUNT(*) и обновляет кэш."""
+        for name in ('count', 'num_pages'):
+            self.__dict__.pop(name, None)
+        self.estimated_count = None
+        count_key, self.count_key = self.count_key, None
+        self.is_estimated = False
+        if count_key:
+            cache.set(count_key, self.count,
+                      settings.POSTS_COUNT_CACHE_TIMEOUT)
+
+    def page(self, number):
+        if not self.is_estimated:
+            return super().page(number)
+        # Paginator обрезает последнюю страницу по count; при заниженной
+        # оценке это спрятало бы новые посты, поэтому режем по per_page.
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        return self._get_page(
+            self.object_list[bottom:bottom + self.per_page], number, self)
+
+    def get_page(self, number):
+        # Страница в пределах числа из кэша отдаётся без запроса: её
+        # строки читает шаблон, и при попадании в кэш фрагмента — нет.
+        try:
+            return self.page(self.validate_number(number))
+        except PageNotAnInteger:
+            return super().get_page(number)
+        except EmptyPage:
+            pass
+        if self.is_estimated:
+            # Оценка устарела: страница за концом ленты по оценке.
+            self.refresh_count()
+        return super().get_page(number)
+
+
+def encode_cursor(post):
+    # Строки из values() приходят словарями, а не объектами модели.
+    if isinstance(post, dict):
+        pub_date, pk = post['pub_date'], post['id']
+    else:
+        pub_date, pk = post.pub_date, post.pk
+    raw = f'{pub_date.isoformat()}{CURSOR_SEPARATOR}{pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Возвращает пару (pub_date, id) или None для битого токена."""
+    if not token:
+        return None
+    try:
+        padding = '=' * (-len(token) % 4)
+        raw = base64.urlsafe_b64decode(token + padding).decode()
+        pub_date, pk = raw.rsplit(CURSOR_SEPARATOR, 1)
+        pub_date = parse_datetime(pub_date)
+        pk = int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+    if pub_date is None:
+        return None
+    return pub_date, pk
+
+
+def keyset_filter(queryset, after_key=None, before_key=None, pk='pk'):
+    """Упорядочивает queryset по (pub_date, pk) и отсекает курсором.
+
+    pk — имя поля, второго в ключе (например, post_id у связанных строк).
+    """
+    if before_key:
+        pub_date, key = before_key
+        return queryset.filter(
+            Q(pub_date__gt=pub_date) | Q(**{f'{pk}__gt': key}),
+            pub_date__gte=pub_date,
+        ).order_by('pub_date', pk)
+    if after_key:
+        pub_date, key = after_key
+        # Отдельное условие pub_date__lte даёт индексу диапазон.
+        queryset = queryset.filter(
+            Q(pub_date__lt=pub_date) | Q(**{f'{pk}__lt': key}),
+            pub_date__lte=pub_date,
+        )
+    return queryset.order_by('-pub_date', f'-{pk}')
+
+
+class CursorPage(Sequence):
+    """Страница курсорной ленты: без номера и абсолютных индексов,
+    соседние страницы задаются токенами next_cursor и previous_cursor.
+    """
+
+    def __init__(self, object_list, paginator,
+                 has_next=False, has_previous=False):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+        self.next_cursor = (
+            encode_cursor(object_list[-1]) if has_next else None
+        )
+        self.previous_cursor = (
+            encode_cursor(object_list[0]) if has_previous else None
+        )
+
+    def __repr__(self):
+        return '<Cursor page>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+
+class CursorPaginator:
+    """Keyset-пагинация по (pub_date, id) без COUNT(*) и OFFSET.
+
+    Лента идёт от новых постов к старым: токен after ведёт на более
+    старые записи, before — на более новые.
+    """
+    is_cursor = True
+
+    def __init__(self, object_list, per_page):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+
+    def get_page(self, after=None, before=None):
+        before_key = decode_cursor(before)
+        after_key = None if before_key else decode_cursor(after)
+        rows = self.fetch(after_key, before_key, self.per_page + 1)
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+
+        if before_key:
+            rows.reverse()
+            # Мы пришли со старой страницы, значит дальше она точно есть.
+            return CursorPage(rows, self, has_next=bool(rows),
+                              has_previous=has_more)
+        return CursorPage(rows, self, has_next=has_more,
+                          has_previous=after_key is not None and bool(rows))
+
+    def fetch(self, after_key, before_key, limit):
+        """Строки страницы в порядке обхода: before идёт к новым."""
+        return list(keyset_filter(
+            self.object_list, after_key, before_key)[:limit])
@@ -0,0 +1,39 @@
+import re
+
+from django.db import connection
+
+from .models import Post
+
+SEARCH_TABLE = 'posts_post_fts'
+TERM_RE = re.compile(r'\w+')
+
+
+def build_match_query(query):
+    """Переводит ввод пользователя в безопасный запрос FTS5.
+
+    Каждое слово берётся в кавычки, поэтому операторы и скобки из ввода
+    не ломают синтаксис MATCH; слова объединяются через AND.
+    """
+    return ' '.join(f'"{term}"' for term in TERM_RE.findall(query))
+
+
+def search_posts(query, queryset=None):
+    """Посты, подходящие под запрос, от самых релевантных."""
+    if queryset is None:
+        queryset = Post.objects.all()
+    match = build_match_query(query)
+    if not match:
+        return queryset.none()
+    if connection.vendor != 'sqlite':
+        for term in TERM_RE.findall(query):
+            queryset = queryset.filter(text__icontains=term)
+        return queryset
+    return queryset.extra(
+        tables=[SEARCH_TABLE],
+        where=[
+            f'{SEARCH_TABLE}.rowid = posts_post.id',
+            f'{SEARCH_TABLE} MATCH %s',
+        ],
+        params=[match],
+        order_by=[f'{SEARCH_TABLE}.rank', '-pub_date'],
+    )
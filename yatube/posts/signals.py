@@ -0,0 +1,142 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .cache import (ALL_FEEDS, INDEX_FEED, author_feed, bump_feed_version,
+                    group_feed)
+from .counters import (change_author_count, change_followers_count,
+                       change_group_count)
+from .images import acquire_images, keep_image_file, release_images
+from .lookups import author_cache, group_cache
+from .models import Follow, Group, Post, User
+from .thumbnails import schedule_thumbnails
+from .timeline import (backfill_follow, backfill_unpopular_author,
+                       drop_follow, fan_out_post)
+
+
+@receiver(pre_save, sender=Post)
+def remember_previous_state(sender, instance, raw, **kwargs):
+    instance._previous_group_id = None
+    instance._previous_author_id = None
+    instance._previous_image = None
+    # Загрузку держим до коммита: keep_image_file может её дописать.
+    image = instance.image
+    instance._image_upload = None if image._committed else image.file
+    if instance.pk and not raw:
+        previous = Post.objects.filter(pk=instance.pk).values_list(
+            'group_id', 'author_id', 'image').first()
+        if previous:
+            (instance._previous_group_id,
+             instance._previous_author_id,
+             instance._previous_image) = previous
+
+
+@receiver(post_save, sender=Post)
+def count_saved_post(sender, instance, created, raw, **kwargs):
+    if raw and not created:
+        # loaddata поверх существующей строки: прежнее состояние
+        # неизвестно, счётчики выправит rebuild_post_counters.
+        return
+    if created:
+        change_author_count(instance.author_id, 1)
+        if instance.group_id:
+            change_group_count(instance.group_id, 1)
+        return
+    previous_author_id = getattr(instance, '_previous_author_id', None)
+    if previous_author_id and previous_author_id != instance.author_id:
+        change_author_count(previous_author_id, -1)
+        change_author_count(instance.author_id, 1)
+    previous_group_id = getattr(instance, '_previous_group_id', None)
+    if previous_group_id != instance.group_id:
+        if previous_group_id:
+            change_group_count(previous_group_id, -1)
+        if instance.group_id:
+            change_group_count(instance.group_id, 1)
+
+
+@receiver(post_save, sender=Post)
+def fan_out_created_post(sender, instance, created, raw, **kwargs):
+    # Счётчик автора уже создан в count_saved_post выше.
+    if created and not raw:
+        fan_out_post(instance)
+
+
+@receiver(post_save, sender=Post)
+def count_saved_image(sender, instance, created, raw, **kwargs):
+    if raw and not created:
+        return
+    previous = getattr(instance, '_previous_image', None) or ''
+    if instance.image.name == previous:
+        return
+    acquire_images([instance.image.name])
+    release_images([previous])
+    upload = getattr(instance, '_image_upload', None)
+    if instance.image and upload is not None:
+        keep_image_file(instance.image.name, upload)
+
+
+@receiver(post_save, sender=Post)
+def pregenerate_thumbnails(sender, instance, raw, **kwargs):
+    if raw or not instance.image:
+        return
+    if instance.image.name != getattr(instance, '_previous_image', None):
+        schedule_thumbnails(instance.image.name)
+
+
+@receiver(post_delete, sender=Post)
+def count_deleted_post(sender, instance, **kwargs):
+    change_author_count(instance.author_id, -1)
+    if instance.group_id:
+        change_group_count(instance.group_id, -1)
+    release_images([instance.image.name])
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_feeds(sender, instance, **kwargs):
+    feeds = {INDEX_FEED, author_feed(instance.author_id)}
+    previous_author_id = getattr(instance, '_previous_author_id', None)
+    if previous_author_id:
+        feeds.add(author_feed(previous_author_id))
+    for group_id in (instance.group_id,
+                     getattr(instance, '_previous_group_id', None)):
+        if group_id:
+            feeds.add(group_feed(group_id))
+    bump_feed_version(*feeds)
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def invalidate_group_feeds(sender, instance, **kwargs):
+    # Слаг группы выводится в каждой ленте, а удаление группы обнуляет
+    # group у постов через UPDATE без сигналов — сбрасываем все ленты.
+    bump_feed_version(ALL_FEEDS)
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def discard_cached_group(sender, instance, **kwargs):
+    group_cache.discard_pk(instance.pk)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def discard_cached_author(sender, instance, **kwargs):
+    author_cache.discard_pk(instance.pk)
+
+
+@receiver(post_save, sender=Follow)
+def follow_created(sender, instance, created, raw, **kwargs):
+    if not created or raw:
+        return
+    change_followers_count(instance.author_id, 1)
+    backfill_follow(instance.user_id, instance.author_id)
+    # В профиле автора меняется кнопка подписки.
+    bump_feed_version(author_feed(instance.author_id))
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    change_followers_count(instance.author_id, -1)
+    drop_follow(instance.user_id, instance.author_id)
+    backfill_unpopular_author(instance.author_id)
+    bump_feed_version(author_feed(instance.author_id))
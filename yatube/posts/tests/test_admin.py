@@ -0,0 +1,135 @@
+from datetime import datetime, timedelta
+
+from django.contrib.admin import helpers
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Max, Min
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.admin import IndexedDatesQuerySet
+from posts.bulk import explicit_pub_date
+from posts.counters import find_counter_mismatches
+from posts.models import Follow, Group, Post, TimelineEntry
+
+User = get_user_model()
+
+
+class PostAdminTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='pass')
+        cls.author = User.objects.create_user(username='auth')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.groups = [
+            Group.objects.create(
+                title=f'Группа {number}', slug=f'group-{number}',
+                description='Тестовое описание')
+            for number in range(3)
+        ]
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        start = timezone.make_aware(datetime(2021, 12, 30, 12))
+        with explicit_pub_date():
+            for number in range(12):
+                Post.objects.create(
+                    author=cls.author, text=f'Пост {number}',
+                    group=cls.groups[number % 3],
+                    pub_date=start + timedelta(days=20 * number),
+                )
+        cls.changelist = reverse('admin:posts_post_changelist')
+
+    def setUp(self):
+        self.client.force_login(PostAdminTests.admin)
+
+    def count_changelist_queries(self):
+        # Прогрев другой страницей: в кэш ложатся сессия и пользователь,
+        # но не COUNT(*) списка — меряем холодный список.
+        cache.clear()
+        self.client.get(reverse('admin:index'))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.changelist)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        """Число запросов списка не зависит от числа строк на странице."""
+        queries = self.count_changelist_queries()
+
+        with explicit_pub_date():
+            for group in PostAdminTests.groups:
+                Post.objects.create(
+                    author=User.objects.create_user(username=group.slug),
+                    text='Ещё пост', group=group,
+                    pub_date=timezone.make_aware(datetime(2022, 1, 1)))
+
+        self.assertEqual(self.count_changelist_queries(), queries)
+
+    def test_indexed_dates_match_django(self):
+        """Прыжки по индексу дают те же периоды и границы, что и ORM."""
+        posts = Post.objects.all()
+        indexed = IndexedDatesQuerySet(Post, query=posts.query)
+
+        for kind in ('year', 'month', 'day'):
+            with self.subTest(kind=kind):
+                self.assertEqual(
+                    indexed.dates('pub_date', kind),
+                    list(posts.dates('pub_date', kind)))
+        self.assertEqual(
+            indexed.filter(pub_date__year=2022).dates(
+                'pub_date', 'month', order='DESC'),
+            list(posts.filter(pub_date__year=2022).dates(
+                'pub_date', 'month', order='DESC')))
+        self.assertEqual(
+            indexed.aggregate(first=Min('pub_date'), last=Max('pub_date')),
+            posts.aggregate(first=Min('pub_date'), last=Max('pub_date')))
+
+    def post_action(self, action, posts, **extra):
+        return self.client.post(self.changelist, {
+            'action': action,
+            helpers.ACTION_CHECKBOX_NAME: [post.pk for post in posts],
+            **extra,
+        })
+
+    def test_delete_action_single_statement(self):
+        """Удаление выбранных — один DELETE, счётчики и ленты сходятся."""
+        posts = list(Post.objects.filter(group=PostAdminTests.groups[0]))
+
+        response = self.post_action('delete_selected_posts', posts)
+        self.assertContains(response, 'Будет удалено постов: 4')
+        self.assertTrue(Post.objects.filter(pk=posts[0].pk).exists())
+
+        with CaptureQueriesContext(connection) as queries:
+            self.post_action('delete_selected_posts', posts, post='yes')
+
+        deletes = [
+            query for query in queries.captured_queries
+            if query['sql'].startswith('DELETE FROM "posts_post"')
+        ]
+        self.assertEqual(len(deletes), 1)
+        self.assertEqual(Post.objects.count(), 8)
+        self.assertEqual(TimelineEntry.objects.count(), 8)
+        self.assertEqual(find_counter_mismatches(), [])
+
+    def test_remove_from_group_action(self):
+        """Действие убирает выбранные посты из группы, счётчики сходятся."""
+        posts = list(Post.objects.filter(group=PostAdminTests.groups[1]))
+
+        self.post_action('remove_from_group', posts[:2])
+
+        self.assertEqual(
+            Post.objects.filter(group__isnull=True).count(), 2)
+        self.assertEqual(find_counter_mismatches(), [])
+
+    def test_default_delete_action_removed(self):
+        """Стандартное удаление заменено пакетным."""
+        response = self.client.get(self.changelist)
+        form = response.context['action_form']
+        actions = dict(form.fields['action'].choices)
+
+        self.assertNotIn('delete_selected', actions)
+        self.assertIn('delete_selected_posts', actions)
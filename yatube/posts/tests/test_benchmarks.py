@@ -0,0 +1,132 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.db.models import Count
+from django.test import TestCase
+
+from core.benchmarks import percentile
+from posts.counters import find_counter_mismatches
+from posts.models import Follow, Group, Post, TimelineEntry, User
+
+
+class PostsBenchmarkCommandsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        call_command('seed_posts', users=20, groups=5, posts=600,
+                     batch_size=100, seed=1, stdout=StringIO())
+
+    def setUp(self):
+        self.baseline_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.baseline_dir, ignore_errors=True)
+
+    def test_seed_posts_builds_power_law_data_set(self):
+        """Посты распределены неравномерно, счётчики сходятся."""
+        per_author = list(
+            User.objects.annotate(total=Count('posts'))
+            .order_by('-total').values_list('total', flat=True))
+
+        self.assertEqual(Post.objects.count(), 600)
+        self.assertEqual(Group.objects.count(), 5)
+        self.assertGreater(per_author[0], per_author[len(per_author) // 2] * 3)
+        self.assertGreater(
+            Post.objects.values('pub_date').distinct().count(), 1)
+        self.assertEqual(find_counter_mismatches(), [])
+
+    def test_bench_views_reports_and_saves_baseline(self):
+        """Бенчмарк выводит перцентили и сохраняет базовую линию."""
+        path = os.path.join(self.baseline_dir, 'baseline.json')
+        out = StringIO()
+
+        call_command('bench_views', requests=3, warmup=1,
+                     baseline=path, save_baseline=True, stdout=out)
+
+        with open(path, encoding='utf-8') as baseline:
+            results = json.load(baseline)
+        self.assertEqual(
+            set(results), {'index', 'group_list', 'profile', 'post_detail'})
+        self.assertIn('p99 мс', out.getvalue())
+
+    def test_bench_views_compares_with_baseline(self):
+        """Повторный прогон сравнивается с базовой линией и падает,
+        если запросов стало больше.
+        """
+        path = os.path.join(self.baseline_dir, 'baseline.json')
+        call_command('bench_views', requests=3, warmup=1,
+                     baseline=path, save_baseline=True, stdout=StringIO())
+        out = StringIO()
+
+        call_command('bench_views', requests=3, warmup=1, baseline=path,
+                     stdout=out)
+
+        self.assertIn('к базовой', out.getvalue())
+        with open(path, encoding='utf-8') as baseline:
+            results = json.load(baseline)
+        results['index']['queries'] -= 1
+        with open(path, 'w', encoding='utf-8') as baseline:
+            json.dump(results, baseline)
+        with self.assertRaisesRegex(CommandError, 'index'):
+            call_command('bench_views', requests=3, warmup=1, baseline=path,
+                         max_regression=1000, stdout=StringIO())
+
+    def test_bench_throughput_reports_requests_per_second(self):
+        """Бенчмарк пропускной способности меряет ленты через WSGI."""
+        path = os.path.join(self.baseline_dir, 'throughput.json')
+        out = StringIO()
+
+        call_command('bench_throughput', requests=4, threads=1, warmup=1,
+                     baseline=path, save_baseline=True, stdout=out)
+
+        with open(path, encoding='utf-8') as baseline:
+            results = json.load(baseline)
+        self.assertEqual(set(results), {'index', 'group_list', 'profile'})
+        for summary in results.values():
+            self.assertEqual(summary['requests'], 4)
+            self.assertGreater(summary['rps'], 0)
+        self.assertIn('запр/с', out.getvalue())
+
+    def test_bench_timeline_compares_strategies_and_rolls_back(self):
+        """Бенчмарк лент сравнивает стратегии и ничего не оставляет."""
+        out = StringIO()
+
+        call_command('bench_timeline', readers=5, follows=3, requests=3,
+                     warmup=1, fanout_limit=1, seed=1, stdout=out)
+
+        for name in ('push read', 'hybrid write', 'pull read'):
+            self.assertIn(name, out.getvalue())
+        self.assertFalse(Follow.objects.exists())
+        self.assertFalse(TimelineEntry.objects.exists())
+        self.assertEqual(Post.objects.count(), 600)
+
+    def test_bench_compression_reports_levels(self):
+        """Бенчмарк сжатия выводит каждый уровень для каждой страницы."""
+        out = StringIO()
+
+        call_command('bench_compression', repeats=2, seed=1, stdout=out)
+
+        for row in ('index        gzip6', 'post_detail  gzip9'):
+            self.assertIn(row, out.getvalue())
+
+    def test_bench_sessions_compares_modes(self):
+        """Кэш сессии и пользователя убирает их запросы из лент."""
+        out = StringIO()
+
+        call_command('bench_sessions', requests=3, warmup=1, seed=1,
+                     stdout=out)
+
+        self.assertIn('index (db)', out.getvalue())
+        self.assertIn('index: минус 2.00 запроса на запрос', out.getvalue())
+
+    def test_percentile_nearest_rank(self):
+        """Перцентиль считается по ближайшему рангу."""
+        values = list(range(1, 101))
+
+        self.assertEqual(percentile(values, 0.5), 50)
+        self.assertEqual(percentile(values, 0.99), 99)
+        self.assertEqual(percentile([7], 0.95), 7)
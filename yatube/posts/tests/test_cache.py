@@ -0,0 +1,133 @@
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.cache import INDEX_FEED, author_feed, get_feed_version, group_feed
+from posts.models import Group, Post
+
+User = get_user_model()
+
+TEMP_CACHE_DIR = tempfile.mkdtemp()
+
+CACHE_BACKENDS = {
+    'locmem': {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    },
+    'filebased': {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': TEMP_CACHE_DIR,
+        }
+    },
+}
+
+
+class PostsFeedCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.other_user = User.objects.create_user(username='auth_2')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='group-test-slug',
+            description='Тестовое описание',
+        )
+        cls.other_group = Group.objects.create(
+            title='Другая группа',
+            slug='other-group-slug',
+            description='Тестовое описание',
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_CACHE_DIR, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.guest_client = Client()
+        self.post = Post.objects.create(
+            author=PostsFeedCacheTests.user,
+            text='Тестовый пост для оценки работы',
+            group=PostsFeedCacheTests.group,
+        )
+
+    def test_feed_fragment_is_cached_until_post_saved(self):
+        """Фрагмент ленты берётся из кэша, пока пост не сохранён."""
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list',
+                    kwargs={'slug': PostsFeedCacheTests.group.slug}),
+            reverse('posts:profile',
+                    kwargs={'username': PostsFeedCacheTests.user.username}),
+        )
+        for backend, caches in CACHE_BACKENDS.items():
+            with self.subTest(backend=backend), override_settings(
+                    CACHES=caches):
+                cache.clear()
+                for url in urls:
+                    self.guest_client.get(url)
+
+                # update() не шлёт сигналов: кэш остаётся прежним.
+                Post.objects.filter(pk=self.post.pk).update(text='Тихо')
+                for url in urls:
+                    self.assertContains(
+                        self.guest_client.get(url), self.post.text)
+
+                self.post.text = 'Новый текст'
+                self.post.save()
+                for url in urls:
+                    self.assertContains(
+                        self.guest_client.get(url), 'Новый текст')
+
+    def test_post_save_busts_only_affected_feeds(self):
+        """Сохранение поста сбрасывает его ленты и не трогает чужие."""
+        untouched = (
+            group_feed(PostsFeedCacheTests.other_group.pk),
+            author_feed(PostsFeedCacheTests.other_user.pk),
+        )
+        touched = (
+            INDEX_FEED,
+            group_feed(PostsFeedCacheTests.group.pk),
+            author_feed(PostsFeedCacheTests.user.pk),
+        )
+        before = {feed: get_feed_version(feed) for feed in touched + untouched}
+
+        self.post.text = 'Новый текст'
+        self.post.save()
+
+        for feed in touched:
+            with self.subTest(feed=feed):
+                self.assertNotEqual(get_feed_version(feed), before[feed])
+        for feed in untouched:
+            with self.subTest(feed=feed):
+                self.assertEqual(get_feed_version(feed), before[feed])
+
+    def test_group_change_busts_previous_group_feed(self):
+        """Перенос поста в другую группу сбрасывает обе ленты групп."""
+        old_feed = group_feed(PostsFeedCacheTests.group.pk)
+        new_feed = group_feed(PostsFeedCacheTests.other_group.pk)
+        old_version = get_feed_version(old_feed)
+        new_version = get_feed_version(new_feed)
+
+        self.post.group = PostsFeedCacheTests.other_group
+        self.post.save()
+
+        self.assertNotEqual(get_feed_version(old_feed), old_version)
+        self.assertNotEqual(get_feed_version(new_feed), new_version)
+
+    def test_group_delete_busts_all_feeds(self):
+        """Удаление группы сбрасывает все ленты."""
+        group = Group.objects.create(
+            title='Временная группа', slug='temp', description='-')
+        version = get_feed_version(INDEX_FEED)
+
+        group.delete()
+
+        self.assertNotEqual(get_feed_version(INDEX_FEED), version)
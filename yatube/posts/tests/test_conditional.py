@@ -0,0 +1,127 @@
+import time
+from http import HTTPStatus
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class PostsConditionalGetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='group-test-slug',
+            description='Тестовое описание',
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.post = Post.objects.create(
+            author=PostsConditionalGetTests.user,
+            text='Тестовый пост для оценки работы',
+            group=PostsConditionalGetTests.group,
+        )
+
+    def get_urls(self):
+        return (
+            reverse('posts:index'),
+            reverse('posts:group_list',
+                    kwargs={'slug': PostsConditionalGetTests.group.slug}),
+            reverse('posts:profile', kwargs={
+                'username': PostsConditionalGetTests.user.username}),
+            reverse('posts:post_detail', kwargs={'post_id': self.post.id}),
+        )
+
+    def test_matching_etag_returns_not_modified(self):
+        """Совпавший ETag даёт 304 без тела."""
+        for url in self.get_urls():
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertTrue(response.has_header('Last-Modified'))
+
+                response = self.guest_client.get(
+                    url, HTTP_IF_NONE_MATCH=response['ETag'])
+
+                self.assertEqual(
+                    response.status_code, HTTPStatus.NOT_MODIFIED)
+                self.assertEqual(response.content, b'')
+
+    def test_post_edit_changes_validators(self):
+        """Правка поста меняет ETag лент и страницы поста."""
+        etags = {url: self.guest_client.get(url)['ETag']
+                 for url in self.get_urls()}
+        updated = self.post.updated
+
+        self.post.text = 'Новый текст'
+        self.post.save()
+
+        self.assertGreater(self.post.updated, updated)
+        for url, etag in etags.items():
+            with self.subTest(url=url):
+                response = self.guest_client.get(
+                    url, HTTP_IF_NONE_MATCH=etag)
+                self.assertContains(response, 'Новый текст')
+
+    def test_post_last_modified_follows_author_and_group(self):
+        """Новый пост автора и правка группы сдвигают Last-Modified
+        страницы поста: на ней счётчик постов и название группы.
+        """
+        url = reverse('posts:post_detail', kwargs={'post_id': self.post.id})
+        group = PostsConditionalGetTests.group
+
+        def rename_group():
+            group.title = 'Новое название'
+            group.save()
+
+        changes = (
+            lambda: Post.objects.create(
+                author=PostsConditionalGetTests.user, text='Ещё пост'),
+            rename_group,
+        )
+        for number, change in enumerate(changes, start=1):
+            with self.subTest(change=number):
+                last_modified = self.guest_client.get(url)['Last-Modified']
+                # Даты в заголовках с точностью до секунды.
+                later = time.time() + 10 * number
+                with mock.patch('posts.cache.time.time', return_value=later):
+                    change()
+
+                response = self.guest_client.get(
+                    url, HTTP_IF_MODIFIED_SINCE=last_modified)
+
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_etag_differs_between_users(self):
+        """Страница для вошедшего пользователя не совпадает с гостевой."""
+        authorized_client = Client()
+        authorized_client.force_login(PostsConditionalGetTests.user)
+        url = reverse('posts:index')
+
+        etag = self.guest_client.get(url)['ETag']
+
+        self.assertEqual(
+            authorized_client.get(
+                url, HTTP_IF_NONE_MATCH=etag).status_code,
+            HTTPStatus.OK)
+
+    def test_missing_objects_still_return_404(self):
+        """Для несуществующих группы и поста отдаётся 404."""
+        urls = (
+            reverse('posts:group_list', kwargs={'slug': 'missing'}),
+            reverse('posts:profile', kwargs={'username': 'missing'}),
+            reverse('posts:post_detail', kwargs={'post_id': 10 ** 6}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.guest_client.get(url).status_code,
+                                 HTTPStatus.NOT_FOUND)
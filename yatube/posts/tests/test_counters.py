@@ -0,0 +1,115 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from posts.counters import get_author_posts_count
+from posts.models import AuthorCounter, Follow, Group, Post
+
+User = get_user_model()
+
+
+class PostsCountersTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='group-test-slug',
+            description='Тестовое описание',
+        )
+        cls.other_group = Group.objects.create(
+            title='Другая группа',
+            slug='other-group-slug',
+            description='Тестовое описание',
+        )
+
+    def get_counts(self):
+        PostsCountersTests.user.refresh_from_db()
+        return (
+            get_author_posts_count(PostsCountersTests.user),
+            Group.objects.get(pk=PostsCountersTests.group.pk).posts_count,
+            Group.objects.get(
+                pk=PostsCountersTests.other_group.pk).posts_count,
+        )
+
+    def test_counters_follow_post_create_move_and_delete(self):
+        """Счётчики меняются при создании, переносе и удалении поста."""
+        post = Post.objects.create(
+            author=PostsCountersTests.user,
+            text='Тестовый пост для оценки работы',
+            group=PostsCountersTests.group,
+        )
+        Post.objects.create(
+            author=PostsCountersTests.user, text='Пост без группы')
+        self.assertEqual(self.get_counts(), (2, 1, 0))
+
+        post.group = PostsCountersTests.other_group
+        post.save()
+        self.assertEqual(self.get_counts(), (2, 0, 1))
+
+        post.delete()
+        self.assertEqual(self.get_counts(), (1, 0, 0))
+
+    def test_failed_counter_rolls_back_post(self):
+        """Сбой счётчика откатывает и саму запись поста."""
+        with mock.patch('posts.signals.change_group_count',
+                        side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                Post.objects.create(
+                    author=PostsCountersTests.user,
+                    text='Тестовый пост',
+                    group=PostsCountersTests.group,
+                )
+
+        self.assertFalse(Post.objects.exists())
+        self.assertEqual(self.get_counts(), (0, 0, 0))
+
+    def test_author_delete_with_posts(self):
+        """Удаление автора каскадом не оставляет висящих счётчиков."""
+        author = User.objects.create_user(username='auth_2')
+        Post.objects.create(author=author, text='Тестовый пост',
+                            group=PostsCountersTests.group)
+
+        author.delete()
+
+        self.assertFalse(AuthorCounter.objects.filter(
+            author_id=author.pk).exists())
+        self.assertEqual(self.get_counts()[1], 0)
+
+    def test_rebuild_command_repairs_and_verifies(self):
+        """Команда находит расхождения и пересчитывает счётчики."""
+        Post.objects.bulk_create(
+            Post(author=PostsCountersTests.user, text=f'Пост {number}',
+                 group=PostsCountersTests.group)
+            for number in range(3)
+        )
+
+        with self.assertRaises(CommandError):
+            call_command('rebuild_post_counters', '--check',
+                         stdout=StringIO(), stderr=StringIO())
+
+        call_command('rebuild_post_counters', stdout=StringIO())
+
+        self.assertEqual(self.get_counts(), (3, 3, 0))
+        call_command('rebuild_post_counters', '--check', stdout=StringIO())
+
+    def test_check_names_each_counter(self):
+        """Расхождения подписчиков и постов подписаны своими счётчиками."""
+        reader = User.objects.create_user(username='reader')
+        Follow.objects.bulk_create(
+            [Follow(user=reader, author=PostsCountersTests.user)])
+        Post.objects.bulk_create(
+            [Post(author=PostsCountersTests.user, text='Пост')])
+        stderr = StringIO()
+
+        with self.assertRaises(CommandError):
+            call_command('rebuild_post_counters', '--check',
+                         stdout=StringIO(), stderr=stderr)
+
+        report = stderr.getvalue()
+        self.assertIn('счётчик подписчиков 0, на деле 1', report)
+        self.assertIn('счётчик постов 0, на деле 1', report)
@@ -0,0 +1,186 @@
+from http import HTTPStatus
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+
+from posts.models import AuthorCounter, Follow, Post, TimelineEntry
+from posts.timeline import TimelinePaginator
+
+User = get_user_model()
+
+
+class FollowTimelineTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='reader')
+        cls.author = User.objects.create_user(username='author')
+        cls.other = User.objects.create_user(username='other')
+        cls.old_post = Post.objects.create(
+            author=cls.author, text='Пост до подписки')
+
+    def setUp(self):
+        cache.clear()
+        self.reader_client = Client()
+        self.reader_client.force_login(FollowTimelineTests.reader)
+
+    def follow(self, author):
+        return self.reader_client.get(reverse(
+            'posts:profile_follow', kwargs={'username': author.username}))
+
+    def timeline_ids(self, client=None):
+        response = (client or self.reader_client).get(
+            reverse('posts:follow_index'))
+        return [post.id for post in response.context['page_obj']]
+
+    def test_follow_and_unfollow(self):
+        """Подписка создаётся один раз, отписка её удаляет."""
+        author = FollowTimelineTests.author
+        response = self.follow(author)
+        self.follow(author)
+
+        self.assertRedirects(response, reverse(
+            'posts:profile', kwargs={'username': author.username}))
+        self.assertEqual(Follow.objects.count(), 1)
+        self.assertEqual(
+            AuthorCounter.objects.get(author=author).followers_count, 1)
+        self.assertTrue(self.reader_client.get(reverse(
+            'posts:profile', kwargs={'username': author.username}
+        )).context['following'])
+
+        self.reader_client.get(reverse(
+            'posts:profile_unfollow', kwargs={'username': author.username}))
+
+        self.assertFalse(Follow.objects.exists())
+        self.assertFalse(TimelineEntry.objects.exists())
+
+    def test_cannot_follow_self_or_as_guest(self):
+        """На себя подписаться нельзя, гостя отправляют на вход."""
+        self.follow(FollowTimelineTests.reader)
+        response = Client().get(reverse(
+            'posts:profile_follow',
+            kwargs={'username': FollowTimelineTests.author.username}))
+
+        self.assertFalse(Follow.objects.exists())
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+        self.assertIn(reverse('users:login'), response.url)
+
+    def test_timeline_shows_followed_posts_only(self):
+        """В ленте старые и новые посты авторов из подписок."""
+        self.follow(FollowTimelineTests.author)
+        new_post = Post.objects.create(
+            author=FollowTimelineTests.author, text='Новый пост')
+        Post.objects.create(author=FollowTimelineTests.other, text='Чужой')
+        other_client = Client()
+        other_client.force_login(FollowTimelineTests.other)
+
+        self.assertEqual(self.timeline_ids(),
+                         [new_post.id, FollowTimelineTests.old_post.id])
+        self.assertEqual(self.timeline_ids(other_client), [])
+
+    @override_settings(POSTS_TIMELINE_FANOUT_LIMIT=0)
+    def test_popular_authors_merged_on_read(self):
+        """Посты авторов выше порога читаются без раскладки."""
+        self.follow(FollowTimelineTests.author)
+        new_post = Post.objects.create(
+            author=FollowTimelineTests.author, text='Новый пост')
+
+        self.assertFalse(TimelineEntry.objects.exists())
+        self.assertEqual(self.timeline_ids(),
+                         [new_post.id, FollowTimelineTests.old_post.id])
+
+    @override_settings(POSTS_TIMELINE_FANOUT_LIMIT=1)
+    def test_author_below_limit_keeps_merged_posts(self):
+        """Посты, подмешанные, пока автор был выше порога, остаются
+        в ленте, когда он опускается до порога.
+        """
+        author = FollowTimelineTests.author
+        other_client = Client()
+        other_client.force_login(FollowTimelineTests.other)
+        self.follow(author)
+        other_client.get(reverse(
+            'posts:profile_follow', kwargs={'username': author.username}))
+        new_post = Post.objects.create(author=author, text='Новый пост')
+
+        other_client.get(reverse(
+            'posts:profile_unfollow', kwargs={'username': author.username}))
+
+        self.assertEqual(self.timeline_ids(),
+                         [new_post.id, FollowTimelineTests.old_post.id])
+        self.assertEqual(
+            TimelineEntry.objects.filter(
+                user=FollowTimelineTests.reader).count(), 2)
+
+    def test_merged_timeline_pages_by_cursor(self):
+        """Курсор проходит смешанную ленту без пропусков и повторов."""
+        author = FollowTimelineTests.author
+        other = FollowTimelineTests.other
+        self.follow(author)
+        self.follow(other)
+        for number in range(14):
+            Post.objects.create(author=author if number % 2 else other,
+                                text=f'Пост {number}')
+        expected = list(Post.objects.filter(
+            author__in=[author, other]).values_list('pk', flat=True))
+
+        with self.settings(POSTS_TIMELINE_FANOUT_LIMIT=0):
+            TimelineEntry.objects.filter(post__author=author).delete()
+            paginator = TimelinePaginator(FollowTimelineTests.reader, 10)
+            first = paginator.get_page()
+            second = paginator.get_page(after=first.next_cursor)
+            back = paginator.get_page(before=second.previous_cursor)
+
+        self.assertEqual(
+            [post.pk for post in [*first, *second]], expected)
+        self.assertFalse(second.has_next())
+        self.assertEqual(list(back), list(first))
+
+    def test_rebuild_timelines_command(self):
+        """Команда раскладывает ленты заново по подпискам."""
+        Follow.objects.bulk_create([Follow(
+            user=FollowTimelineTests.reader,
+            author=FollowTimelineTests.author)])
+
+        call_command('rebuild_timelines', stdout=StringIO())
+
+        self.assertEqual(self.timeline_ids(),
+                         [FollowTimelineTests.old_post.id])
+
+    def test_follow_views_fit_query_budget(self):
+        """Подписка, отписка и лента укладываются в бюджет."""
+        username = FollowTimelineTests.author.username
+        urls = (
+            reverse('posts:profile_follow', kwargs={'username': username}),
+            reverse('posts:follow_index'),
+            reverse('posts:profile_unfollow', kwargs={'username': username}),
+        )
+        for url in urls:
+            budget = resolve(url).func.query_budget
+            with self.subTest(url=url):
+                with CaptureQueriesContext(connection) as queries:
+                    self.reader_client.get(url)
+                self.assertLessEqual(len(queries), budget)
+
+    @override_settings(POSTS_TIMELINE_FANOUT_LIMIT=0)
+    def test_popular_authors_fit_query_budget(self):
+        """Число запросов ленты не растёт с числом популярных авторов."""
+        for number in range(6):
+            author = User.objects.create_user(username=f'popular_{number}')
+            self.follow(author)
+            Post.objects.create(author=author, text=f'Пост {number}')
+        url = reverse('posts:follow_index')
+        self.reader_client.get(url)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.reader_client.get(url)
+
+        self.assertEqual(len(response.context['page_obj']), 6)
+        self.assertLessEqual(
+            len(queries), resolve(url).func.query_budget,
+            '\n'.join(q['sql'] for q in queries.captured_queries))
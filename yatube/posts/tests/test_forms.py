@@ -1,12 +1,22 @@
+import shutil
+import tempfile
+from io import BytesIO
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.test import Client, TestCase
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
 from django.urls import reverse
+from PIL import Image
 
 from posts.models import Group, Post
 
 User = get_user_model()
 
 
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
 class PostsFormsTests(TestCase):
     @classmethod
     def setUpClass(cls):
@@ -90,3 +100,65 @@ class PostsFormsTests(TestCase):
             ).exists()
         )
         self.assertEqual(Post.objects.count(), posts_count)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT,
+                   POSTS_IMAGE_MAX_SIZE=(64, 64),
+                   POSTS_THUMBNAIL_WORKERS=0)
+class PostsImageUploadTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(PostsImageUploadTests.user)
+
+    def make_upload(self, name, size, mode='RGB', image_format='PNG'):
+        buffer = BytesIO()
+        exif = Image.Exif()
+        exif[0x010F] = 'Camera maker'
+        Image.new(mode, size).save(buffer, image_format, exif=exif)
+        return SimpleUploadedFile(name, buffer.getvalue(),
+                                  content_type=f'image/{image_format}')
+
+    def test_post_create_reencodes_image(self):
+        """Картинка уменьшается, очищается от EXIF и сохраняется в JPEG."""
+        self.authorized_client.post(
+            reverse('posts:post_create'),
+            data={
+                'text': 'Пост с картинкой',
+                'image': self.make_upload('photo.png', (300, 150), 'RGBA'),
+            },
+        )
+
+        post = Post.objects.get(text='Пост с картинкой')
+        self.assertRegex(
+            post.image.name,
+            r'^posts/[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}\.jpg$')
+        with Image.open(post.image.path) as stored:
+            self.assertEqual(stored.format, 'JPEG')
+            self.assertEqual(stored.size, (64, 32))
+            self.assertFalse(stored.getexif())
+
+    def test_post_create_rejects_broken_image(self):
+        """Повреждённый файл не сохраняется, форма возвращает ошибку."""
+        response = self.authorized_client.post(
+            reverse('posts:post_create'),
+            data={
+                'text': 'Пост с битой картинкой',
+                'image': SimpleUploadedFile(
+                    'broken.png', b'not an image',
+                    content_type='image/png'),
+            },
+        )
+
+        self.assertTrue(response.context['form'].errors.get('image'))
+        self.assertFalse(
+            Post.objects.filter(text='Пост с битой картинкой').exists())
@@ -0,0 +1,153 @@
+import json
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from posts.counters import find_counter_mismatches
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class PostsJsonlTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='group-test-slug',
+            description='Тестовое описание',
+        )
+        for number in range(5):
+            Post.objects.create(
+                author=cls.user,
+                text=f'Тестовый пост {number}',
+                group=cls.group if number % 2 else None,
+            )
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'posts.jsonl')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def dump_posts(self):
+        return sorted(Post.objects.values_list(
+            'text', 'pub_date', 'updated', 'author__username',
+            'group__slug'))
+
+    def write_records(self, *records):
+        with open(self.path, 'w', encoding='utf-8') as output:
+            for record in records:
+                output.write(json.dumps(record) + '\n')
+
+    def test_export_import_round_trip(self):
+        """Выгрузка и загрузка сохраняют посты, даты публикации
+        и изменения, авторов и группы.
+        """
+        Post.objects.filter(text='Тестовый пост 1').update(
+            updated=Post.objects.get(text='Тестовый пост 1').updated
+            + timedelta(days=3))
+        expected = self.dump_posts()
+        call_command('export_posts', self.path, chunk_size=2,
+                     stderr=StringIO())
+        Post.objects.all().delete()
+        Group.objects.all().delete()
+
+        call_command('import_posts', self.path, batch_size=2,
+                     stdout=StringIO())
+
+        self.assertEqual(self.dump_posts(), expected)
+        self.assertEqual(find_counter_mismatches(), [])
+
+    def test_import_creates_missing_authors(self):
+        """Неизвестный автор создаётся при загрузке."""
+        with open(self.path, 'w', encoding='utf-8') as output:
+            output.write(json.dumps({
+                'model': 'post', 'text': 'Чужой пост',
+                'pub_date': '1854-03-14T00:00:00+00:00',
+                'author': 'leo', 'group': None, 'image': '',
+            }) + '\n')
+
+        call_command('import_posts', self.path, stdout=StringIO())
+
+        post = Post.objects.get(text='Чужой пост')
+        self.assertEqual(post.author.username, 'leo')
+        self.assertEqual(post.pub_date.year, 1854)
+
+    def test_import_rejects_bad_records(self):
+        """Битая запись или неизвестная группа останавливают загрузку
+        с номером строки, ничего не записав.
+        """
+        post = {
+            'model': 'post', 'text': 'Пост',
+            'pub_date': '2022-01-01T00:00:00+00:00',
+            'author': 'leo', 'group': None, 'image': '',
+        }
+        cases = (
+            ({'model': 'post', 'text': 'Без автора'}, 'author'),
+            ({**post, 'pub_date': 'вчера'}, 'pub_date'),
+            ({**post, 'updated': '2022-13-01T00:00:00'}, 'updated'),
+            ({**post, 'group': 'missing'}, 'missing'),
+            ({'model': 'group', 'slug': 'new'}, 'title'),
+            ([1, 2], 'неверная запись'),
+        )
+        posts_count = Post.objects.count()
+        for record, detail in cases:
+            with self.subTest(detail=detail):
+                self.write_records(post, record)
+
+                with self.assertRaisesRegex(
+                        CommandError, f'Строка 2: .*{detail}'):
+                    call_command('import_posts', self.path,
+                                 stdout=StringIO())
+
+                self.assertEqual(Post.objects.count(), posts_count)
+
+    def test_import_rolls_back_written_batches(self):
+        """Ошибка в середине файла откатывает уже записанные пакеты."""
+        post = {
+            'model': 'post', 'text': 'Пост',
+            'pub_date': '2022-01-01T00:00:00+00:00',
+            'author': 'leo', 'group': 'new', 'image': '',
+        }
+        self.write_records(
+            {'model': 'group', 'title': 'Новая', 'slug': 'new',
+             'description': ''},
+            post,
+            {**post, 'pub_date': 'вчера'},
+        )
+        expected = self.dump_posts()
+
+        with self.assertRaisesRegex(CommandError, 'Строка 3: '):
+            call_command('import_posts', self.path, batch_size=1,
+                         stdout=StringIO())
+
+        self.assertEqual(self.dump_posts(), expected)
+        self.assertFalse(Group.objects.filter(slug='new').exists())
+        self.assertFalse(User.objects.filter(username='leo').exists())
+        self.assertEqual(find_counter_mismatches(), [])
+
+    def test_import_without_updated(self):
+        """В старой выгрузке без updated дата изменения равна
+        дате публикации.
+        """
+        self.write_records({
+            'model': 'post', 'text': 'Старый пост',
+            'pub_date': '2022-01-01T00:00:00+00:00',
+            'author': 'leo', 'group': None, 'image': '',
+        })
+
+        call_command('import_posts', self.path, stdout=StringIO())
+
+        post = Post.objects.get(text='Старый пост')
+        self.assertEqual(post.updated, post.pub_date)
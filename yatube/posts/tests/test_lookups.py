@@ -0,0 +1,116 @@
+from types import SimpleNamespace
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, SimpleTestCase, TransactionTestCase
+from django.urls import reverse
+
+from core.metrics import registry
+from posts.lookups import CACHES, LRUCache
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class LRUCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.now = 0
+        self.cache = LRUCache(maxsize=2, ttl=10, clock=lambda: self.now)
+
+    def load(self, key, pk=None):
+        return self.cache.get_or_load(
+            key, lambda: SimpleNamespace(pk=pk or key))
+
+    def test_hits_and_misses(self):
+        """Повторный ключ берётся из кэша, счётчики это отражают."""
+        first = self.load(1)
+
+        self.assertIs(self.load(1), first)
+        self.assertEqual(self.cache.stats(),
+                         {'hits': 1, 'misses': 1, 'size': 1})
+
+    def test_least_recently_used_is_evicted(self):
+        """При переполнении вытесняется самый давний ключ."""
+        first = self.load(1)
+        self.load(2)
+        self.load(1)
+        self.load(3)
+
+        self.assertIs(self.load(1), first)
+        self.assertEqual(self.cache.stats()['misses'], 3)
+        self.load(2)
+        self.assertEqual(self.cache.stats()['misses'], 4)
+
+    def test_entries_expire(self):
+        """Запись живёт не дольше TTL."""
+        first = self.load(1)
+        self.now = 11
+
+        self.assertIsNot(self.load(1), first)
+
+    def test_discard_by_pk_and_none_not_cached(self):
+        """Запись сбрасывается по pk, пустой результат не кэшируется."""
+        first = self.load('slug', pk=5)
+        self.cache.discard_pk(5)
+        self.cache.get_or_load('missing', lambda: None)
+        self.cache.get_or_load('missing', lambda: None)
+
+        self.assertIsNot(self.load('slug', pk=5), first)
+        self.assertEqual(self.cache.stats()['misses'], 4)
+
+
+class LookupCacheViewsTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        for _, lookup_cache in CACHES:
+            lookup_cache.clear()
+        self.user = User.objects.create_user(username='auth')
+        self.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='group-test-slug',
+            description='Тестовое описание',
+        )
+        self.client = Client()
+        self.group_url = reverse(
+            'posts:group_list', kwargs={'slug': self.group.slug})
+        self.profile_url = reverse(
+            'posts:profile', kwargs={'username': self.user.username})
+
+    def test_repeated_lookups_skip_database(self):
+        """Повторный заход на группу и профиль не ищет их в БД."""
+        Post.objects.create(author=self.user, group=self.group, text='Пост')
+        for url in (self.group_url, self.profile_url):
+            with self.subTest(url=url):
+                self.client.get(url)
+                cache.clear()
+                with self.assertNumQueries(1):
+                    # Остаётся только выборка постов страницы.
+                    response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+
+    def test_saves_invalidate_cached_rows(self):
+        """Правка группы и новый пост видны сразу."""
+        self.client.get(self.group_url)
+        self.client.get(self.profile_url)
+
+        self.group.title = 'Новое название'
+        self.group.save()
+        Post.objects.create(author=self.user, group=self.group, text='Пост')
+
+        group_response = self.client.get(self.group_url)
+        profile_response = self.client.get(self.profile_url)
+        self.assertEqual(group_response.context['group'].title,
+                         'Новое название')
+        self.assertEqual(
+            group_response.context['page_obj'].paginator.count, 1)
+        self.assertEqual(profile_response.context['count'], 1)
+
+    def test_counters_exported_to_metrics(self):
+        """Счётчики попаданий и промахов есть в выгрузке метрик."""
+        self.client.get(self.group_url)
+
+        text = registry.render_text()
+
+        self.assertIn('yatube_lookup_cache_hits_total{cache="group"}', text)
+        self.assertIn(
+            'yatube_lookup_cache_misses_total{cache="author"}', text)
@@ -0,0 +1,88 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Post
+from posts.paginators import CachedCountPaginator
+
+User = get_user_model()
+
+
+class CachedCountPaginatorTests(TestCase):
+    PER_PAGE = 10
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        Post.objects.bulk_create(
+            Post(author=cls.user, text=f'Пост {number}')
+            for number in range(25)
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def paginator(self, **kwargs):
+        return CachedCountPaginator(
+            Post.objects.all(), self.PER_PAGE, **kwargs)
+
+    def test_count_is_cached_by_key(self):
+        """Число постов считается один раз на ключ."""
+        self.assertEqual(self.paginator(count_key='feed').count, 25)
+        Post.objects.create(author=CachedCountPaginatorTests.user, text='+')
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.paginator(count_key='feed').count, 25)
+
+    def test_page_within_count_not_evaluated(self):
+        """Страница в пределах числа не читает строки до шаблона."""
+        paginator = self.paginator(count_key='feed')
+        paginator.count
+
+        with self.assertNumQueries(0):
+            paginator.get_page(2)
+
+    def test_page_beyond_count_falls_back_to_last_page(self):
+        """Страница за концом оценки — последняя точная."""
+        paginator = self.paginator(count=100)
+
+        page = paginator.get_page(11)
+
+        self.assertEqual(paginator.count, 25)
+        self.assertEqual(page.number, 3)
+        self.assertEqual(len(page), 5)
+
+    def test_underestimated_count_reaches_tail(self):
+        """Заниженная оценка не прячет посты за последней страницей."""
+        last = self.paginator(count=15).get_page(2)
+        paginator = self.paginator(count=15)
+        beyond = paginator.get_page(3)
+
+        self.assertEqual(len(last), self.PER_PAGE)
+        self.assertEqual(beyond.number, 3)
+        self.assertEqual(len(beyond), 5)
+        self.assertEqual(paginator.count, 25)
+
+    def test_stale_cached_count_is_refreshed(self):
+        """Пересчитанное число попадает обратно в кэш."""
+        cache.set('posts:count:feed', 100)
+
+        self.paginator(count_key='feed').get_page(11)
+
+        self.assertEqual(cache.get('posts:count:feed'), 25)
+
+    def test_index_skips_count_on_repeated_requests(self):
+        """Повторный заход на главную обходится без COUNT(*)."""
+        client = Client()
+        client.get(reverse('posts:index'), {'page': 2})
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(reverse('posts:index'), {'page': 3})
+
+        self.assertEqual(len(response.context['page_obj']), 5)
+        self.assertFalse(any('COUNT(' in query['sql']
+                             for query in queries.captured_queries))
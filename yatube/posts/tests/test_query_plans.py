@@ -0,0 +1,70 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from posts.models import Group, Post
+from posts.paginators import CursorPaginator, encode_cursor
+
+User = get_user_model()
+
+
+class PostsQueryPlanTests(TestCase):
+    """Ленты должны читаться по составным индексам, без полного
+    сканирования таблицы и без временной сортировки.
+    """
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='group-test-slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Тестовый пост для оценки работы',
+            group=cls.group,
+        )
+
+    def get_feeds(self):
+        return {
+            'index': Post.objects.all(),
+            'group_list': PostsQueryPlanTests.group.posts.all(),
+            'profile': PostsQueryPlanTests.user.posts.all(),
+        }
+
+    def explain(self, sql, params=()):
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+            return [row[-1] for row in cursor.fetchall()]
+
+    def assertPlanUsesIndex(self, plan):
+        for detail in plan:
+            self.assertNotIn('TEMP B-TREE', detail, plan)
+            if detail.startswith('SCAN'):
+                self.assertIn('INDEX', detail, plan)
+
+    def test_numbered_feed_pages_use_index(self):
+        """Страницы с OFFSET идут по индексу и без сортировки."""
+        for name, queryset in self.get_feeds().items():
+            for page in (queryset[:10], queryset[10:20]):
+                with self.subTest(feed=name, page=page.query.low_mark):
+                    sql, params = page.query.sql_with_params()
+                    self.assertPlanUsesIndex(self.explain(sql, params))
+
+    def test_cursor_feed_pages_use_index(self):
+        """Keyset-страницы ищут диапазон по индексу ленты."""
+        cursor = encode_cursor(PostsQueryPlanTests.post)
+        for name, queryset in self.get_feeds().items():
+            for direction in ('after', 'before'):
+                with self.subTest(feed=name, direction=direction):
+                    with CaptureQueriesContext(connection) as queries:
+                        CursorPaginator(queryset, 10).get_page(
+                            **{direction: cursor})
+                    plan = self.explain(queries.captured_queries[-1]['sql'])
+                    self.assertPlanUsesIndex(plan)
+                    self.assertTrue(
+                        any(detail.startswith('SEARCH') for detail in plan),
+                        plan)
@@ -0,0 +1,70 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Group, Post
+from posts.search import build_match_query, search_posts
+
+User = get_user_model()
+
+
+class PostsSearchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Путешествия',
+            slug='group-test-slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Осада Силистрии снята, я еще не был в деле',
+            group=cls.group,
+        )
+        cls.other_post = Post.objects.create(
+            author=cls.user,
+            text='Начинаю новую тетрадь дневника',
+        )
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def test_search_finds_post_by_text_and_group_title(self):
+        """Поиск находит пост по словам текста и названию группы."""
+        for query in ('силистрии', 'осада деле', 'путешествия'):
+            with self.subTest(query=query):
+                self.assertEqual(
+                    list(search_posts(query)), [PostsSearchTests.post])
+
+    def test_search_index_follows_save_and_delete(self):
+        """Индекс обновляется при правке и удалении поста и группы."""
+        post = PostsSearchTests.other_post
+        post.text = 'Кавказ и Тула'
+        post.save()
+        self.assertEqual(list(search_posts('кавказ')), [post])
+        self.assertFalse(search_posts('тетрадь').exists())
+
+        PostsSearchTests.group.title = 'Дневники'
+        PostsSearchTests.group.save()
+        self.assertEqual(
+            list(search_posts('дневники')), [PostsSearchTests.post])
+
+        post.delete()
+        self.assertFalse(search_posts('кавказ').exists())
+
+    def test_search_ignores_query_syntax(self):
+        """Операторы FTS5 во вводе не приводят к ошибке."""
+        self.assertEqual(build_match_query('"осада" OR (NEAR'),
+                         '"осада" "OR" "NEAR"')
+        self.assertFalse(search_posts('*** ()').exists())
+
+    def test_search_page_shows_ranked_results(self):
+        """Страница поиска выводит найденные посты и сохраняет запрос."""
+        response = self.guest_client.get(
+            reverse('posts:search'), {'q': 'осада'})
+
+        self.assertEqual(list(response.context['page_obj']),
+                         [PostsSearchTests.post])
+        self.assertContains(response, 'value="осада"')
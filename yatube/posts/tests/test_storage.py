@@ -0,0 +1,156 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TransactionTestCase, override_settings
+from sorl.thumbnail import get_thumbnail
+
+from posts.bulk import delete_posts
+from posts.images import delete_image_files
+from posts.models import Post, StoredImage
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+# Та же картинка с другой палитрой — другое содержимое и хеш.
+OTHER_GIF = SMALL_GIF.replace(b'\xFF\xFF\xFF', b'\xFF\x00\x00', 1)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, POSTS_THUMBNAIL_WORKERS=0)
+class ContentAddressedImagesTests(TransactionTestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='auth')
+        self.storage = Post._meta.get_field('image').storage
+
+    def create_post(self, content=SMALL_GIF, name='small.gif'):
+        return Post.objects.create(
+            author=self.user,
+            text='Пост с картинкой',
+            image=SimpleUploadedFile(
+                name=name, content=content, content_type='image/gif'),
+        )
+
+    def refcount(self, name):
+        return StoredImage.objects.filter(name=name).values_list(
+            'refcount', flat=True).first()
+
+    def test_identical_uploads_share_one_file(self):
+        """Одинаковые загрузки ложатся в один файл в подкаталоге хеша."""
+        first = self.create_post()
+        second = self.create_post(name='copy.gif')
+
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertRegex(
+            first.image.name,
+            r'^posts/([0-9a-f]{2})/([0-9a-f]{2})/\1\2[0-9a-f]{60}\.gif$')
+        self.assertEqual(self.refcount(first.image.name), 2)
+        directory = os.path.dirname(self.storage.path(first.image.name))
+        self.assertEqual(len(os.listdir(directory)), 1)
+
+    def test_file_removed_after_last_reference(self):
+        """Файл и миниатюры удаляются вместе с последним постом."""
+        first = self.create_post()
+        second = self.create_post()
+        name = first.image.name
+        thumbnail = get_thumbnail(
+            first.image, '960x339', crop='center').name
+
+        first.delete()
+        self.assertTrue(self.storage.exists(name))
+        self.assertEqual(self.refcount(name), 1)
+
+        second.delete()
+        self.assertFalse(self.storage.exists(name))
+        self.assertFalse(self.storage.exists(thumbnail))
+        self.assertIsNone(self.refcount(name))
+
+    def test_reupload_survives_concurrent_release(self):
+        """Повторная загрузка не теряет файл, который удалил запрос,
+        снявший последнюю ссылку до коммита новой.
+        """
+        first = self.create_post()
+        name = first.image.name
+        with mock.patch('posts.images.delete_image_files') as deferred:
+            first.delete()
+        (names,) = deferred.call_args[0]
+
+        with transaction.atomic():
+            second = self.create_post(name='again.gif')
+            # Удаляющий запрос проверяет ссылки до нашего коммита.
+            with mock.patch.object(
+                    StoredImage.objects, 'filter',
+                    return_value=StoredImage.objects.none()):
+                delete_image_files(names)
+            self.assertFalse(self.storage.exists(name))
+
+        self.assertEqual(second.image.name, name)
+        self.assertEqual(self.refcount(name), 1)
+        with self.storage.open(name) as stored:
+            self.assertEqual(stored.read(), SMALL_GIF)
+
+    def test_replaced_image_released(self):
+        """Заменённая картинка удаляется, если больше не нужна."""
+        post = self.create_post()
+        previous = post.image.name
+
+        post.image = SimpleUploadedFile(
+            name='other.gif', content=OTHER_GIF, content_type='image/gif')
+        post.save()
+
+        self.assertNotEqual(post.image.name, previous)
+        self.assertFalse(self.storage.exists(previous))
+        self.assertEqual(self.refcount(post.image.name), 1)
+
+    def test_text_edit_keeps_reference(self):
+        """Правка поста без смены картинки не меняет счётчик."""
+        post = self.create_post()
+        post.text = 'Новый текст'
+        post.save()
+
+        self.assertEqual(self.refcount(post.image.name), 1)
+
+    def test_bulk_delete_releases_images(self):
+        """Удаление постов одним DELETE тоже снимает ссылки."""
+        first = self.create_post()
+        kept = self.create_post(content=OTHER_GIF)
+        self.create_post()
+
+        delete_posts(Post.objects.exclude(pk=kept.pk))
+
+        self.assertFalse(self.storage.exists(first.image.name))
+        self.assertTrue(self.storage.exists(kept.image.name))
+        self.assertEqual(
+            list(StoredImage.objects.values_list('name', flat=True)),
+            [kept.image.name])
+
+    def test_cleanup_images_removes_orphans(self):
+        """cleanup_images удаляет только файлы без ссылок."""
+        post = self.create_post()
+        orphan = self.storage.save('posts/orphan.gif', ContentFile(OTHER_GIF))
+
+        call_command('cleanup_images', '--min-age', '0', stdout=StringIO())
+
+        self.assertFalse(self.storage.exists(orphan))
+        self.assertTrue(self.storage.exists(post.image.name))
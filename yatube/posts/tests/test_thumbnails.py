@@ -0,0 +1,90 @@
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post
+from posts.thumbnails import THUMBNAIL_GEOMETRIES
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class PostsThumbnailsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def create_post(self):
+        return Post.objects.create(
+            author=PostsThumbnailsTests.user,
+            text='Тестовый пост для оценки работы',
+            image=SimpleUploadedFile(
+                name='small.gif', content=SMALL_GIF,
+                content_type='image/gif'),
+        )
+
+    def test_templates_use_pregenerated_geometries(self):
+        """Шаблон поста запрашивает ту же геометрию, что и генератор."""
+        path = settings.TEMPLATES[0]['DIRS'][0] + '/posts/post_detail.html'
+        with open(path, encoding='utf-8') as template:
+            source = template.read()
+
+        for geometry, _ in THUMBNAIL_GEOMETRIES:
+            with self.subTest(geometry=geometry):
+                self.assertIn(f'"{geometry}"', source)
+
+    def test_new_image_schedules_thumbnails_once(self):
+        """Миниатюры ставятся в очередь для новой картинки, а не
+        при каждом сохранении поста.
+        """
+        with mock.patch('posts.signals.schedule_thumbnails') as schedule:
+            post = self.create_post()
+            post.text = 'Новый текст'
+            post.save()
+
+        schedule.assert_called_once_with(post.image.name)
+
+    def test_backfill_makes_post_detail_skip_resize(self):
+        """После backfill_thumbnails страница поста не ресайзит картинку."""
+        with mock.patch('posts.signals.schedule_thumbnails'):
+            post = self.create_post()
+
+        call_command('backfill_thumbnails', '--workers', '1',
+                     stdout=StringIO())
+
+        with mock.patch(
+            'sorl.thumbnail.base.ThumbnailBackend._create_thumbnail',
+            side_effect=AssertionError('resize on request path'),
+        ):
+            response = self.guest_client.get(
+                reverse('posts:post_detail', kwargs={'post_id': post.id}))
+
+        self.assertContains(response, 'card-img')
@@ -1,9 +1,13 @@
 from django import forms
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import Client, TestCase
-from django.urls import reverse
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
 
 from posts.models import Group, Post
+from posts.paginators import elided_page_range
+from posts.urls import urlpatterns
 
 User = get_user_model()
 
@@ -73,6 +77,7 @@ class PostsViewsTests(TestCase):
         form_fields = {
             'text': forms.fields.CharField,
             'group': forms.models.ModelChoiceField,
+            'image': forms.fields.ImageField,
         }
 
         response = self.authorized_client.get(
@@ -92,6 +97,7 @@ class PostsViewsTests(TestCase):
         form_fields = {
             'text': forms.fields.CharField,
             'group': forms.models.ModelChoiceField,
+            'image': forms.fields.ImageField,
         }
 
         response = self.authorized_client.get(
@@ -321,3 +327,196 @@ class PaginatorViewsTest(TestCase):
 
         self.assertEqual(len(
             response.context['page_obj']), PaginatorViewsTest.num_six_page)
+
+
+class CursorPaginatorViewsTest(TestCase):
+    """Keyset-пагинация поверх той же выгрузки db.json: 37 постов leo."""
+    fixtures = ['db.json']
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.POST_PER_PAGE = 10
+        cls.post_index_endpoint = 'posts:index'
+        cls.post_group_list_endpoint = 'posts:group_list'
+        cls.post_profile_endpoint = 'posts:profile'
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def collect_feed(self, url):
+        seen = []
+        response = self.guest_client.get(url)
+        while True:
+            page_obj = response.context['page_obj']
+            seen.extend(page_obj)
+            if not page_obj.has_next():
+                return seen
+            response = self.guest_client.get(
+                url, {'after': page_obj.next_cursor})
+
+    def test_cursor_pages_walk_whole_feed(self):
+        """Переход по ?after= обходит каждую ленту целиком и по порядку."""
+        leo = User.objects.get(username='leo')
+        third_group = Group.objects.get(slug='third_group')
+        feeds = {
+            reverse(CursorPaginatorViewsTest.post_index_endpoint):
+                Post.objects.all(),
+            reverse(CursorPaginatorViewsTest.post_group_list_endpoint,
+                    kwargs={'slug': third_group.slug}):
+                third_group.posts.all(),
+            reverse(CursorPaginatorViewsTest.post_profile_endpoint,
+                    kwargs={'username': leo.username}):
+                leo.posts.all(),
+        }
+
+        for url, queryset in feeds.items():
+            with self.subTest(url=url), self.settings(
+                    POSTS_CURSOR_PAGINATION=True):
+                self.assertEqual(
+                    self.collect_feed(url),
+                    list(queryset.order_by('-pub_date', '-pk')))
+
+    def test_cursor_before_returns_previous_page(self):
+        """?before= с первого поста второй страницы возвращает первую."""
+        url = reverse(CursorPaginatorViewsTest.post_index_endpoint)
+        first_page = self.guest_client.get(
+            url, {'after': 'x'}).context['page_obj']
+        second_page = self.guest_client.get(
+            url, {'after': first_page.next_cursor}).context['page_obj']
+
+        response = self.guest_client.get(
+            url, {'before': second_page.previous_cursor})
+        page_obj = response.context['page_obj']
+
+        self.assertEqual(list(page_obj), list(first_page))
+        self.assertFalse(page_obj.has_previous())
+        self.assertTrue(page_obj.has_next())
+        self.assertContains(response, f'?after={page_obj.next_cursor}')
+
+    def test_cursor_invalid_token_falls_back_to_first_page(self):
+        """Битый токен отдаёт первую страницу, а не ошибку."""
+        response = self.guest_client.get(
+            reverse(CursorPaginatorViewsTest.post_index_endpoint),
+            {'after': '!!!not-a-cursor'})
+        page_obj = response.context['page_obj']
+
+        self.assertEqual(len(page_obj), CursorPaginatorViewsTest.POST_PER_PAGE)
+        self.assertFalse(page_obj.has_previous())
+
+
+class ElidedPaginatorViewsTest(TestCase):
+    """Навигация по страницам не растёт вместе с лентой."""
+    # 200 000 страниц по 10 постов: полный page_range дал бы мегабайты.
+    HUGE_COUNT = 2_000_000
+    MAX_RESPONSE_BYTES = 20 * 1024
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='group-test-slug',
+            description='Тестовое описание',
+        )
+        Post.objects.bulk_create(
+            Post(author=cls.user, group=cls.group, text=f'Пост {number}')
+            for number in range(10)
+        )
+        # Счётчик группы — источник count для пагинатора ленты.
+        Group.objects.filter(pk=cls.group.pk).update(
+            posts_count=cls.HUGE_COUNT)
+
+    def test_huge_feed_response_size_is_capped(self):
+        """Страница огромной ленты остаётся маленькой."""
+        url = reverse('posts:group_list',
+                      kwargs={'slug': ElidedPaginatorViewsTest.group.slug})
+
+        response = self.client.get(url)
+
+        page_obj = response.context['page_obj']
+        self.assertEqual(page_obj.paginator.num_pages, 200_000)
+        self.assertEqual(page_obj.elided_page_range, [1, 2, 3, None, 200_000])
+        self.assertContains(response, '?page=200000')
+        self.assertLess(len(response.content), self.MAX_RESPONSE_BYTES)
+
+    def test_elided_page_range(self):
+        """Края, окно вокруг текущей страницы и многоточия."""
+        cases = (
+            ((1, 1), [1]),
+            ((3, 7), [1, 2, 3, 4, 5, 6, 7]),
+            ((5, 10), [1, 2, 3, 4, 5, 6, 7, None, 10]),
+            ((50, 100), [1, None, 48, 49, 50, 51, 52, None, 100]),
+            ((100, 100), [1, None, 98, 99, 100]),
+        )
+        for (number, num_pages), expected in cases:
+            with self.subTest(number=number, num_pages=num_pages):
+                self.assertEqual(
+                    list(elided_page_range(number, num_pages)), expected)
+
+
+class PostsQueryBudgetTests(TestCase):
+    """Каждый view из posts.views укладывается в свой query_budget
+    независимо от числа разных авторов и групп на странице.
+    """
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='group-test-slug',
+            description='Тестовое описание',
+        )
+        for number in range(12):
+            author = User.objects.create_user(username=f'author_{number}')
+            group = Group.objects.create(
+                title=f'Группа {number}',
+                slug=f'group-{number}',
+                description='Тестовое описание',
+            )
+            Post.objects.create(
+                author=author,
+                group=cls.group if number % 2 else group,
+                text=f'Тестовый пост {number}',
+            )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Тестовый пост для оценки работы',
+            group=cls.group,
+        )
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(PostsQueryBudgetTests.user)
+
+    def test_every_posts_view_has_query_budget(self):
+        """У каждого view в posts.urls задан бюджет запросов."""
+        for pattern in urlpatterns:
+            with self.subTest(view=pattern.name):
+                self.assertTrue(hasattr(pattern.callback, 'query_budget'))
+
+    def test_posts_views_fit_query_budget(self):
+        """Число запросов не превышает бюджет view."""
+        post = PostsQueryBudgetTests.post
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list',
+                    kwargs={'slug': PostsQueryBudgetTests.group.slug}),
+            reverse('posts:profile',
+                    kwargs={'username': 'author_1'}),
+            reverse('posts:post_detail', kwargs={'post_id': post.id}),
+            reverse('posts:post_edit', kwargs={'post_id': post.id}),
+            reverse('posts:post_create'),
+            reverse('posts:follow_index'),
+        )
+
+        for url in urls:
+            budget = resolve(url).func.query_budget
+            with self.subTest(url=url):
+                with CaptureQueriesContext(connection) as queries:
+                    self.authorized_client.get(url)
+                self.assertLessEqual(
+                    len(queries), budget,
+                    '\n'.join(q['sql'] for q in queries.captured_queries))
@@ -0,0 +1,67 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connection, transaction
+from sorl.thumbnail import get_thumbnail
+from sorl.thumbnail.images import ImageFile
+
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+# Геометрии, которые запрашивают шаблоны через {% thumbnail %}.
+# При добавлении миниатюры в шаблон её нужно добавить и сюда.
+THUMBNAIL_GEOMETRIES = (
+    ('960x339', {'crop': 'center', 'upscale': True}),
+)
+
+_executor = None
+
+
+def image_source(name):
+    """Исходник для sorl в хранилище поля Post.image.
+
+    sorl различает миниатюры по имени и классу хранилища, поэтому по
+    голому имени он искал бы их в DEFAULT_FILE_STORAGE, а не там, где
+    их ищет тег {% thumbnail post.image %}.
+    """
+    return ImageFile(name, storage=Post._meta.get_field('image').storage)
+
+
+def generate_thumbnails(name):
+    """Создаёт все миниатюры картинки, возвращает успех операции."""
+    try:
+        for geometry, options in THUMBNAIL_GEOMETRIES:
+            get_thumbnail(image_source(name), geometry, **options)
+    except Exception:
+        logger.exception('Не удалось создать миниатюры для %s', name)
+        return False
+    return True
+
+
+def _generate_in_worker(name):
+    try:
+        generate_thumbnails(name)
+    finally:
+        # У потока своё соединение с БД, закрываем его сами.
+        connection.close()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.POSTS_THUMBNAIL_WORKERS,
+            thread_name_prefix='thumbnails',
+        )
+    return _executor
+
+
+def schedule_thumbnails(name):
+    """Ставит генерацию миниатюр в очередь после коммита транзакции."""
+    if not settings.POSTS_THUMBNAIL_WORKERS:
+        transaction.on_commit(lambda: generate_thumbnails(name))
+        return
+    transaction.on_commit(
+        lambda: _get_executor().submit(_generate_in_worker, name))
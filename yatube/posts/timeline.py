@@ -0,0 +1,156 @@
+from django.conf import settings
+from django.db import connection, transaction
+
+from .models import AuthorCounter, Follow, Post, TimelineEntry
+from .paginators import CursorPaginator, keyset_filter
+
+# Гибридная лента подписок. Посты обычных авторов раскладываются
+# в TimelineEntry подписчиков при публикации (одним INSERT ... SELECT).
+# У авторов с числом подписчиков больше POSTS_TIMELINE_FANOUT_LIMIT
+# раскладка стоила бы слишком дорого: их посты подмешиваются при чтении.
+
+ENTRY_TABLE = TimelineEntry._meta.db_table
+FOLLOW_TABLE = Follow._meta.db_table
+POST_TABLE = Post._meta.db_table
+COUNTER_TABLE = AuthorCounter._meta.db_table
+
+
+def _fanout_limit():
+    return settings.POSTS_TIMELINE_FANOUT_LIMIT
+
+
+def _execute(sql, params):
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.rowcount
+
+
+def fan_out_post(post):
+    """Кладёт новый пост в ленты подписчиков обычного автора."""
+    return _execute(
+        f'INSERT INTO {ENTRY_TABLE} (user_id, post_id, pub_date) '
+        f'SELECT f.user_id, p.id, p.pub_date FROM {FOLLOW_TABLE} f '
+        f'INNER JOIN {POST_TABLE} p ON p.id = %s '
+        f'INNER JOIN {COUNTER_TABLE} c ON c.author_id = f.author_id '
+        f'WHERE f.author_id = %s AND c.followers_count <= %s',
+        [post.pk, post.author_id, _fanout_limit()],
+    )
+
+
+def backfill_follow(user_id, author_id):
+    """Новая подписка: переносит в ленту уже написанные посты автора."""
+    return _execute(
+        f'INSERT INTO {ENTRY_TABLE} (user_id, post_id, pub_date) '
+        f'SELECT %s, p.id, p.pub_date FROM {POST_TABLE} p '
+        f'INNER JOIN {COUNTER_TABLE} c ON c.author_id = p.author_id '
+        f'WHERE p.author_id = %s AND c.followers_count <= %s',
+        [user_id, author_id, _fanout_limit()],
+    )
+
+
+def backfill_unpopular_author(author_id):
+    """Автор опустился до порога раскладки: его посты больше не
+    подмешиваются при чтении, поэтому раскладываем в ленты оставшихся
+    подписчиков всё, чего там ещё нет.
+    """
+    return _execute(
+        f'INSERT INTO {ENTRY_TABLE} (user_id, post_id, pub_date) '
+        f'SELECT f.user_id, p.id, p.pub_date FROM {FOLLOW_TABLE} f '
+        f'INNER JOIN {COUNTER_TABLE} c ON c.author_id = f.author_id '
+        f'INNER JOIN {POST_TABLE} p ON p.author_id = f.author_id '
+        f'WHERE f.author_id = %s AND c.followers_count = %s '
+        f'AND NOT EXISTS (SELECT 1 FROM {ENTRY_TABLE} e '
+        f'WHERE e.user_id = f.user_id AND e.post_id = p.id)',
+        [author_id, _fanout_limit()],
+    )
+
+
+def drop_follow(user_id, author_id):
+    TimelineEntry.objects.filter(
+        user_id=user_id, post__author_id=author_id).delete()
+
+
+@transaction.atomic
+def rebuild_timelines():
+    """Раскладывает ленты заново по текущим подпискам и счётчикам.
+
+    Нужен после bulk-загрузок и смены POSTS_TIMELINE_FANOUT_LIMIT.
+    Пересечение порога при подписке и отписке ленты переживают сами:
+    выше порога посты подмешиваются при чтении, а при спуске до порога
+    их раскладывает backfill_unpopular_author.
+    """
+    TimelineEntry.objects.all().delete()
+    return _execute(
+        f'INSERT INTO {ENTRY_TABLE} (user_id, post_id, pub_date) '
+        f'SELECT f.user_id, p.id, p.pub_date FROM {FOLLOW_TABLE} f '
+        f'INNER JOIN {COUNTER_TABLE} c ON c.author_id = f.author_id '
+        f'INNER JOIN {POST_TABLE} p ON p.author_id = f.author_id '
+        f'WHERE c.followers_count <= %s',
+        [_fanout_limit()],
+    )
+
+
+def _merge_keys(querysets, descending, limit):
+    """Сливает срезы ключей (pub_date, id) одним запросом UNION.
+
+    SQLite не разрешает LIMIT в частях составного запроса, поэтому
+    каждый срез обёрнут в подзапрос. UNION убирает посты, которые есть
+    и в разложенной ленте, и среди подмешанных.
+    """
+    parts, params = [], []
+    for number, queryset in enumerate(querysets):
+        sql, part_params = queryset.query.sql_with_params()
+        parts.append(f'SELECT * FROM ({sql}) AS part{number}')
+        params.extend(part_params)
+    order = 'DESC' if descending else 'ASC'
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT * FROM ({" UNION ".join(parts)}) AS merged '
+            f'ORDER BY 1 {order}, 2 {order} LIMIT %s',
+            [*params, limit],
+        )
+        return cursor.fetchall()
+
+
+def naive_timeline(user):
+    """Лента подписок одним запросом author__in — для сравнения."""
+    return Post.objects.filter(
+        author__in=Follow.objects.filter(user=user).values('author')
+    ).select_related('author', 'group')
+
+
+class TimelinePaginator(CursorPaginator):
+    """Курсорная лента подписок: разложенные строки плюс посты
+    популярных авторов, слитые по (pub_date, id).
+    """
+
+    def __init__(self, user, per_page):
+        super().__init__(Post.objects.none(), per_page)
+        self.user = user
+
+    def fetch(self, after_key, before_key, limit):
+        # Ключи (pub_date, id) читаются из покрывающих индексов,
+        # сами посты — одним запросом только для итоговой страницы.
+        sources = [keyset_filter(
+            TimelineEntry.objects.filter(user=self.user),
+            after_key, before_key, pk='post_id',
+        ).values_list('pub_date', 'post_id')[:limit]]
+        popular_ids = Follow.objects.filter(
+            user=self.user,
+            author__counter__followers_count__gt=_fanout_limit(),
+        ).values_list('author_id', flat=True)
+        # По срезу на автора: каждый читает диапазон своего индекса,
+        # а общий author__in сортировал бы все их посты целиком.
+        sources.extend(
+            keyset_filter(
+                Post.objects.filter(author_id=author_id),
+                after_key, before_key,
+            ).values_list('pub_date', 'pk')[:limit]
+            for author_id in popular_ids
+        )
+        keys = _merge_keys(sources, before_key is None, limit)
+        if not keys:
+            return []
+        posts = Post.objects.select_related('author', 'group').in_bulk(
+            [pk for _, pk in keys])
+        return [posts[pk] for _, pk in keys if pk in posts]
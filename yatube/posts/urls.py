@@ -8,7 +8,13 @@ urlpatterns = [
     path('', views.index, name='index'),
     path('group/<slug:slug>/', views.group_posts, name='group_list'),
     path('profile/<str:username>/', views.profile, name='profile'),
+    path('search/', views.search, name='search'),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
-    path('create/', views.post_create, name='post_create')
+    path('create/', views.post_create, name='post_create'),
+    path('follow/', views.follow_index, name='follow_index'),
+    path('profile/<str:username>/follow/', views.profile_follow,
+         name='profile_follow'),
+    path('profile/<str:username>/unfollow/', views.profile_unfollow,
+         name='profile_unfollow'),
 ]
@@ -1,8 +1,41 @@
-from django.core.paginator import Paginator
+from django.conf import settings
 
+from .paginators import (CachedCountPaginator, CursorPaginator,
+                         elided_page_range)
 
-def paginate_posts(request, list_obj, post_per_page):
-    paginator = Paginator(list_obj, post_per_page)
+
+def query_budget(max_queries):
+    """Фиксирует максимум SQL-запросов на один вызов view.
+
+    Декоратор ничего не делает в рантайме, бюджет проверяется тестами.
+    """
+    def decorator(view):
+        view.query_budget = max_queries
+        return view
+    return decorator
+
+
+def paginate_posts(request, list_obj, post_per_page, count=None,
+                   count_key=None, allow_cursor=True):
+    """Страница ленты: курсорная или номерная.
+
+    Для номерной число постов берётся из count (поддерживаемый счётчик)
+    или из кэша по count_key; без них считается COUNT(*).
+    """
+    after = request.GET.get('after')
+    before = request.GET.get('before')
+    # Курсор задаёт порядок по дате, поэтому ранжированным выдачам
+    # (например, поиску) он не подходит.
+    if allow_cursor and (
+            after or before or settings.POSTS_CURSOR_PAGINATION):
+        paginator = CursorPaginator(list_obj, post_per_page)
+        return paginator.get_page(after=after, before=before)
+    paginator = CachedCountPaginator(
+        list_obj, post_per_page, count=count, count_key=count_key
+    )
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
+    # Полный page_range на сотнях тысяч страниц раздувает ответ.
+    page_obj.elided_page_range = list(elided_page_range(
+        page_obj.number, paginator.num_pages))
     return page_obj
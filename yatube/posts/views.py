@@ -1,54 +1,105 @@
+import hashlib
+from urllib.parse import urlencode
+
+from django.conf import settings
 from django.shortcuts import get_object_or_404, redirect, render
 from django.contrib.auth.decorators import login_required
+from django.views.decorators.http import condition
+
+from core.routers import replica_reads
 
-from .utils import paginate_posts
+from . import conditional
+
+from .cache import (INDEX_FEED, author_feed, feed_cache_key, get_feed_version,
+                    group_feed)
+from .counters import get_author_posts_count
+from .search import search_posts
+from .utils import paginate_posts, query_budget
 from .forms import PostForm
-from .models import Group, Post, User
+from .lookups import get_author_or_404, get_group_or_404
+from .models import Follow, Post
+from .timeline import TimelinePaginator
 
 POSTS_PER_PAGE = 10
 
 
+@query_budget(4)
+@replica_reads
+@condition(etag_func=conditional.index_etag,
+           last_modified_func=conditional.index_last_modified)
 def index(request):
-    post_list = Post.objects.all()
-    page_obj = paginate_posts(request, post_list, POSTS_PER_PAGE)
+    post_list = Post.objects.select_related('author', 'group')
+    page_obj = paginate_posts(
+        request, post_list, POSTS_PER_PAGE,
+        count_key=f'{INDEX_FEED}:{get_feed_version(INDEX_FEED)}'
+    )
     context = {
         'page_obj': page_obj,
+        'feed_cache_key': feed_cache_key(request, INDEX_FEED),
+        'feed_cache_timeout': settings.POSTS_FEED_CACHE_TIMEOUT,
     }
     return render(request, 'posts/index.html', context)
 
 
+@query_budget(5)
+@replica_reads
+@condition(etag_func=conditional.group_etag,
+           last_modified_func=conditional.group_last_modified)
 def group_posts(request, slug):
     template = 'posts/group_list.html'
-    group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.all()
-    page_obj = paginate_posts(request, posts, POSTS_PER_PAGE)
+    group = get_group_or_404(slug)
+    posts = group.posts.select_related('author', 'group')
+    page_obj = paginate_posts(
+        request, posts, POSTS_PER_PAGE, count=group.posts_count
+    )
     context = {
         'group': group,
-        'page_obj': page_obj
+        'page_obj': page_obj,
+        'feed_cache_key': feed_cache_key(request, group_feed(group.pk)),
+        'feed_cache_timeout': settings.POSTS_FEED_CACHE_TIMEOUT,
     }
     return render(request, template, context)
 
 
+@query_budget(6)
+@replica_reads
+@condition(etag_func=conditional.profile_etag,
+           last_modified_func=conditional.profile_last_modified)
 def profile(request, username):
     template = 'posts/profile.html'
-    author = get_object_or_404(User, username=username)
-    post_list = author.posts.all()
-    count_post = post_list.count()
-    page_obj = paginate_posts(request, post_list, POSTS_PER_PAGE)
+    author = get_author_or_404(username)
+    post_list = author.posts.select_related('author', 'group')
+    count_post = get_author_posts_count(author)
+    page_obj = paginate_posts(
+        request, post_list, POSTS_PER_PAGE, count=count_post
+    )
+
+    following = request.user.is_authenticated and Follow.objects.filter(
+        user=request.user, author=author
+    ).exists()
 
     context = {
         'author': author,
         'page_obj': page_obj,
         'count': count_post,
+        'following': following,
+        'feed_cache_key': feed_cache_key(request, author_feed(author.pk)),
+        'feed_cache_timeout': settings.POSTS_FEED_CACHE_TIMEOUT,
     }
     return render(request, template, context)
 
 
+@query_budget(4)
+@replica_reads
+@condition(etag_func=conditional.post_etag,
+           last_modified_func=conditional.post_last_modified)
 def post_detail(request, post_id):
     template = 'posts/post_detail.html'
-    post_detail = get_object_or_404(Post, pk=post_id)
+    post_detail = get_object_or_404(
+        Post.objects.select_related('author__counter', 'group'), pk=post_id
+    )
     author = post_detail.author
-    count = author.posts.count()
+    count = get_author_posts_count(author)
     context = {
         'author': author,
         'post_detail': post_detail,
@@ -57,6 +108,29 @@ def post_detail(request, post_id):
     return render(request, template, context)
 
 
+@query_budget(4)
+def search(request):
+    template = 'posts/search.html'
+    query = request.GET.get('q', '').strip()
+    post_list = search_posts(
+        query, Post.objects.select_related('author', 'group')
+    )
+    page_obj = paginate_posts(
+        request, post_list, POSTS_PER_PAGE, allow_cursor=False,
+        count_key=':'.join((
+            'search', get_feed_version(INDEX_FEED),
+            hashlib.md5(query.encode()).hexdigest(),
+        ))
+    )
+    context = {
+        'query': query,
+        'page_obj': page_obj,
+        'page_query': urlencode({'q': query}) + '&',
+    }
+    return render(request, template, context)
+
+
+@query_budget(3)
 @login_required
 def post_create(request):
     template = 'posts/create_post.html'
@@ -75,12 +149,13 @@ def post_create(request):
     return render(request, template, {'form': form})
 
 
+@query_budget(4)
 @login_required
 def post_edit(request, post_id):
     template = 'posts/create_post.html'
     post = get_object_or_404(Post, id=post_id)
 
-    if request.user != post.author:
+    if post.author_id != request.user.id:
         return redirect('posts:post_detail', post_id=post_id)
 
     form = PostForm(
@@ -92,11 +167,38 @@ def post_edit(request, post_id):
         form.save()
         return redirect('posts:post_detail', post_id=post_id)
 
-    else:
-        form = PostForm(instance=post)
-
     context = {
         'is_edit': True,
         'form': form,
     }
     return render(request, template, context)
+
+
+@query_budget(5)
+@login_required
+def follow_index(request):
+    template = 'posts/follow.html'
+    paginator = TimelinePaginator(request.user, POSTS_PER_PAGE)
+    page_obj = paginator.get_page(
+        after=request.GET.get('after'), before=request.GET.get('before')
+    )
+    return render(request, template, {'page_obj': page_obj})
+
+
+@query_budget(12)
+@login_required
+def profile_follow(request, username):
+    author = get_author_or_404(username)
+    if author.pk != request.user.pk:
+        Follow.objects.get_or_create(user=request.user, author=author)
+    return redirect('posts:profile', username=username)
+
+
+@query_budget(10)
+@login_required
+def profile_unfollow(request, username):
+    author = get_author_or_404(username)
+    follow = Follow.objects.filter(user=request.user, author=author).first()
+    if follow is not None:
+        follow.delete()
+    return redirect('posts:profile', username=username)
@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+USER_CACHE_KEY = 'users:user:{}'
+
+
+def forget_cached_user(user_id):
+    cache.delete(USER_CACHE_KEY.format(user_id))
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend, который держит пользователя сессии в кэше.
+
+    AuthenticationMiddleware загружает пользователя на каждый запрос;
+    здесь это запрос в БД раз в USERS_CACHE_TIMEOUT секунд. Запись
+    сбрасывается при сохранении и удалении пользователя (в том числе
+    при смене пароля) и при выходе, см. users.signals.
+    """
+
+    def get_user(self, user_id):
+        key = USER_CACHE_KEY.format(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, settings.USERS_CACHE_TIMEOUT)
+        return user
@@ -0,0 +1,21 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.signals import user_logged_out
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .backends import forget_cached_user
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def discard_saved_user(sender, instance, **kwargs):
+    # set_password() тоже доходит сюда: смена пароля сохраняет модель.
+    forget_cached_user(instance.pk)
+
+
+@receiver(user_logged_out)
+def discard_logged_out_user(sender, request, user, **kwargs):
+    if user is not None:
+        forget_cached_user(user.pk)
@@ -0,0 +1,81 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from users.backends import CachedModelBackend
+
+User = get_user_model()
+
+
+class CachedModelBackendTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='auth', password='old-password')
+        self.backend = CachedModelBackend()
+
+    def load(self, queries):
+        with self.assertNumQueries(queries):
+            return self.backend.get_user(self.user.pk)
+
+    def test_user_loaded_once(self):
+        """Повторная загрузка пользователя не идёт в БД."""
+        self.assertEqual(self.load(1), self.user)
+        self.assertEqual(self.load(0), self.user)
+
+    def test_save_and_password_change_invalidate(self):
+        """Сохранение и смена пароля сбрасывают кэш."""
+        self.load(1)
+        self.user.first_name = 'Имя'
+        self.user.save()
+        self.assertEqual(self.load(1).first_name, 'Имя')
+
+        self.user.set_password('new-password')
+        self.user.save()
+        self.assertTrue(self.load(1).check_password('new-password'))
+
+    def test_inactive_user_not_returned(self):
+        self.load(1)
+        self.user.is_active = False
+        self.user.save()
+
+        self.assertIsNone(self.load(1))
+
+    def test_logout_invalidates(self):
+        self.client.force_login(self.user)
+        self.client.get(reverse('posts:index'))
+        self.load(0)
+
+        self.client.logout()
+
+        self.load(1)
+
+
+class CachedSessionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='auth', password='old-password')
+        self.client.force_login(self.user)
+
+    def get_user(self):
+        return self.client.get(reverse('posts:index')).context['user']
+
+    def test_session_survives_cache_loss(self):
+        """Сессия пишется и в БД: после сброса кэша вход сохраняется."""
+        self.get_user()
+        cache.clear()
+
+        self.assertTrue(self.get_user().is_authenticated)
+
+    def test_password_change_ends_other_sessions(self):
+        """После смены пароля закэшированный пользователь не пускает
+        по старой сессии.
+        """
+        self.assertTrue(self.get_user().is_authenticated)
+
+        self.user.set_password('new-password')
+        self.user.save()
+
+        self.assertFalse(self.get_user().is_authenticated)
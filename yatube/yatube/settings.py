@@ -24,15 +24,19 @@ INSTALLED_APPS = [
     'users.apps.UsersConfig',
     'core.apps.CoreConfig',
     'about.apps.AboutConfig',
+    'api.apps.ApiConfig',
     'sorl.thumbnail',
 ]
 
 MIDDLEWARE = [
+    'core.middleware.ViewMetricsMiddleware',
+    'core.middleware.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.ReadYourWritesMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -41,7 +45,7 @@ ROOT_URLCONF = 'yatube.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'core.template_backends.InstrumentedDjangoTemplates',
         'DIRS': [
             os.path.join(BASE_DIR, 'templates')
         ],
@@ -67,6 +71,44 @@ DATABASES = {
     }
 }
 
+# Реплики только для чтения. Локально это копии файла базы:
+# YATUBE_REPLICA_DATABASES=replica1.sqlite3,replica2.sqlite3
+DATABASE_REPLICAS = []
+for number, name in enumerate(filter(None, os.environ.get(
+        'YATUBE_REPLICA_DATABASES', '').split(',')), start=1):
+    alias = f'replica{number}'
+    DATABASES[alias] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, name),
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['core.routers.PrimaryReplicaRouter']
+
+# Сколько секунд после записи сессия читает свои данные с primary.
+DATABASE_READ_YOUR_WRITES_SECONDS = 10
+
+# Ответы короче этого (байт) не сжимаются; уровни сжатия ответов
+# подобраны по bench_compression.
+COMPRESSION_MIN_LENGTH = 512
+COMPRESSION_LEVELS = {'gzip': 6, 'br': 5}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Сессия читается из кэша, а пишется и в кэш, и в БД: после сброса кэша
+# она поднимется из БД. Процессам нужен общий кэш (Memcached, Redis),
+# иначе выход в одном процессе не виден другим.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+# Пользователь сессии кэшируется на USERS_CACHE_TIMEOUT секунд.
+AUTHENTICATION_BACKENDS = ['users.backends.CachedModelBackend']
+USERS_CACHE_TIMEOUT = 60
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -97,6 +139,8 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 
 STATIC_URL = '/static/'
+# Куда collectstatic собирает файлы для core.views.serve_static.
+STATIC_ROOT = os.path.join(BASE_DIR, 'collected_static')
 
 LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'posts:index'
@@ -109,3 +153,42 @@ CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# Заголовок, которым core.views.serve_media передаёт отдачу файла
+# веб-серверу: 'X-Sendfile' (Apache, lighttpd) или 'X-Accel-Redirect'
+# (nginx). None — отдавать из Python.
+MEDIA_SENDFILE_HEADER = None
+# internal-location nginx, который смотрит в MEDIA_ROOT.
+MEDIA_ACCEL_REDIRECT_PREFIX = '/protected-media/'
+
+# Загрузки всегда пишутся на диск по частям, а не собираются в памяти.
+FILE_UPLOAD_HANDLERS = [
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+
+# Keyset-пагинация лент (?after=/?before=) вместо номеров страниц.
+POSTS_CURSOR_PAGINATION = False
+
+# Время жизни закэшированных фрагментов лент; сброс идёт по сигналам.
+POSTS_FEED_CACHE_TIMEOUT = 60 * 15
+
+# Сколько секунд номерная пагинация доверяет закэшированному COUNT(*).
+POSTS_COUNT_CACHE_TIMEOUT = 60
+
+# Кэш групп и авторов по слагу и имени внутри процесса: размер и TTL, с.
+POSTS_LOOKUP_CACHE_SIZE = 1024
+POSTS_LOOKUP_CACHE_TTL = 60
+
+# Авторы с большим числом подписчиков не раскладывают посты по лентам
+# подписок при публикации: их посты подмешиваются при чтении.
+POSTS_TIMELINE_FANOUT_LIMIT = 1000
+
+# Фоновые потоки для генерации миниатюр; 0 — генерировать синхронно.
+POSTS_THUMBNAIL_WORKERS = 1
+
+# Предельные размеры картинки поста после перекодирования при загрузке.
+POSTS_IMAGE_MAX_SIZE = (1920, 1920)
+POSTS_IMAGE_MAX_BYTES = 1024 * 1024
+
+# PRAGMA для каждого нового соединения с SQLite (см. core.db);
+# боевые значения — в settings_production.
+SQLITE_PRAGMAS = {}
@@ -0,0 +1,72 @@
+"""Боевой профиль: DJANGO_SETTINGS_MODULE=yatube.settings_production."""
+import os
+from copy import deepcopy
+
+from django.core.exceptions import ImproperlyConfigured
+
+from . import settings as base
+from .settings import *  # noqa: F401,F403
+
+DEBUG = False
+
+SECRET_KEY = os.environ.get('YATUBE_SECRET_KEY', base.SECRET_KEY)
+
+ALLOWED_HOSTS = os.environ.get(
+    'YATUBE_ALLOWED_HOSTS', ','.join(base.ALLOWED_HOSTS)).split(',')
+
+# Копии, чтобы не менять словари базового профиля.
+DATABASES = deepcopy(base.DATABASES)
+TEMPLATES = deepcopy(base.TEMPLATES)
+
+# Соединение с БД живёт между запросами: без повторного открытия файла
+# и без повторных PRAGMA на каждый запрос.
+DATABASES['default']['CONN_MAX_AGE'] = 600
+# Сколько секунд драйвер sqlite3 ждёт снятия блокировки записи.
+DATABASES['default'].setdefault('OPTIONS', {})['timeout'] = 5
+
+# WAL разрешает читать во время записи; synchronous=NORMAL в режиме WAL
+# не теряет целостность, а fsync делается только на контрольных точках.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'busy_timeout': 5000,
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+}
+
+# Шаблоны компилируются один раз на процесс. С явными loaders
+# APP_DIRS задавать нельзя, app_directories.Loader его заменяет.
+TEMPLATES[0]['APP_DIRS'] = False
+TEMPLATES[0]['OPTIONS']['loaders'] = [
+    ('django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]),
+]
+TEMPLATES[0]['OPTIONS']['context_processors'].remove(
+    'django.template.context_processors.debug')
+
+# collectstatic пишет имена с хешем содержимого и сжатые .gz/.br копии.
+STATICFILES_STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
+
+# Картинки постов отдаёт веб-сервер, например nginx:
+#   location /protected-media/ { internal; alias /path/to/media/; }
+MEDIA_SENDFILE_HEADER = os.environ.get('YATUBE_MEDIA_SENDFILE_HEADER')
+
+# Версии лент, отметки Last-Modified, счётчики и сессии сбрасываются
+# через кэш, поэтому все процессы должны видеть один кэш. По умолчанию
+# это каталог на диске; Memcached или Redis задаются через окружение:
+#   YATUBE_CACHE_BACKEND=django.core.cache.backends.memcached.PyLibMCCache
+#   YATUBE_CACHE_LOCATION=127.0.0.1:11211
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get(
+            'YATUBE_CACHE_BACKEND',
+            'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.environ.get(
+            'YATUBE_CACHE_LOCATION', os.path.join(base.BASE_DIR, 'cache')),
+    }
+}
+if CACHES['default']['BACKEND'].endswith('.LocMemCache'):
+    raise ImproperlyConfigured(
+        'LocMemCache у каждого процесса свой: боевому профилю нужен '
+        'общий кэш (YATUBE_CACHE_BACKEND).')
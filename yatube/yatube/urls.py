@@ -1,7 +1,8 @@
 from django.contrib import admin
-from django.urls import include, path
+from django.urls import include, path, re_path
 from django.conf import settings
-from django.conf.urls.static import static
+
+from core.views import serve_media, serve_static, view_metrics
 
 urlpatterns = [
     path('', include('posts.urls', namespace='posts')),
@@ -9,12 +10,22 @@ urlpatterns = [
     path('auth/', include('users.urls')),
     path('auth/', include('django.contrib.auth.urls')),
     path('about/', include('about.urls', namespace='about')),
-
+    path('api/v1/', include('api.urls', namespace='api')),
+    path('metrics/', view_metrics, name='metrics'),
+    re_path(
+        r'^{}(?P<path>.+)$'.format(settings.MEDIA_URL.lstrip('/')),
+        serve_media, name='media',
+    ),
 ]
 
 handler404 = 'core.views.page_not_found'
 
-if settings.DEBUG:
-    urlpatterns += static(
-        settings.MEDIA_URL, document_root=settings.MEDIA_ROOT
-    )
+if not settings.DEBUG:
+    # Без DEBUG статику отдаёт core.views.serve_static из STATIC_ROOT:
+    # со сжатыми копиями и вечным кэшем для имён с хешем.
+    urlpatterns += [
+        re_path(
+            r'^{}(?P<path>.+)$'.format(settings.STATIC_URL.lstrip('/')),
+            serve_static, name='static',
+        ),
+    ]